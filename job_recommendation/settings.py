@@ -90,6 +90,14 @@ DATABASES = {
     }
 }
 
+# Cache configuration (local memory by default; the file-based backend shares the cache between worker processes)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
 # Custom user model
 AUTH_USER_MODEL = 'users.CustomUser'
 
@@ -148,3 +156,87 @@ EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "True") == "True"
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Job recommendation index
+# RECOMMENDATION_INDEX_DIR: The directory the versions of the prebuilt TF-IDF job index are published to
+RECOMMENDATION_INDEX_DIR = os.getenv("RECOMMENDATION_INDEX_DIR", str(BASE_DIR / "var" / "job_index"))
+# RECOMMENDATION_SEEKER_INDEX_DIR: The directory the versions of the job seeker index, used to rank candidates,
+# are published to
+RECOMMENDATION_SEEKER_INDEX_DIR = os.getenv("RECOMMENDATION_SEEKER_INDEX_DIR", str(BASE_DIR / "var" / "seeker_index"))
+# RECOMMENDATION_INDEX_KEEP_VERSIONS: Number of published index versions kept on disk
+RECOMMENDATION_INDEX_KEEP_VERSIONS = int(os.getenv("RECOMMENDATION_INDEX_KEEP_VERSIONS", 3))
+# RECOMMENDATION_INDEX_WARM_UP: Load the index into memory when a WSGI/ASGI worker starts, before it serves requests
+RECOMMENDATION_INDEX_WARM_UP = os.getenv("RECOMMENDATION_INDEX_WARM_UP", "False") == "True"
+# RECOMMENDATION_INDEX_REBUILD_INTERVAL: Seconds between background rebuilds of the index (0 disables them)
+RECOMMENDATION_INDEX_REBUILD_INTERVAL = int(os.getenv("RECOMMENDATION_INDEX_REBUILD_INTERVAL", 3600))
+# RECOMMENDATION_INDEX_UPDATE_INTERVAL: Seconds between runs of the thread applying queued job changes
+# (0 leaves them to the apply_job_changes command)
+RECOMMENDATION_INDEX_UPDATE_INTERVAL = float(os.getenv("RECOMMENDATION_INDEX_UPDATE_INTERVAL", 2))
+# RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE: Maximum number of queued job changes applied and published at once
+RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE = int(os.getenv("RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE", 1000))
+# RECOMMENDATION_INDEX_SHARD_SIZE: Number of jobs vectorized per worker task by a parallel rebuild of the index
+RECOMMENDATION_INDEX_SHARD_SIZE = int(os.getenv("RECOMMENDATION_INDEX_SHARD_SIZE", 20000))
+# RECOMMENDATION_INDEX_PRUNE_THRESHOLD: Smallest TF-IDF weight kept per job in the index (0 keeps every weight)
+RECOMMENDATION_INDEX_PRUNE_THRESHOLD = float(os.getenv("RECOMMENDATION_INDEX_PRUNE_THRESHOLD", 0.0))
+# RECOMMENDATION_DENSE_DIMENSIONS: Dimensions of the LSA job embeddings built with the index (0 builds none)
+RECOMMENDATION_DENSE_DIMENSIONS = int(os.getenv("RECOMMENDATION_DENSE_DIMENSIONS", 0))
+# RECOMMENDATION_DENSE_DTYPE: The type the LSA job embeddings are stored as, float32 or float16 (half the memory)
+RECOMMENDATION_DENSE_DTYPE = os.getenv("RECOMMENDATION_DENSE_DTYPE", "float32")
+# RECOMMENDATION_RETRIEVAL: How recommendations are ranked, "sparse" (TF-IDF) or "dense" (LSA embeddings, if built)
+RECOMMENDATION_RETRIEVAL = os.getenv("RECOMMENDATION_RETRIEVAL", "sparse")
+# RECOMMENDATION_VECTORIZER: How skills are vectorized, "tfidf" (vocabulary fitted at every rebuild) or "hashing"
+# (fixed hashed columns)
+RECOMMENDATION_VECTORIZER = os.getenv("RECOMMENDATION_VECTORIZER", "tfidf")
+# RECOMMENDATION_HASHING_FEATURES: Number of hashed term columns of the index with the hashing vectorizer
+RECOMMENDATION_HASHING_FEATURES = int(os.getenv("RECOMMENDATION_HASHING_FEATURES", 2 ** 18))
+# RECOMMENDATION_HASHING_IDF_PATH: The IDF weights of the hashed columns, written by refresh_hashing_idf and synced
+# between nodes
+RECOMMENDATION_HASHING_IDF_PATH = os.getenv(
+    "RECOMMENDATION_HASHING_IDF_PATH", str(BASE_DIR / "var" / "hashing_idf.npy")
+)
+# RECOMMENDATION_MATERIALIZED_TOP_K: Number of ranked jobs stored per job seeker in the precomputed recommendations
+RECOMMENDATION_MATERIALIZED_TOP_K = int(os.getenv("RECOMMENDATION_MATERIALIZED_TOP_K", 50))
+# RECOMMENDATION_PAGE_MAX_SIZE: Maximum number of recommendations returned per page (the `k` query parameter)
+RECOMMENDATION_PAGE_MAX_SIZE = int(os.getenv("RECOMMENDATION_PAGE_MAX_SIZE", 50))
+# RECOMMENDATION_RANKING_CACHE_TIMEOUT: Seconds a ranking computed for deep pages or custom filters stays cached
+RECOMMENDATION_RANKING_CACHE_TIMEOUT = int(os.getenv("RECOMMENDATION_RANKING_CACHE_TIMEOUT", 300))
+# RECOMMENDATION_RESPONSE_CACHE_TIMEOUT: Seconds a recommendation response stays cached (changes invalidate it earlier)
+RECOMMENDATION_RESPONSE_CACHE_TIMEOUT = int(os.getenv("RECOMMENDATION_RESPONSE_CACHE_TIMEOUT", 300))
+# RECOMMENDATION_RESPONSE_CACHE_LOCK_TIMEOUT: Seconds identical concurrent requests wait for the one computing it
+RECOMMENDATION_RESPONSE_CACHE_LOCK_TIMEOUT = int(os.getenv("RECOMMENDATION_RESPONSE_CACHE_LOCK_TIMEOUT", 10))
+# RECOMMENDATION_TIMING_ENABLED: Time the stages of recommendation requests (Server-Timing header, logs, histograms)
+RECOMMENDATION_TIMING_ENABLED = os.getenv("RECOMMENDATION_TIMING_ENABLED", "False") == "True"
+# RECOMMENDATION_TIMING_SAMPLE_RATE: Fraction of timed requests added to the in-process latency histograms
+RECOMMENDATION_TIMING_SAMPLE_RATE = float(os.getenv("RECOMMENDATION_TIMING_SAMPLE_RATE", 1.0))
+# RECOMMENDATION_SIMILAR_JOBS_TOP_N: Number of most similar jobs stored per job for the similar jobs endpoint
+RECOMMENDATION_SIMILAR_JOBS_TOP_N = int(os.getenv("RECOMMENDATION_SIMILAR_JOBS_TOP_N", 10))
+# RECOMMENDATION_STREAMING_CHUNK_SIZE: Number of jobs read and vectorized at once when scoring without an index
+RECOMMENDATION_STREAMING_CHUNK_SIZE = int(os.getenv("RECOMMENDATION_STREAMING_CHUNK_SIZE", 2000))
+# RECOMMENDATION_STREAMING_FEATURES: Number of hashed term columns used when scoring without an index
+RECOMMENDATION_STREAMING_FEATURES = int(os.getenv("RECOMMENDATION_STREAMING_FEATURES", 2 ** 20))
+# JOB_BULK_MAX_SIZE: Maximum number of jobs created by one request to the bulk create endpoint
+JOB_BULK_MAX_SIZE = int(os.getenv("JOB_BULK_MAX_SIZE", 1000))
+# JOB_BULK_BATCH_SIZE: Number of jobs inserted per query by the bulk create endpoint and the import command
+JOB_BULK_BATCH_SIZE = int(os.getenv("JOB_BULK_BATCH_SIZE", 500))
+# JOB_EXPORT_CHUNK_SIZE: Number of jobs fetched from the database at once by the job export
+JOB_EXPORT_CHUNK_SIZE = int(os.getenv("JOB_EXPORT_CHUNK_SIZE", 2000))
+# JOB_EXPORT_WATERMARK_LAG: Seconds the export watermark lags behind, so jobs still being committed are not skipped
+JOB_EXPORT_WATERMARK_LAG = int(os.getenv("JOB_EXPORT_WATERMARK_LAG", 60))
+# JOB_FACETS_CACHE_TIMEOUT: Seconds the job counts of the facets endpoint are cached, bounding the age of date buckets
+JOB_FACETS_CACHE_TIMEOUT = int(os.getenv("JOB_FACETS_CACHE_TIMEOUT", 300))
+# JOB_FACETS_MAX_LOCATIONS: Number of most frequent locations returned by the facets endpoint
+JOB_FACETS_MAX_LOCATIONS = int(os.getenv("JOB_FACETS_MAX_LOCATIONS", 50))
+# RECOMMENDATION_RANKERS: Comma-separated ranker chain, tried in order until one answers within the deadline
+RECOMMENDATION_RANKERS = os.getenv("RECOMMENDATION_RANKERS", "index,streaming,keyword_overlap,latest")
+# RECOMMENDATION_DEADLINE_MS: Milliseconds a recommendation request waits for a ranker before falling back, 0 for none
+RECOMMENDATION_DEADLINE_MS = int(os.getenv("RECOMMENDATION_DEADLINE_MS", 0))
+# RECOMMENDATION_RANKER_THREADS: Worker threads per process running rankers under a deadline
+RECOMMENDATION_RANKER_THREADS = int(os.getenv("RECOMMENDATION_RANKER_THREADS", 4))
+# RECOMMENDATION_BATCH_MEMORY_BUDGET: Maximum bytes of one chunk of the seeker x job product when scoring in batches
+RECOMMENDATION_BATCH_MEMORY_BUDGET = int(os.getenv("RECOMMENDATION_BATCH_MEMORY_BUDGET", 256 * 1024 * 1024))
+# RECOMMENDATION_BATCH_MAX_SIZE: Maximum number of job seekers or skills texts accepted by the batch endpoint
+RECOMMENDATION_BATCH_MAX_SIZE = int(os.getenv("RECOMMENDATION_BATCH_MAX_SIZE", 10000))
+
+# Startup import time budgets, in seconds, enforced by `manage.py check_import_time`
+STARTUP_IMPORT_BUDGET_CHECK = float(os.getenv("STARTUP_IMPORT_BUDGET_CHECK", 1.5))
+STARTUP_IMPORT_BUDGET_WSGI = float(os.getenv("STARTUP_IMPORT_BUDGET_WSGI", 1.0))
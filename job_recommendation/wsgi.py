@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_recommendation.settings')
 
 application = get_wsgi_application()
+
+# Preload the recommendation index before the worker accepts traffic
+from django.conf import settings  # noqa: E402
+
+if settings.RECOMMENDATION_INDEX_WARM_UP:
+    from jobs.recommender import index_store  # noqa: E402
+
+    index_store.warm_up()
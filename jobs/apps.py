@@ -2,5 +2,25 @@ from django.apps import AppConfig
 
 
 class JobsConfig(AppConfig):
+    """
+    Configuration for the 'jobs' app in Django.
+
+    Attributes:
+        default_auto_field (str): The default field type for auto-generated primary keys.
+        name (str): The name of the app, in this case, 'jobs'.
+
+    Methods:
+        ready(self): Called when the app is ready. It imports the signals module to keep the recommendation index in
+            sync, and the system checks.
+    """
+
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        """
+        Connects the signal handlers that keep the recommendation index in sync with job changes, and registers the
+        system checks of the app.
+        """
+        import jobs.checks  # Register the system checks
+        import jobs.signals  # Import signals on app startup
@@ -0,0 +1,58 @@
+"""
+Bulk creation of jobs.
+
+Saving jobs one at a time runs one INSERT, one transaction and one queued index change per job. `create_jobs()`
+inserts many jobs with `bulk_create()` in batches instead, and queues their changes with a single INSERT as well; the
+recommendation index, the similar jobs and the cached recommendation responses are then updated in the background by
+the queue of job changes, in batches of `RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE`. `bulk_create()` neither calls
+`Job.save()` nor sends signals, so the term hashes `Job.save()` stores with the hashing vectorizer are computed here.
+"""
+
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Job
+from .recommender.changes import queue_job_changes
+from .recommender.hashing import stored_hashes
+
+
+def batched(iterable, size):
+    """
+    Splits an iterable into lists of at most `size` items, reading it lazily.
+
+    Args:
+        iterable (iterable): The items.
+        size (int): The largest number of items per list.
+
+    Yields:
+        list: The next items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def create_jobs(jobs, batch_size=None, reindex=True):
+    """
+    Inserts unsaved jobs with `bulk_create()` in batches, in a single transaction.
+
+    Args:
+        jobs (iterable): The unsaved `Job` instances.
+        batch_size (int): The number of jobs per INSERT. Defaults to `JOB_BULK_BATCH_SIZE`.
+        reindex (bool): Whether to queue the jobs, in the same transaction, to be added to the recommendation index.
+            Callers inserting several chunks of jobs can pass False and update the index once at the end.
+
+    Returns:
+        list: The created jobs, with their primary keys.
+    """
+    created = []
+    with transaction.atomic():
+        for batch in batched(jobs, batch_size or settings.JOB_BULK_BATCH_SIZE):
+            for job in batch:
+                job.skill_hashes = stored_hashes(job.required_skills)
+            created.extend(Job.objects.bulk_create(batch))
+        if reindex:
+            queue_job_changes(job.pk for job in created)
+    return created
@@ -0,0 +1,53 @@
+"""
+System checks of the jobs app.
+
+`check_search_triggers()` makes sure the FTS5 table used by the job search on SQLite is still kept in sync with the
+jobs table. Migrations that rebuild the jobs table on SQLite (altering a column, for example) drop its triggers, after
+which new and changed jobs silently stop being searchable.
+"""
+
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+
+from .search import FTS_TABLE
+
+SEARCH_TRIGGERS = tuple(f"{FTS_TABLE}_{event}" for event in ("insert", "delete", "update"))
+
+
+@register(Tags.database)
+def check_search_triggers(app_configs=None, databases=None, **kwargs):
+    """
+    Warns about SQLite databases whose job search table lacks one of the triggers keeping it in sync.
+
+    Args:
+        app_configs (list): The app configs to check, or None for all of them.
+        databases (list): The aliases of the databases to check. Database checks only run when asked for, for example
+            by `migrate` or `check --database`.
+
+    Returns:
+        list: A warning per database missing triggers.
+    """
+    warnings = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != "sqlite":
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT type, name FROM sqlite_master WHERE (type = 'table' AND name = %s) OR type = 'trigger'",
+                [FTS_TABLE],
+            )
+            names = {(kind, name) for kind, name in cursor.fetchall()}
+        if ("table", FTS_TABLE) not in names:
+            # The search migration has not run yet.
+            continue
+        missing = [trigger for trigger in SEARCH_TRIGGERS if ("trigger", trigger) not in names]
+        if missing:
+            warnings.append(Warning(
+                f"The job search table of the '{alias}' database lacks the triggers {', '.join(missing)}, so job "
+                f"changes are not searchable.",
+                hint="A migration rebuilt the jobs table. Reinstall the search table with "
+                     "jobs.search.install_sqlite_search() in a new migration.",
+                id="jobs.W001",
+            ))
+    return warnings
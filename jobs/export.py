@@ -0,0 +1,96 @@
+"""
+Streaming export of the job catalog as NDJSON.
+
+Jobs are read with `values()` through `.iterator(chunk_size=...)`, which uses a server-side cursor on PostgreSQL, and
+written as one JSON object per line while they are read, so memory use does not depend on the size of the catalog.
+Lines are grouped into chunks of about `EXPORT_BUFFER_SIZE` bytes before being handed to the response or file, and can
+be gzip-compressed on the fly.
+
+Incremental exports are driven by a watermark: an export includes the jobs posted up to about the time it started
+(`export_watermark()`) and returns that time, which the next export passes as `since` to only receive the jobs posted
+after it. Jobs are exported when they are posted; later edits are not exported again.
+"""
+
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+# The exported fields, as written in every line
+EXPORT_FIELDS = (
+    "id", "title", "company", "location", "salary_range", "required_skills", "experience_required", "posted_at",
+)
+
+# Approximate size in bytes of the chunks yielded by `ndjson_chunks()`
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def export_rows(since=None, until=None, chunk_size=None):
+    """
+    Returns the jobs of an export, in posting order, read through a server-side cursor.
+
+    Args:
+        since (datetime): Only jobs posted after this time are exported, or None for every job.
+        until (datetime): Only jobs posted up to this time are exported, or None for no limit.
+        chunk_size (int): The number of jobs fetched from the database at once. Defaults to `JOB_EXPORT_CHUNK_SIZE`.
+
+    Returns:
+        iterator: A dictionary of the exported fields and the recruiter's username ('recruiter_username') per job.
+    """
+    jobs = Job.objects.order_by("posted_at", "id")
+    if since is not None:
+        jobs = jobs.filter(posted_at__gt=since)
+    if until is not None:
+        jobs = jobs.filter(posted_at__lte=until)
+    return jobs.values(*EXPORT_FIELDS, recruiter_username=F("recruiter__username")).iterator(
+        chunk_size=chunk_size or settings.JOB_EXPORT_CHUNK_SIZE
+    )
+
+
+def ndjson_chunks(rows, compress=False):
+    """
+    Serializes rows as NDJSON, one JSON object per line, in chunks.
+
+    Args:
+        rows (iterable): The dictionaries to serialize.
+        compress (bool): Whether to gzip the output.
+
+    Yields:
+        bytes: The next chunk of the output.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes the gzip format
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    buffer, size = [], 0
+    for row in rows:
+        line = (encoder.encode(row) + "\n").encode("utf-8")
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_BUFFER_SIZE:
+            chunk = b"".join(buffer)
+            buffer, size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_watermark():
+    """
+    Returns the watermark of an export starting now: the latest posting time it includes.
+
+    The watermark lags `JOB_EXPORT_WATERMARK_LAG` seconds behind the current time, so a job whose transaction has not
+    committed yet when the export reads the catalog is left for the next export rather than skipped by both.
+
+    Returns:
+        datetime: The watermark.
+    """
+    return timezone.now() - timedelta(seconds=settings.JOB_EXPORT_WATERMARK_LAG)
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from jobs.recommender.changes import apply_job_changes
+
+
+class Command(BaseCommand):
+    """
+    Django management command to apply the queued job changes to the recommendation index and the similar jobs, and
+    the queued job seeker profile changes to the job seeker index.
+
+    Job and profile saves and deletions are queued in the database and applied in batches, each published as one index
+    version.
+    Web workers apply the queue in a background thread every `RECOMMENDATION_INDEX_UPDATE_INTERVAL` seconds; with an
+    interval of 0, run this command instead, once (for example from cron) or as a long-running process with
+    `--interval`.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the batch size and interval options.
+        handle(*args, **kwargs): Applies the queued changes, once or repeatedly.
+    """
+
+    help = "Apply the queued job and job seeker profile changes to the recommendation indexes and the similar jobs"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE,
+            help="Maximum number of changes applied and published at once.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Seconds between two runs, to keep applying changes until interrupted. 0 applies them once.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the application of the queued job changes.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'batch_size' and 'interval'.
+
+        Outputs:
+            Writes the number of applied changes and the time taken to the console.
+
+        Raises:
+            CommandError: If an option is out of range.
+        """
+        batch_size, interval = kwargs["batch_size"], kwargs["interval"]
+        if batch_size < 1 or interval < 0:
+            raise CommandError("--batch-size must be positive and --interval not negative.")
+
+        while True:
+            started = time.perf_counter()
+            # Without an interval, wait for another process applying changes instead of leaving the queue to it.
+            applied = apply_job_changes(batch_size, blocking=not interval)
+            elapsed = time.perf_counter() - started
+            if applied:
+                self.stdout.write(self.style.SUCCESS(f"Applied {applied} changes in {elapsed:.2f}s."))
+            elif not interval:
+                self.stdout.write("No changes queued.")
+            if not interval:
+                return
+            connections.close_all()
+            time.sleep(interval)
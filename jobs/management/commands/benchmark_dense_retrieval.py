@@ -0,0 +1,172 @@
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.management.commands.benchmark_recommendations import git_revision, summarize
+from jobs.recommender.synthetic import experience_years, job_skill_texts, locations, seeker_skill_texts
+
+
+class Command(BaseCommand):
+    """
+    Django management command to compare dense LSA retrieval with the exact TF-IDF ranking.
+
+    For every catalog size, this command builds a job index from reproducible synthetic jobs in memory, adds LSA
+    embeddings of every requested number of dimensions and type, and ranks synthetic job seeker skills both ways. It
+    reports the p50/p95/p99 latency of each mode, the recall of the dense top-K against the exact top-K of the
+    inverted index (the same ranking as the cosine similarity over the full TF-IDF matrix), the size of the embeddings
+    and the fitting time, and writes everything to a JSON file. No database rows are written.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the catalog sizes, dimensions, types, query count, seed and output options.
+        handle(*args, **kwargs): Runs the comparison for every catalog size and writes the results.
+    """
+
+    help = "Benchmark the latency and recall of dense LSA retrieval against the TF-IDF ranking"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--sizes", default="10000,100000",
+            help="Comma-separated numbers of synthetic jobs, for example 10000,100000.",
+        )
+        parser.add_argument(
+            "--dimensions", default="64,128,256", help="Comma-separated numbers of LSA dimensions to compare."
+        )
+        parser.add_argument(
+            "--dtypes", default="float32,float16", help="Comma-separated types to store the embeddings as."
+        )
+        parser.add_argument("--queries", type=int, default=200, help="Number of ranked skills texts per catalog size.")
+        parser.add_argument("--k", type=int, default=10, help="Number of jobs ranked per query.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+        parser.add_argument(
+            "--output", help="The JSON file to write. Defaults to var/benchmarks/dense-retrieval-<timestamp>.json."
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the benchmark run.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'sizes', 'dimensions', 'dtypes',
+                'queries', 'k', 'seed' and 'output'.
+
+        Outputs:
+            Writes the latency and recall of every configuration to the console and to the output file.
+
+        Raises:
+            CommandError: If an option is invalid.
+        """
+        try:
+            sizes = [int(size) for size in kwargs["sizes"].split(",")]
+            dimensions = [int(value) for value in kwargs["dimensions"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes and --dimensions must be comma-separated lists of integers.")
+        dtypes = kwargs["dtypes"].split(",")
+        if set(dtypes) - {"float32", "float16"}:
+            raise CommandError("--dtypes must only contain float32 and float16.")
+        if min(sizes + dimensions) < 1 or kwargs["queries"] < 1 or kwargs["k"] < 1:
+            raise CommandError("--sizes, --dimensions, --queries and --k must be positive.")
+
+        started_at = datetime.now(timezone.utc)
+        report = {
+            "generated_at": started_at.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: kwargs[key] for key in ("queries", "k", "seed")},
+            "results": [],
+        }
+        for size in sizes:
+            self.stdout.write(f"Benchmarking {size:,} jobs...")
+            report["results"].extend(self._run(size, dimensions, dtypes, kwargs))
+
+        output = kwargs["output"] or os.path.join(
+            settings.BASE_DIR, "var", "benchmarks", f"dense-retrieval-{started_at:%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote the results to {output}."))
+
+    def _run(self, size, dimensions, dtypes, options):
+        from jobs.recommender.index import JobIndex  # Imports the ML stack
+
+        seed, k = options["seed"], options["k"]
+        index = JobIndex.build(zip(
+            range(1, size + 1),
+            job_skill_texts(size, seed=seed),
+            experience_years(size, seed=seed + 3),
+            locations(size, seed=seed + 2),
+        ))
+        queries = seeker_skill_texts(options["queries"], seed=seed + 1)
+
+        # The first query pays for lazy initialization, which is not what is being measured.
+        index.top_k(queries[0], k)
+        exact, sparse_seconds = self._rank(index, queries, k, dense=False)
+        results = [{
+            "jobs": size,
+            "mode": "sparse",
+            "latency": summarize(sparse_seconds),
+            "recall": 1.0,
+        }]
+        self._print(results[-1])
+
+        for dimension in dimensions:
+            for dtype in dtypes:
+                started = time.perf_counter()
+                dense_index = index.with_embeddings(dimension, dtype)
+                fit_seconds = time.perf_counter() - started
+                if dense_index.embeddings is None:
+                    continue  # Too few jobs or terms for this many dimensions
+
+                dense_index.top_k(queries[0], k, dense=True)
+                ranked, dense_seconds = self._rank(dense_index, queries, k, dense=True)
+                recall = sum(
+                    len({job_id for job_id, _ in expected} & {job_id for job_id, _ in found}) / max(len(expected), 1)
+                    for expected, found in zip(exact, ranked)
+                ) / len(queries)
+                results.append({
+                    "jobs": size,
+                    "mode": "dense",
+                    "dimensions": int(dense_index.embeddings.shape[1]),
+                    "dtype": dtype,
+                    "fit_seconds": fit_seconds,
+                    "embedding_bytes": int(dense_index.embeddings.nbytes + dense_index.projection.nbytes),
+                    "latency": summarize(dense_seconds),
+                    "recall": recall,
+                })
+                self._print(results[-1])
+        return results
+
+    def _rank(self, index, queries, k, dense):
+        rankings, seconds = [], []
+        for query in queries:
+            started = time.perf_counter()
+            rankings.append(index.top_k(query, k, dense=dense))
+            seconds.append(time.perf_counter() - started)
+        return rankings, seconds
+
+    def _print(self, result):
+        latency = result["latency"]
+        label = "sparse" if result["mode"] == "sparse" else f"dense {result['dimensions']} {result['dtype']}"
+        line = (
+            f"  {label:<18} p50 {latency['p50_ms']:8.3f}ms  p95 {latency['p95_ms']:8.3f}ms  "
+            f"p99 {latency['p99_ms']:8.3f}ms  recall@k {result['recall']:.3f}"
+        )
+        if result["mode"] == "dense":
+            line += f"  {result['embedding_bytes'] / 2 ** 20:.1f} MiB, fit {result['fit_seconds']:.2f}s"
+        self.stdout.write(line)
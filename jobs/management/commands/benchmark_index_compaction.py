@@ -0,0 +1,188 @@
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.management.commands.benchmark_recommendations import git_revision, summarize
+from jobs.recommender.synthetic import experience_years, job_skill_texts, locations, seeker_skill_texts
+
+
+def matrix_bytes(matrix):
+    """
+    Returns the memory held by the arrays of a CSR or CSC matrix.
+
+    Args:
+        matrix (spmatrix): A compressed sparse matrix.
+
+    Returns:
+        int: The size of its values, indices and offsets in bytes.
+    """
+    return int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to measure the compact job index against the float64 matrix fitted by scikit-learn.
+
+    For every catalog size, this command vectorizes reproducible synthetic jobs in memory, once with the fitted
+    TfidfVectorizer (float64 values) as the exact reference, and once per pruning threshold as a compact job index
+    (float32 values, int32 indices, weights below the threshold dropped). It reports the memory of the job matrix and
+    its posting lists, the p50/p95/p99 latency of top-K retrieval from the inverted index, and the effect on ranking:
+    the recall of each top-K against the exact float64 top-K and the share of rankings that are identical. The
+    results are written to a JSON file. No database rows are written.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the catalog sizes, thresholds, query count, seed and output options.
+        handle(*args, **kwargs): Runs the comparison for every catalog size and writes the results.
+    """
+
+    help = "Benchmark the memory, latency and ranking of the compact and pruned job index"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument("--sizes", default="100000", help="Comma-separated numbers of synthetic jobs.")
+        parser.add_argument(
+            "--thresholds", default="0,0.05,0.1,0.15", help="Comma-separated pruning thresholds to compare."
+        )
+        parser.add_argument("--queries", type=int, default=200, help="Number of ranked skills texts per catalog size.")
+        parser.add_argument("--k", type=int, default=10, help="Number of jobs ranked per query.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+        parser.add_argument(
+            "--output", help="The JSON file to write. Defaults to var/benchmarks/index-compaction-<timestamp>.json."
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the benchmark run.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'sizes', 'thresholds', 'queries',
+                'k', 'seed' and 'output'.
+
+        Outputs:
+            Writes the memory, latency and ranking effect of every configuration to the console and to the output
+            file.
+
+        Raises:
+            CommandError: If an option is invalid.
+        """
+        try:
+            sizes = [int(size) for size in kwargs["sizes"].split(",")]
+            thresholds = [float(value) for value in kwargs["thresholds"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes and --thresholds must be comma-separated lists of numbers.")
+        if min(sizes) < 1 or min(thresholds) < 0 or kwargs["queries"] < 1 or kwargs["k"] < 1:
+            raise CommandError("--sizes, --queries and --k must be positive and --thresholds not negative.")
+
+        started_at = datetime.now(timezone.utc)
+        report = {
+            "generated_at": started_at.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: kwargs[key] for key in ("queries", "k", "seed")},
+            "results": [],
+        }
+        for size in sizes:
+            self.stdout.write(f"Benchmarking {size:,} jobs...")
+            report["results"].extend(self._run(size, thresholds, kwargs))
+
+        output = kwargs["output"] or os.path.join(
+            settings.BASE_DIR, "var", "benchmarks", f"index-compaction-{started_at:%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote the results to {output}."))
+
+    def _run(self, size, thresholds, options):
+        # Imports the ML stack
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        from jobs.recommender.index import JobIndex
+        from jobs.recommender.inverted import InvertedIndex, select_top_k
+        from jobs.recommender.text import analyze
+
+        seed, k = options["seed"], options["k"]
+        texts = job_skill_texts(size, seed=seed)
+        queries = seeker_skill_texts(options["queries"], seed=seed + 1)
+
+        # The exact reference: the float64 matrix fitted by scikit-learn, ranked by brute force.
+        vectorizer = TfidfVectorizer(analyzer=analyze)
+        reference = vectorizer.fit_transform(texts).tocsr()
+        reference_queries = vectorizer.transform(queries).tocsr()
+        products = (reference_queries @ reference.T).tocsr()
+        exact = [
+            select_top_k(products.indices[start:end], products.data[start:end], k)[0].tolist()
+            for start, end in zip(products.indptr[:-1], products.indptr[1:])
+        ]
+        reference_postings = InvertedIndex.from_matrix(reference)
+        seconds = self._time(lambda row: reference_postings.top_k(reference_queries[row], k), len(queries))
+        results = [{
+            "jobs": size,
+            "layout": "float64 (scikit-learn)",
+            "nonzeros": int(reference.nnz),
+            "matrix_bytes": matrix_bytes(reference),
+            "postings_bytes": matrix_bytes(reference.tocsc()),
+            "latency": summarize(seconds),
+            "recall": 1.0,
+            "identical_rankings": 1.0,
+        }]
+        self._print(results[-1])
+
+        index = JobIndex.build(zip(
+            range(size), texts, experience_years(size, seed=seed + 3), locations(size, seed=seed + 2)
+        ))
+        query_vectors = index.transform_many(queries)
+        for threshold in thresholds:
+            compact = index.pruned(threshold) if threshold else index
+            postings = compact.inverted
+            seconds = self._time(lambda row: postings.top_k(query_vectors[row], k), len(queries))
+            ranked = [postings.top_k(query_vectors[row], k)[0].tolist() for row in range(len(queries))]
+            results.append({
+                "jobs": size,
+                "layout": f"float32, pruned below {threshold:g}" if threshold else "float32",
+                "prune_threshold": threshold,
+                "nonzeros": int(compact.matrix.nnz),
+                "matrix_bytes": matrix_bytes(compact.matrix),
+                "postings_bytes": int(postings.weights.nbytes + postings.positions.nbytes + postings.indptr.nbytes),
+                "latency": summarize(seconds),
+                "recall": sum(
+                    len(set(expected) & set(found)) / max(len(expected), 1) for expected, found in zip(exact, ranked)
+                ) / len(queries),
+                "identical_rankings": sum(expected == found for expected, found in zip(exact, ranked)) / len(queries),
+            })
+            self._print(results[-1])
+        return results
+
+    def _time(self, rank, count):
+        # The first query pays for lazy initialization, which is not what is being measured.
+        rank(0)
+        seconds = []
+        for row in range(count):
+            started = time.perf_counter()
+            rank(row)
+            seconds.append(time.perf_counter() - started)
+        return seconds
+
+    def _print(self, result):
+        latency = result["latency"]
+        memory = (result["matrix_bytes"] + result["postings_bytes"]) / 2 ** 20
+        self.stdout.write(
+            f"  {result['layout']:<28} {memory:8.1f} MiB  {result['nonzeros']:>10,} weights  "
+            f"p50 {latency['p50_ms']:7.3f}ms  p99 {latency['p99_ms']:7.3f}ms  recall@k {result['recall']:.3f}  "
+            f"identical {result['identical_rankings']:.3f}"
+        )
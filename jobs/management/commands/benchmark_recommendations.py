@@ -0,0 +1,326 @@
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from jobs.models import Job
+from jobs.recommender import index_store
+from jobs.recommender.synthetic import experience_years, job_skill_texts, locations, seeker_skill_texts
+from jobs.recommender.timing import StageTimer, activate
+from jobs.views import JobRecommendationView
+from users.models import CustomUser, JobSeekerProfile
+
+# The stages of a recommendation request, roughly in the order the recommendation view runs them.
+STAGES = ("fetch", "cache", "preprocess", "vectorize", "score", "rank", "store", "serialize")
+
+
+def summarize(seconds):
+    """
+    Summarizes latency samples.
+
+    Args:
+        seconds (list): The samples, in seconds.
+
+    Returns:
+        dict: The mean, p50, p95 and p99 latency in milliseconds.
+    """
+    samples = [value * 1000 for value in seconds]
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = samples[0]
+    return {"mean_ms": statistics.fmean(samples), "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+
+
+def git_revision():
+    """
+    Returns the commit the code was checked out at, to tell benchmark results of different versions apart.
+
+    Returns:
+        str or None: The commit hash, or None outside of a git checkout.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+class Command(BaseCommand):
+    """
+    Django management command to benchmark job recommendations over synthetic catalogs.
+
+    For every catalog size, this command inserts reproducible synthetic jobs and job seeker profiles in a transaction
+    that is rolled back at the end, and publishes a job index of them to a temporary directory that the process-wide
+    index store is pointed at. It then sends recommendation requests for the synthetic job seekers through
+    `JobRecommendationView`, so they go through the same layers as real requests: the cached responses, the stored
+    recommendations, the ranker chain with its deadline, and the rankings cached for deeper pages. Each request is
+    timed with a `StageTimer`, per stage:
+
+    - fetch: reading the profile, its applications, the stored recommendations and the details of the jobs.
+    - cache: looking up the cached response.
+    - preprocess: analyzing the skills text.
+    - vectorize: turning the terms into a TF-IDF query.
+    - score: evaluating the filters and scoring the candidate jobs.
+    - rank: turning the scored positions into the ranked job ids.
+    - store: storing the computed recommendations and rankings.
+    - serialize: serializing and rendering the recommended jobs.
+
+    A stage a request skipped, such as scoring on a cache hit, counts as 0. Requests cycle through the job seekers, so
+    with more requests than job seekers the later ones are served from the caches.
+
+    It reports the p50/p95/p99 latency of each stage and of the whole request, the share of cached responses, the
+    rankers that answered, the peak memory traced while serving the requests and the index size, and writes everything
+    to a JSON file. Passing the file of an earlier run with
+    `--compare` prints the relative change of the p95 latencies, so regressions between versions stand out.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the catalog sizes, query counts, seed and output options.
+        handle(*args, **kwargs): Runs the benchmark for every catalog size and writes the results.
+    """
+
+    help = "Benchmark the recommendation stages on synthetic catalogs and write p50/p95/p99 latencies to a JSON file"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--sizes", default="1000,10000,100000",
+            help="Comma-separated numbers of synthetic jobs, for example 1000,10000,100000,1000000.",
+        )
+        parser.add_argument("--queries", type=int, default=200, help="Number of timed requests per catalog size.")
+        parser.add_argument(
+            "--memory-queries", type=int, default=20, help="Number of requests replayed with memory tracing on."
+        )
+        parser.add_argument("--seekers", type=int, default=100, help="Number of synthetic job seekers.")
+        parser.add_argument("--k", type=int, default=5, help="Number of recommendations per request.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data.")
+        parser.add_argument(
+            "--output", help="The JSON file to write. Defaults to var/benchmarks/recommendations-<timestamp>.json."
+        )
+        parser.add_argument("--compare", help="The JSON file of an earlier run to compare the p95 latencies with.")
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the benchmark run.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'sizes', 'queries', 'memory_queries',
+                'seekers', 'k', 'seed', 'output' and 'compare'.
+
+        Outputs:
+            Writes the latency percentiles of every stage and catalog size to the console and to the output file.
+
+        Raises:
+            CommandError: If an option is invalid.
+        """
+        try:
+            sizes = [int(size) for size in kwargs["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers.")
+        if min(sizes) < 1 or kwargs["queries"] < 1 or kwargs["seekers"] < 1 or kwargs["k"] < 1:
+            raise CommandError("--sizes, --queries, --seekers and --k must be positive.")
+
+        started_at = datetime.now(timezone.utc)
+        report = {
+            "generated_at": started_at.isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+            "parameters": {key: kwargs[key] for key in ("queries", "memory_queries", "seekers", "k", "seed")},
+            "results": [],
+        }
+        for size in sizes:
+            self.stdout.write(f"Benchmarking {size:,} jobs...")
+            result = self._run(size, kwargs)
+            report["results"].append(result)
+            self._print(result)
+
+        output = kwargs["output"] or os.path.join(
+            settings.BASE_DIR, "var", "benchmarks", f"recommendations-{started_at:%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote the results to {output}."))
+
+        if kwargs["compare"]:
+            self._compare(report, kwargs["compare"])
+
+    def _run(self, size, options):
+        seed = options["seed"]
+        directory = tempfile.mkdtemp(prefix="benchmark-index-")
+        # The view's own timer is disabled so it does not log or sample the requests: the timer of each request is
+        # activated here instead, and the stages the view times are recorded in it.
+        benchmark_settings = override_settings(
+            RECOMMENDATION_INDEX_DIR=directory,
+            RECOMMENDATION_INDEX_REBUILD_INTERVAL=0,
+            RECOMMENDATION_TIMING_ENABLED=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        )
+        try:
+            with benchmark_settings, transaction.atomic():
+                index_store.reset()
+                # One more job seeker warms up, so no measured request finds its response cached by the warm-up.
+                *seekers, warm_up = self._populate(size, options["seekers"] + 1, seed)
+
+                started = time.perf_counter()
+                index = index_store.rebuild()
+                build_seconds = time.perf_counter() - started
+                index_directory = index_store.version_directory(index.version)
+                index_bytes = sum(entry.stat().st_size for entry in os.scandir(index_directory))
+
+                # The first request pays for lazy initialization, which is not what is being measured.
+                self._request(warm_up, options["k"])
+                timings = {stage: [] for stage in STAGES}
+                totals, cached, rankers = [], 0, Counter()
+                for query in range(options["queries"]):
+                    timer, ranker = self._request(seekers[query % len(seekers)], options["k"])
+                    for stage in STAGES:
+                        timings[stage].append(timer.stages.get(stage, 0.0))
+                    totals.append(timer.total)
+                    cached += timer.counters.get("cached", 0)
+                    rankers[ranker] += 1
+
+                tracemalloc.start()
+                for query in range(options["memory_queries"]):
+                    self._request(seekers[query % len(seekers)], options["k"])
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                transaction.set_rollback(True)
+        finally:
+            index_store.reset()
+            shutil.rmtree(directory, ignore_errors=True)
+
+        return {
+            "jobs": size,
+            "build_seconds": build_seconds,
+            "index_bytes": index_bytes,
+            "request_peak_bytes": peak_bytes,
+            "max_rss_bytes": self._max_rss(),
+            "cached_ratio": cached / options["queries"],
+            "rankers": dict(rankers),
+            "stages": {stage: summarize(timings[stage]) for stage in STAGES},
+            "total": summarize(totals),
+        }
+
+    def _populate(self, size, seekers, seed):
+        recruiter = CustomUser.objects.create(username="benchmark-recruiter", role="recruiter")
+        Job.objects.bulk_create(
+            (
+                Job(
+                    recruiter=recruiter,
+                    title=f"Synthetic job {number}",
+                    company="Benchmark",
+                    location=location,
+                    salary_range="",
+                    required_skills=skills,
+                    experience_required=experience,
+                )
+                for number, (skills, location, experience) in enumerate(zip(
+                    job_skill_texts(size, seed=seed),
+                    locations(size, seed=seed + 2),
+                    experience_years(size, seed=seed + 3),
+                ))
+            ),
+            batch_size=5000,
+        )
+        # Synthetic jobs are not queued by the signal handlers, since bulk_create() does not send post_save: the
+        # index is built from the database instead.
+        users = CustomUser.objects.bulk_create(
+            CustomUser(username=f"benchmark-seeker-{number}", role="job_seeker") for number in range(seekers)
+        )
+        JobSeekerProfile.objects.bulk_create(
+            JobSeekerProfile(user=user, skills=skills, experience=experience, preferred_location=location)
+            for user, skills, experience, location in zip(
+                users,
+                seeker_skill_texts(seekers, seed=seed + 1),
+                experience_years(seekers, seed=seed + 4),
+                locations(seekers, seed=seed + 5),
+            )
+        )
+        return [user.pk for user in users]
+
+    def _request(self, user_id, k):
+        request = APIRequestFactory().get(reverse("job-recommendations"), {"k": k})
+        # Authentication is not part of the view, so the user is read before the clock starts.
+        force_authenticate(request, user=CustomUser.objects.get(pk=user_id))
+        with activate(StageTimer()) as timer:
+            response = JobRecommendationView.as_view()(request)
+            with timer.stage("serialize"):
+                response.render()
+        timer.finish()
+        if response.status_code != 200:
+            raise CommandError(f"The recommendation request failed with status {response.status_code}.")
+        return timer, response.data.get("ranker")
+
+    def _max_rss(self):
+        try:
+            import resource
+        except ImportError:
+            return None  # Not available on Windows
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Reported in bytes on macOS and in kilobytes elsewhere.
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def _print(self, result):
+        for name, summary in [*result["stages"].items(), ("total", result["total"])]:
+            self.stdout.write(
+                f"  {name:<10} p50 {summary['p50_ms']:8.3f}ms  p95 {summary['p95_ms']:8.3f}ms  "
+                f"p99 {summary['p99_ms']:8.3f}ms"
+            )
+        self.stdout.write(
+            f"  build {result['build_seconds']:.2f}s, index {result['index_bytes'] / 2 ** 20:.1f} MiB, "
+            f"request peak {result['request_peak_bytes'] / 2 ** 20:.1f} MiB"
+        )
+        rankers = ", ".join(f"{name} {count}" for name, count in result["rankers"].items())
+        self.stdout.write(f"  {result['cached_ratio']:.0%} cached responses, rankers: {rankers}")
+
+    def _compare(self, report, path):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                baseline = {result["jobs"]: result for result in json.load(handle)["results"]}
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f"Could not read the results to compare with: {error}")
+
+        self.stdout.write(f"Change of the p95 latency against {path}:")
+        for result in report["results"]:
+            previous = baseline.get(result["jobs"])
+            if previous is None:
+                continue
+            changes = []
+            for name in [*STAGES, "total"]:
+                current = result["total"] if name == "total" else result["stages"][name]
+                before = previous["total"] if name == "total" else previous["stages"].get(name)
+                if before and before["p95_ms"]:
+                    changes.append(f"{name} {(current['p95_ms'] / before['p95_ms'] - 1) * 100:+.0f}%")
+            self.stdout.write(f"  {result['jobs']:,} jobs: {', '.join(changes)}")
@@ -0,0 +1,115 @@
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from jobs.recommender.synthetic import job_skill_texts
+from jobs.recommender.text import analyze, analyze_batch, get_stop_words
+
+
+def legacy_pipeline(texts):
+    """
+    Runs the preprocessing and vectorization the recommendation view used before the skill-text normalizer.
+
+    Each text goes through `DataFrame.apply` with NLTK's `word_tokenize`, stopword and punctuation filtering and a
+    join, and the result is re-tokenized by the default `TfidfVectorizer` analyzer. If NLTK's punkt data is not
+    installed, its rule-based word tokenizer is used instead, which skips the sentence splitting step.
+
+    Args:
+        texts (list): The raw skills texts.
+
+    Returns:
+        str: The name of the tokenizer that was used.
+    """
+    import pandas as pd
+    from nltk.tokenize import NLTKWordTokenizer, word_tokenize
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    try:
+        word_tokenize("probe")
+        tokenizer, tokenizer_name = word_tokenize, "word_tokenize"
+    except LookupError:
+        tokenizer, tokenizer_name = NLTKWordTokenizer().tokenize, "NLTKWordTokenizer (punkt not installed)"
+
+    job_data = pd.DataFrame({"required_skills": texts})
+    stop_words = set(get_stop_words())
+
+    def preprocess(text):
+        tokens = tokenizer(text.lower())
+        tokens = [word for word in tokens if word not in stop_words and word not in string.punctuation]
+        return " ".join(tokens)
+
+    job_data["processed_skills"] = job_data["required_skills"].apply(lambda x: preprocess(x.lower()))
+    TfidfVectorizer().fit_transform(job_data["processed_skills"])
+    return tokenizer_name
+
+
+def current_pipeline(texts):
+    """
+    Runs the current preprocessing and vectorization, with `analyze` as the vectorizer's analyzer.
+
+    Args:
+        texts (list): The raw skills texts.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    TfidfVectorizer(analyzer=analyze).fit_transform(texts)
+
+
+class Command(BaseCommand):
+    """
+    Django management command to benchmark the skill-text preprocessing pipeline.
+
+    This command generates reproducible synthetic job descriptions and measures the throughput of the former
+    preprocessing (pandas apply + NLTK tokenization + TF-IDF re-tokenization) against the compiled skill-text
+    analyzer, both on its own and plugged into the TF-IDF vectorizer.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the number of job descriptions and the random seed.
+        handle(*args, **kwargs): Runs each pipeline and reports its throughput.
+    """
+
+    help = "Benchmark the skill-text preprocessing pipeline against the former pandas/NLTK implementation"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument("--size", type=int, default=100000, help="Number of synthetic job descriptions.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic job descriptions.")
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the benchmark run.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'size' and 'seed'.
+
+        Outputs:
+            Writes the time and throughput of each pipeline, and the overall speedup, to the console.
+        """
+        texts = job_skill_texts(kwargs["size"], seed=kwargs["seed"])
+        self.stdout.write(f"Benchmarking on {len(texts)} synthetic job descriptions...")
+
+        timings = {}
+        for name, run in [
+            ("legacy (pandas + nltk + tfidf)", legacy_pipeline),
+            ("analyze_batch", analyze_batch),
+            ("tfidf with analyze", current_pipeline),
+        ]:
+            started = time.perf_counter()
+            result = run(texts)
+            timings[name] = time.perf_counter() - started
+            note = f" [{result}]" if isinstance(result, str) else ""
+            self.stdout.write(
+                f"{name}: {timings[name]:.2f}s, {len(texts) / timings[name]:,.0f} docs/s{note}"
+            )
+
+        speedup = timings["legacy (pandas + nltk + tfidf)"] / timings["tfidf with analyze"]
+        self.stdout.write(self.style.SUCCESS(f"Speedup of the TF-IDF build: {speedup:.1f}x"))
@@ -0,0 +1,111 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules that must only be imported when a recommendation is first computed, never at startup.
+HEAVY_MODULES = ("numpy", "scipy", "sklearn", "nltk", "pandas")
+
+PROBES = {
+    "check": (
+        "import django\n"
+        "django.setup()\n"
+        "from django.core.management import call_command\n"
+        "call_command('check', verbosity=0)\n"
+    ),
+    "wsgi": (
+        "import job_recommendation.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+}
+
+PROBE_TEMPLATE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+class Command(BaseCommand):
+    """
+    Django management command to measure startup import time against a budget.
+
+    This command runs `manage.py check` and the import of the WSGI application (including its URLconf) in fresh
+    interpreters, a few times each, and compares the median time with `STARTUP_IMPORT_BUDGET_CHECK` and
+    `STARTUP_IMPORT_BUDGET_WSGI`. It also fails if any part of the ML stack was imported at startup, since the
+    recommendation engine is meant to load it on first use only.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the number of repetitions.
+        handle(*args, **kwargs): Measures both startup paths and reports them against their budgets.
+    """
+
+    help = "Measure the import time of `manage.py check` and the WSGI app against their budgets"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument("--repeat", type=int, default=3, help="Number of measurements per startup path.")
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the measurement of the startup paths.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'repeat'.
+
+        Outputs:
+            Writes the median time and budget of each startup path to the console.
+
+        Raises:
+            CommandError: If a startup path exceeds its budget or imports part of the ML stack.
+        """
+        budgets = {
+            "check": settings.STARTUP_IMPORT_BUDGET_CHECK,
+            "wsgi": settings.STARTUP_IMPORT_BUDGET_WSGI,
+        }
+        failures = []
+
+        for name, statement in PROBES.items():
+            runs = [self._measure(statement) for _ in range(kwargs["repeat"])]
+            elapsed = statistics.median(run["elapsed"] for run in runs)
+            heavy = sorted({module for run in runs for module in run["heavy"]})
+
+            line = f"{name}: {elapsed:.3f}s (budget {budgets[name]:.3f}s)"
+            if elapsed > budgets[name]:
+                failures.append(f"{name} took {elapsed:.3f}s, over its budget of {budgets[name]:.3f}s")
+            if heavy:
+                failures.append(f"{name} imported {', '.join(heavy)} at startup")
+                line += f", imported {', '.join(heavy)}"
+            self.stdout.write(line)
+
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Startup import time is within budget."))
+
+    def _measure(self, statement):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "job_recommendation.settings"
+        ))
+        code = PROBE_TEMPLATE.format(statement=statement, heavy=HEAVY_MODULES)
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup probe failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
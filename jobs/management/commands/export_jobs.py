@@ -0,0 +1,94 @@
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from jobs.export import export_rows, export_watermark, ndjson_chunks
+
+
+class Command(BaseCommand):
+    """
+    Django management command to export the job catalog, or the jobs posted since a watermark, as NDJSON.
+
+    This command streams every job, in posting order, as one JSON object per line to a file or to standard output,
+    reading the jobs through a server-side cursor so memory use does not depend on the size of the catalog. The
+    watermark of the export is written to standard error; pass it as `--since` to the next export to only receive the
+    jobs posted after it.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the output, watermark, compression and chunk size options.
+        handle(*args, **kwargs): Writes the exported jobs and reports the watermark.
+    """
+
+    help = "Export the job catalog as NDJSON, optionally only the jobs posted since a watermark"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument("--output", default="-", help="The file to write, or '-' for standard output.")
+        parser.add_argument(
+            "--since", help="The watermark of the previous export (ISO 8601); only jobs posted after it are exported."
+        )
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=settings.JOB_EXPORT_CHUNK_SIZE,
+            help="Number of jobs fetched from the database at once.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the export of the job catalog.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'output', 'since', 'gzip' and
+                'chunk_size'.
+
+        Outputs:
+            Writes the jobs to the output, and the number of jobs, the export time and the watermark to standard
+            error.
+
+        Raises:
+            CommandError: If the watermark is not a valid time with a time zone or the chunk size is not positive.
+        """
+        since = None
+        if kwargs["since"]:
+            since = parse_datetime(kwargs["since"])
+            if since is None or since.tzinfo is None:
+                raise CommandError("--since must be an ISO 8601 time with a time zone, as reported by an export.")
+        if kwargs["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        started = time.perf_counter()
+        watermark = export_watermark()
+        exported = 0
+
+        def counted(rows):
+            nonlocal exported
+            for row in rows:
+                exported += 1
+                yield row
+
+        output = sys.stdout.buffer if kwargs["output"] == "-" else open(kwargs["output"], "wb")
+        try:
+            rows = export_rows(since=since, until=watermark, chunk_size=kwargs["chunk_size"])
+            for chunk in ndjson_chunks(counted(rows), compress=kwargs["gzip"]):
+                output.write(chunk)
+        finally:
+            if output is sys.stdout.buffer:
+                output.flush()
+            else:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {exported} jobs in {elapsed:.2f}s. Watermark: {watermark.isoformat()}"
+        ))
@@ -0,0 +1,155 @@
+import csv
+import json
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from jobs.bulk import batched, create_jobs
+from jobs.models import Job
+from jobs.recommender import index_store
+from jobs.recommender.changes import reindex_jobs
+from jobs.recommender.responses import bump_catalog_version
+from jobs.serializers import JobSerializer
+
+
+class Command(BaseCommand):
+    """
+    Django management command to import job postings from a CSV or JSON Lines file.
+
+    This command streams the file: records are read, validated with the same rules as the job API and inserted with
+    `bulk_create()` one batch at a time, each batch in its own transaction, so memory use does not depend on the size
+    of the file and an interrupted import keeps the batches it completed. Invalid records are reported with their line
+    number and skipped. CSV files need a header row naming the job fields (title, company, location, salary_range,
+    required_skills, experience_required); JSON Lines files hold one job object per line.
+
+    The recommendation index is updated once at the end: the imported jobs are added to it, along with their similar
+    jobs, or, past `--reindex-limit` jobs, the index is rebuilt from the database instead.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the file, format, recruiter, batch size and reindex limit options.
+        handle(*args, **kwargs): Imports the jobs batch by batch and updates the recommendation index.
+    """
+
+    help = "Import job postings from a CSV or JSON Lines file in batches"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument("path", help="The file to import, or '-' to read standard input.")
+        parser.add_argument(
+            "--format", choices=("csv", "jsonl"),
+            help="The format of the file. Defaults to the file extension, or JSON Lines for standard input.",
+        )
+        parser.add_argument("--recruiter", required=True, help="The username of the recruiter posting the jobs.")
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.JOB_BULK_BATCH_SIZE,
+            help="Number of jobs inserted per batch.",
+        )
+        parser.add_argument(
+            "--reindex-limit", type=int, default=10000,
+            help="Largest number of imported jobs added to the recommendation index one by one; the index is rebuilt "
+                 "for larger imports.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the import of the jobs.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'path', 'format', 'recruiter',
+                'batch_size' and 'reindex_limit'.
+
+        Outputs:
+            Writes the progress of every batch, the skipped records and a summary to the console.
+
+        Raises:
+            CommandError: If the recruiter does not exist or an option is out of range.
+        """
+        path, batch_size, reindex_limit = kwargs["path"], kwargs["batch_size"], kwargs["reindex_limit"]
+        if batch_size < 1 or reindex_limit < 0:
+            raise CommandError("--batch-size must be positive and --reindex-limit not negative.")
+        try:
+            recruiter = get_user_model().objects.get(username=kwargs["recruiter"], role="recruiter")
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No recruiter named '{kwargs['recruiter']}'.")
+        file_format = kwargs["format"] or ("csv" if path.lower().endswith(".csv") else "jsonl")
+
+        started = time.perf_counter()
+        imported, skipped, job_ids = 0, 0, []
+        handle = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        try:
+            records = self._records(handle, file_format)
+            for number, batch in enumerate(batched(self._jobs(records, recruiter), batch_size), start=1):
+                jobs = [job for job in batch if job is not None]
+                skipped += len(batch) - len(jobs)
+                created = create_jobs(jobs, batch_size, reindex=False)
+                imported += len(created)
+                if imported <= reindex_limit:
+                    job_ids.extend(job.pk for job in created)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"Batch {number}: imported {len(created)} jobs ({imported} in total, {skipped} skipped, "
+                    f"{imported / max(elapsed, 1e-9):,.0f} jobs/s)."
+                )
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+        if imported and imported <= reindex_limit:
+            reindex_jobs(job_ids)
+            self.stdout.write(f"Added {imported} jobs to the recommendation index.")
+        elif imported:
+            index = index_store.rebuild()
+            bump_catalog_version()
+            self.stdout.write(
+                f"Rebuilt the recommendation index with {len(index)} jobs. Run refresh_similar_jobs to compute the "
+                f"similar jobs of the imported ones."
+            )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} jobs in {elapsed:.2f}s, skipped {skipped} invalid records."
+        ))
+
+    def _records(self, handle, file_format):
+        # Yields (line number, record) pairs without reading the whole file.
+        if file_format == "csv":
+            reader = csv.DictReader(handle)
+            for record in reader:
+                yield reader.line_num, record
+            return
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                yield line_number, error
+
+    def _jobs(self, records, recruiter):
+        # Yields an unsaved job per valid record and None per invalid one, so batches keep their progress counts.
+        for line_number, record in records:
+            if isinstance(record, json.JSONDecodeError):
+                self.stderr.write(f"Line {line_number}: invalid JSON ({record}).")
+                yield None
+                continue
+            if not isinstance(record, dict):
+                self.stderr.write(f"Line {line_number}: not a job object.")
+                yield None
+                continue
+            serializer = JobSerializer(data=record)
+            if not serializer.is_valid():
+                self.stderr.write(f"Line {line_number}: {json.dumps(serializer.errors)}")
+                yield None
+                continue
+            yield Job(recruiter=recruiter, **serializer.validated_data)
@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.recommender import index_store, seeker_index_store
+
+
+class Command(BaseCommand):
+    """
+    Django management command to rebuild the job recommendation index.
+
+    This command refits the TF-IDF vectorizer on the full job catalog and publishes it as a new version of the index
+    directory used by the recommendation endpoint. Running web workers switch to the new version on their next
+    request. It is intended to be run from cron or a deployment hook, in addition to the incremental updates made
+    when jobs change. The job seeker index used to rank candidates is rebuilt right after, so it picks up the refitted
+    vocabulary.
+
+    With several workers, the job catalog is split into shards of consecutive job ids that are tokenized and vectorized
+    in a process pool, and merged into the same index a single process would build.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the worker and shard size options.
+        handle(*args, **kwargs): Rebuilds the indexes and reports their size, build time and throughput.
+    """
+
+    help = "Rebuild the job recommendation index from the database"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Number of processes vectorizing shards of the job catalog in parallel, for example the number of "
+                 "CPUs.",
+        )
+        parser.add_argument(
+            "--shard-size", type=int, default=settings.RECOMMENDATION_INDEX_SHARD_SIZE,
+            help="Number of jobs per shard.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the rebuild of the job recommendation index.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'workers' and 'shard_size'.
+
+        Outputs:
+            Writes the number of indexed jobs and job seekers, the build times and the job throughput to the console.
+
+        Raises:
+            CommandError: If an option is not positive.
+        """
+        workers, shard_size = kwargs["workers"], kwargs["shard_size"]
+        if min(workers, shard_size) < 1:
+            raise CommandError("--workers and --shard-size must be positive.")
+
+        started = time.perf_counter()
+        index = index_store.rebuild(workers=workers, shard_size=shard_size)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index)} jobs in {elapsed:.2f}s with {workers} worker{'s' if workers > 1 else ''} "
+            f"({len(index) / max(elapsed, 1e-9):,.0f} jobs/s, {index_store.directory})."
+        ))
+
+        started = time.perf_counter()
+        seeker_index = seeker_index_store.rebuild()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(seeker_index)} job seekers in {elapsed:.2f}s ({seeker_index_store.directory})."
+        ))
@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.recommender.hashing import compute_idf, save_idf
+from jobs.recommender.store import hashed_job_rows
+
+
+class Command(BaseCommand):
+    """
+    Django management command to recompute the IDF weights of the hashing vectorizer.
+
+    This command reads the term hashes stored on every job, computes the IDF weight of every hashed column and writes
+    them to `RECOMMENDATION_HASHING_IDF_PATH` (or the given file). The file is small and self-contained: copy it to the
+    other nodes however other files are deployed, and every node picks it up on its next rebuild of the job index. It
+    is only used when `RECOMMENDATION_VECTORIZER` is "hashing".
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the output option.
+        handle(*args, **kwargs): Computes and writes the IDF weights.
+    """
+
+    help = "Recompute the IDF weights of the hashed term columns from the job catalog"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--output", default=settings.RECOMMENDATION_HASHING_IDF_PATH,
+            help="The .npy file to write. Defaults to RECOMMENDATION_HASHING_IDF_PATH.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the computation of the IDF weights.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'output'.
+
+        Outputs:
+            Writes the number of jobs, the size of the weights and the computation time to the console.
+        """
+        started = time.perf_counter()
+        jobs = 0
+
+        def term_hashes():
+            nonlocal jobs
+            for _, skill_hashes, _, _ in hashed_job_rows():
+                jobs += 1
+                yield skill_hashes
+
+        idf = compute_idf(term_hashes(), settings.RECOMMENDATION_HASHING_FEATURES)
+        save_idf(idf, kwargs["output"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Computed the IDF weights of {len(idf)} columns from {jobs} jobs in {elapsed:.2f}s "
+            f"({idf.nbytes / 2 ** 20:.1f} MiB, {kwargs['output']})."
+        ))
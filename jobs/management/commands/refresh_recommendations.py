@@ -0,0 +1,80 @@
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.models import JobSeekerProfile
+from jobs.recommender import index_store
+from jobs.recommender.materialized import materialize
+
+
+class Command(BaseCommand):
+    """
+    Django management command to precompute the job recommendations of every job seeker.
+
+    This command scores job seekers against the current job index in large batches of sparse matrix products, bounded
+    by `RECOMMENDATION_BATCH_MEMORY_BUDGET`, and stores their ranked top-K jobs in the `SeekerRecommendation` table.
+    The recommendation endpoint then serves those rows directly until the seeker's profile changes, the job index is
+    rebuilt, or applied job changes delete them. Run it after each full build of the job index.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the batch size and top-K options.
+        handle(*args, **kwargs): Scores all job seekers batch by batch and stores their recommendations.
+    """
+
+    help = "Precompute and store the top job recommendations of every job seeker"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of job seekers read and stored per batch.",
+        )
+        parser.add_argument(
+            "--top-k", type=int, default=settings.RECOMMENDATION_MATERIALIZED_TOP_K,
+            help="Number of recommendations stored per job seeker.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the refresh of the stored recommendations.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'batch_size' and 'top_k'.
+
+        Outputs:
+            Writes the progress and a summary to the console.
+        """
+        batch_size = kwargs["batch_size"]
+        top_k = kwargs["top_k"]
+
+        index = index_store.get()
+        if not len(index):
+            self.stdout.write(self.style.WARNING("No jobs available, nothing to recommend."))
+            return
+
+        started = time.perf_counter()
+        profiles = JobSeekerProfile.objects.only(
+            "id", "user_id", "skills", "experience", "preferred_location"
+        ).order_by("id").iterator(chunk_size=batch_size)
+        total = 0
+        while batch := list(islice(profiles, batch_size)):
+            # Job changes applied meanwhile publish new versions, and rows are only stored for the published one.
+            index = index_store.get()
+            materialize(index, batch, top_k, memory_budget=settings.RECOMMENDATION_BATCH_MEMORY_BUDGET)
+            total += len(batch)
+            self.stdout.write(f"Scored {total} job seekers...")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored recommendations for {total} job seekers in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,94 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.recommender import index_store
+from jobs.recommender.similar import compute_similar_jobs, store_similar_jobs
+
+
+class Command(BaseCommand):
+    """
+    Django management command to precompute the most similar jobs of every job posting.
+
+    This command multiplies blocks of rows of the job matrix against the whole matrix, bounded by
+    `RECOMMENDATION_BATCH_MEMORY_BUDGET` per product, and stores the top-N most similar jobs of every job in the
+    `SimilarJob` table. Blocks are scored by several worker processes, which memory-map the current index version
+    instead of copying it. Created, updated and deleted jobs keep the table up to date afterwards, except for jobs
+    whose list was empty; running the command again, for example after a rebuild of the index refitted the vocabulary
+    or a large import, recomputes every list. Queued job changes are applied once the command is done.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        add_arguments(parser): Adds the top-N, block size and worker options.
+        handle(*args, **kwargs): Scores all jobs block by block and stores their similar jobs.
+    """
+
+    help = "Precompute and store the most similar jobs of every job posting"
+
+    def add_arguments(self, parser):
+        """
+        Adds command line options.
+
+        Args:
+            parser (ArgumentParser): The parser of the command.
+        """
+        parser.add_argument(
+            "--top-n", type=int, default=settings.RECOMMENDATION_SIMILAR_JOBS_TOP_N,
+            help="Number of similar jobs stored per job.",
+        )
+        parser.add_argument(
+            "--block-size", type=int, default=1000,
+            help="Number of jobs scored and stored per block.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Number of processes scoring blocks in parallel. Defaults to the number of CPUs.",
+        )
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the refresh of the stored similar jobs.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command, including 'top_n', 'block_size' and 'workers'.
+
+        Outputs:
+            Writes the progress and a summary to the console.
+
+        Raises:
+            CommandError: If an option is not positive.
+        """
+        top_n, block_size, workers = kwargs["top_n"], kwargs["block_size"], kwargs["workers"]
+        if min(top_n, block_size, workers) < 1:
+            raise CommandError("--top-n, --block-size and --workers must be positive.")
+
+        # Queued job changes wait for the lock, and are applied on top of the recomputed lists.
+        with index_store.locked():
+            index = index_store.get()
+            if not len(index):
+                self.stdout.write(self.style.WARNING("No jobs available, nothing to compare."))
+                return
+
+            started = time.perf_counter()
+            directory = index_store.version_directory(index.version)
+            total = 0
+            for job_ids, similar in compute_similar_jobs(
+                index,
+                top_n,
+                block_size,
+                workers=workers,
+                directory=directory if os.path.isdir(directory) else None,
+                memory_budget=settings.RECOMMENDATION_BATCH_MEMORY_BUDGET,
+            ):
+                store_similar_jobs(job_ids, similar)
+                total += len(job_ids)
+                self.stdout.write(f"Compared {total} of {len(index)} jobs...")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored the similar jobs of {total} jobs in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from jobs.recommender import index_store
+
+
+class Command(BaseCommand):
+    """
+    Django management command to preload the job recommendation index.
+
+    This command opens the current version of the index (building it if none was published yet) and reads all of its
+    pages. The pages stay in the operating system's page cache, which every worker mapping the index shares, so
+    running it from a deployment hook before workers start taking traffic spares their first requests the disk reads.
+    To also warm each worker process itself, set `RECOMMENDATION_INDEX_WARM_UP=True`.
+
+    Attributes:
+        help (str): A brief description of the command's purpose.
+
+    Methods:
+        handle(*args, **kwargs): Loads the index and reports its version, size and load time.
+    """
+
+    help = "Preload the job recommendation index into memory"
+
+    def handle(self, *args, **kwargs):
+        """
+        Handles the warm-up of the job recommendation index.
+
+        Args:
+            *args (tuple): Additional positional arguments passed to the command.
+            **kwargs (dict): Keyword arguments passed to the command.
+
+        Outputs:
+            Writes the version and size of the index and the warm-up time to the console.
+        """
+        started = time.perf_counter()
+        index = index_store.warm_up()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed up index version {index.version} with {len(index)} jobs in {elapsed:.2f}s "
+            f"({index_store.directory})."
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        ('users', '0002_jobseekerprofile_recruiterprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeekerRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_hash', models.CharField(max_length=64)),
+                ('index_version', models.CharField(max_length=32)),
+                ('job_ids', models.JSONField(default=list)),
+                ('scores', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation', to='users.jobseekerprofile')),
+            ],
+        ),
+    ]
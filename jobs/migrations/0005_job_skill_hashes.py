@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_similarjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='skill_hashes',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
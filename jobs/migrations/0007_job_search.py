@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:05
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+# The full-text index as of this migration. The definitions are kept here rather than imported from `jobs.search`, so
+# later changes to the app do not change what this migration does.
+SEARCH_INDEX_NAME = "job_search_idx"
+
+SQLITE_SEARCH_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5("
+    "title, company, required_skills, content='jobs_job', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS jobs_job_fts_insert AFTER INSERT ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts(rowid, title, company, required_skills) "
+    "VALUES (new.id, new.title, new.company, new.required_skills); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_job_fts_delete AFTER DELETE ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, company, required_skills) "
+    "VALUES ('delete', old.id, old.title, old.company, old.required_skills); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_job_fts_update AFTER UPDATE ON jobs_job BEGIN "
+    "INSERT INTO jobs_job_fts(jobs_job_fts, rowid, title, company, required_skills) "
+    "VALUES ('delete', old.id, old.title, old.company, old.required_skills); "
+    "INSERT INTO jobs_job_fts(rowid, title, company, required_skills) "
+    "VALUES (new.id, new.title, new.company, new.required_skills); END",
+    "INSERT INTO jobs_job_fts(jobs_job_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SEARCH_SQL = [
+    "DROP TRIGGER IF EXISTS jobs_job_fts_insert",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_delete",
+    "DROP TRIGGER IF EXISTS jobs_job_fts_update",
+    "DROP TABLE IF EXISTS jobs_job_fts",
+]
+
+
+def postgresql_search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    vector = (
+        SearchVector("title", weight="A", config="english")
+        + SearchVector("company", weight="B", config="english")
+        + SearchVector("required_skills", weight="C", config="english")
+    )
+    return GinIndex(vector, name=SEARCH_INDEX_NAME)
+
+
+def create_search_index(apps, schema_editor):
+    # The full-text index depends on the database: a GIN index on PostgreSQL, an FTS5 table on SQLite.
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.add_index(apps.get_model("jobs", "Job"), postgresql_search_index())
+    elif vendor == "sqlite":
+        for statement in SQLITE_SEARCH_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.remove_index(apps.get_model("jobs", "Job"), postgresql_search_index())
+    elif vendor == "sqlite":
+        for statement in SQLITE_DROP_SEARCH_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_posted_at_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(django.db.models.functions.text.Lower('location'), models.F('posted_at'), name='job_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['experience_required', 'posted_at'], name='job_experience_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_jobchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchEntry',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='jobs.job')),
+            ],
+            options={
+                'db_table': 'jobs_job_fts',
+                'managed': False,
+            },
+        ),
+    ]
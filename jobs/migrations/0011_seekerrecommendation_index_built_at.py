@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_seekerchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seekerrecommendation',
+            name='index_built_at',
+            field=models.FloatField(default=0),
+        ),
+    ]
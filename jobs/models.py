@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -21,8 +22,12 @@ class Job(models.Model):
         required_skills (TextField): The skills required to perform the job.
         experience_required (IntegerField): The minimum years of experience required for the job.
         posted_at (DateTimeField): The date and time when the job was posted.
+        skill_hashes (JSONField): The [term hash, count] pairs of the required skills, computed when the job is saved
+            with the hashing vectorizer so that a hashed recommendation index is built without analyzing the texts
+            again. Null for jobs saved with the TF-IDF vectorizer or before they were stored.
 
     Methods:
+        save(self, *args, **kwargs): Hashes the required skills if needed and saves the job.
         __str__(self): Returns a string representation of the job including the job title and company name.
     """
 
@@ -34,6 +39,34 @@ class Job(models.Model):
     required_skills = models.TextField()
     experience_required = models.IntegerField()
     posted_at = models.DateTimeField(auto_now_add=True)
+    skill_hashes = models.JSONField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Serves the keyset pagination of the job list, newest first, and the 'posted_at' filter of the search
+            models.Index(fields=["posted_at", "id"], name="job_posted_at_id_idx"),
+            # Serve the 'location' and experience filters of the search
+            models.Index(Lower("location"), "posted_at", name="job_location_idx"),
+            models.Index(fields=["experience_required", "posted_at"], name="job_experience_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the job along with the term hashes of its required skills, when the hashing vectorizer is configured.
+
+        Args:
+            *args (tuple): Positional arguments passed to `Model.save()`.
+            **kwargs (dict): Keyword arguments passed to `Model.save()`. When `update_fields` includes the required
+                skills, the term hashes are saved along with them.
+        """
+        from jobs.recommender.hashing import stored_hashes  # The recommender package imports this module
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "required_skills" in update_fields:
+            self.skill_hashes = stored_hashes(self.required_skills)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "skill_hashes"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         """
@@ -45,3 +78,176 @@ class Job(models.Model):
             str: A string in the format "{title} - {company}".
         """
         return f"{self.title} - {self.company}"
+
+
+class SeekerRecommendation(models.Model):
+    """
+    Stores the precomputed top-K job recommendations of a job seeker.
+
+    Rows are filled in batches by the `refresh_recommendations` management command and written through by the
+    recommendation endpoint on a miss. The ranking has the seeker's default filters applied. A row is only valid for
+    the profile and the full build of the job index it was computed from: it is ignored as soon as the profile's
+    skills, experience or preferred location change (`profile_hash`) or the index is rebuilt (`index_built_at`). Jobs
+    added, updated or removed since only delete the rows they could change (`materialized.invalidate()`), and a row is
+    deleted when the job seeker applies for a job.
+
+    Attributes:
+        profile (OneToOneField): The job seeker profile the recommendations belong to.
+        profile_hash (CharField): A hash of the profile fields the recommendations were computed for.
+        index_version (CharField): The version of the job index the recommendations were computed against.
+        index_built_at (FloatField): The timestamp of the full build that version of the job index is derived from.
+        job_ids (JSONField): The recommended job ids, ordered by decreasing score.
+        scores (JSONField): The similarity score of each recommended job.
+        computed_at (DateTimeField): The date and time the recommendations were computed.
+
+    Methods:
+        __str__(self): Returns a string representation including the job seeker's profile.
+    """
+
+    profile = models.OneToOneField(
+        'users.JobSeekerProfile', on_delete=models.CASCADE, related_name="recommendation"
+    )
+    profile_hash = models.CharField(max_length=64)
+    index_version = models.CharField(max_length=32)
+    index_built_at = models.FloatField(default=0)
+    job_ids = models.JSONField(default=list)
+    scores = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the stored recommendations.
+
+        Returns:
+            str: A string in the format "Recommendations for {profile}".
+        """
+        return f"Recommendations for {self.profile}"
+
+
+class SimilarJob(models.Model):
+    """
+    Stores one of the most similar jobs of a job posting, by cosine similarity of their required skills.
+
+    Every job keeps up to `RECOMMENDATION_SIMILAR_JOBS_TOP_N` rows. They are computed for the whole catalog by the
+    `refresh_similar_jobs` management command and updated when jobs are created, updated or deleted, so the similar
+    jobs of a posting are read with a single indexed query.
+
+    Attributes:
+        job (ForeignKey): The job posting the similar job belongs to.
+        similar (ForeignKey): The similar job posting.
+        score (FloatField): The cosine similarity of the two jobs' required skills.
+
+    Methods:
+        __str__(self): Returns a string representation including both jobs.
+    """
+
+    # Lookups by job are served by the ranking index, which starts with the job.
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="similar_jobs", db_index=False)
+    similar = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [models.Index(fields=["job", "-score"], name="similar_job_ranking_idx")]
+        constraints = [models.UniqueConstraint(fields=["job", "similar"], name="unique_similar_job")]
+
+    def __str__(self):
+        """
+        Returns a string representation of the similar job.
+
+        Returns:
+            str: A string in the format "{similar} similar to {job}".
+        """
+        return f"{self.similar} similar to {self.job}"
+
+
+class JobChange(models.Model):
+    """
+    A change to a job waiting to be applied to the recommendation index and the similar jobs.
+
+    Rows are queued by the job signal handlers in the transaction that changes the job, so a change is queued if and
+    only if it commits, and are deleted once `apply_job_changes()` applied them. A job changed several times before
+    the queue is drained has several rows, which are applied at once.
+
+    Attributes:
+        KIND_CHOICES (list): The kinds of changes.
+        job_id (BigIntegerField): The id of the changed job. It is not a foreign key, since deleted jobs are queued
+            too.
+        kind (CharField): 'indexed' when the job was created, deleted or had an indexed field changed, 'details' when
+            only fields outside the index changed, and 'referrer' when the job listed a deleted job as similar and its
+            similar jobs must be recomputed.
+        queued_at (DateTimeField): The date and time the change was queued.
+
+    Methods:
+        __str__(self): Returns a string representation including the job id and the kind of change.
+    """
+
+    KIND_CHOICES = [
+        ('indexed', 'Indexed fields'),
+        ('details', 'Other fields'),
+        ('referrer', 'Similar job deleted'),
+    ]
+
+    job_id = models.BigIntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default='indexed')
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the queued change.
+
+        Returns:
+            str: A string in the format "{kind} change of job {job_id}".
+        """
+        return f"{self.kind} change of job {self.job_id}"
+
+
+class SeekerChange(models.Model):
+    """
+    A change to a job seeker profile waiting to be applied to the job seeker index, used to rank the candidates of
+    jobs.
+
+    Rows are queued by the profile signal handlers in the transaction that changes the profile, and are deleted once
+    `apply_job_changes()` applied them along with the queued job changes, so saving a profile never waits for the
+    index.
+
+    Attributes:
+        seeker_id (BigIntegerField): The user id of the job seeker. It is not a foreign key, since deleted profiles
+            are queued too.
+        queued_at (DateTimeField): The date and time the change was queued.
+
+    Methods:
+        __str__(self): Returns a string representation including the job seeker id.
+    """
+
+    seeker_id = models.BigIntegerField()
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the queued change.
+
+        Returns:
+            str: A string in the format "Change of job seeker {seeker_id}".
+        """
+        return f"Change of job seeker {self.seeker_id}"
+
+
+class JobSearchEntry(models.Model):
+    """
+    The full-text search entry of a job on SQLite, a row of the FTS5 table `jobs_job_fts`.
+
+    The table is created and kept in sync with the jobs table by the `0007_job_search` migration, not by Django, and
+    only exists on SQLite. The model lets job querysets join it to match and rank jobs (see `jobs.search`).
+
+    Attributes:
+        job (OneToOneField): The indexed job. Its id is the row id of the entry.
+    """
+
+    job = models.OneToOneField(
+        Job, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', db_constraint=False,
+        related_name='search_entry',
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'jobs_job_fts'
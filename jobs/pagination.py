@@ -0,0 +1,293 @@
+import binascii
+from base64 import b64decode, b64encode
+from datetime import datetime
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.settings import api_settings
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class RecommendationPagination(BasePagination):
+    """
+    Pagination over a ranked list of recommendations.
+
+    A page is a window of `k` entries starting at an offset. Clients can pass the offset directly, or follow the
+    'next' and 'previous' links, which carry the position as an opaque cursor.
+
+    Attributes:
+        cursor_query_param (str): The query parameter holding the cursor.
+        offset_query_param (str): The query parameter holding a raw offset.
+
+    Methods:
+        encode_cursor(offset): Encodes an offset as an opaque cursor.
+        decode_cursor(cursor): Decodes a cursor back into an offset.
+        paginate_ranking(ranking, offset, k, request): Returns the entries of the requested page.
+        get_paginated_data(data): Wraps the serialized page with its links.
+        get_paginated_response(data): Wraps the serialized page with its links in a response.
+    """
+
+    cursor_query_param = "cursor"
+    offset_query_param = "offset"
+
+    @staticmethod
+    def encode_cursor(offset):
+        """
+        Encodes an offset as an opaque cursor.
+
+        Args:
+            offset (int): The position of the first entry of a page.
+
+        Returns:
+            str: The cursor.
+        """
+        return b64encode(parse.urlencode({"o": offset}).encode("ascii")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decodes a cursor created by `encode_cursor()`.
+
+        Args:
+            cursor (str): The cursor.
+
+        Returns:
+            int: The offset.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        try:
+            offset = int(parse.parse_qs(b64decode(cursor.encode("ascii")).decode("ascii"))["o"][0])
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound("Invalid cursor.")
+        if offset < 0:
+            raise NotFound("Invalid cursor.")
+        return offset
+
+    def paginate_ranking(self, ranking, offset, k, request):
+        """
+        Returns the entries of one page.
+
+        Args:
+            ranking (list): The head of the ranking, including at least one entry past the page if there is a next
+                page.
+            offset (int): The position of the first entry of the page.
+            k (int): The page size.
+            request (Request): The incoming request, used to build the page links.
+
+        Returns:
+            list: The entries of the page.
+        """
+        self.request = request
+        self.offset = offset
+        self.k = k
+        self.has_next = len(ranking) > offset + k
+        return ranking[offset:offset + k]
+
+    def get_paginated_data(self, data):
+        """
+        Wraps a serialized page with the links to its neighbours.
+
+        Args:
+            data (list): The serialized entries of the page.
+
+        Returns:
+            dict: The 'next' and 'previous' links and the 'results'.
+        """
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data):
+        """
+        Wraps a serialized page with the links to its neighbours in a response.
+
+        Args:
+            data (list): The serialized entries of the page.
+
+        Returns:
+            Response: A response with 'next', 'previous' and 'results'.
+        """
+        return Response(self.get_paginated_data(data))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.offset + self.k)
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        return self._link(max(self.offset - self.k, 0))
+
+    def _link(self, offset):
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        if offset == 0:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(offset))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over the job list, newest jobs first.
+
+    Jobs are ordered by (posted_at, id) descending, which the composite `job_posted_at_id_idx` index serves. A page
+    starts right after the last job of the previous one: the cursor holds that job's (posted_at, id) position, and the
+    next page is read with an index range scan from there, without counting the jobs and without an OFFSET. Fetching
+    a page therefore takes the same time at any depth. The 'previous' link reads the index in the other direction.
+    Jobs added while a client pages through the list appear on its later pages if they sort after the cursor.
+
+    Attributes:
+        cursor_query_param (str): The query parameter holding the cursor.
+        page_size_query_param (str): The query parameter holding the page size.
+        max_page_size (int): The largest page size a client may request.
+        ordering (tuple): The fields pages are ordered by, newest first.
+
+    Methods:
+        encode_cursor(posted_at, job_id, reverse): Encodes a position as an opaque cursor.
+        decode_cursor(cursor): Decodes a cursor back into a position.
+        paginate_queryset(queryset, request, view): Returns the jobs of the requested page.
+        get_paginated_response(data): Wraps the serialized page with its links in a response.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-posted_at", "-id")
+
+    @staticmethod
+    def encode_cursor(posted_at, job_id, reverse=False):
+        """
+        Encodes a position in the job list as an opaque cursor.
+
+        Args:
+            posted_at (datetime): The posting time of the job the page starts after.
+            job_id (int): The id of that job.
+            reverse (bool): Whether the page lies before the position rather than after it.
+
+        Returns:
+            str: The cursor.
+        """
+        position = {"p": posted_at.isoformat(), "i": job_id}
+        if reverse:
+            position["r"] = 1
+        return b64encode(parse.urlencode(position).encode("ascii")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """
+        Decodes a cursor created by `encode_cursor()`.
+
+        Args:
+            cursor (str): The cursor.
+
+        Returns:
+            tuple: The posting time and the id of the job the page starts after, and whether the page lies before it.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        try:
+            position = parse.parse_qs(b64decode(cursor.encode("ascii"), validate=True).decode("ascii"))
+            posted_at = datetime.fromisoformat(position["p"][0])
+            job_id = int(position["i"][0])
+            reverse = position.get("r", ["0"])[0] == "1"
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound("Invalid cursor.")
+        if posted_at.tzinfo is None:
+            raise NotFound("Invalid cursor.")
+        return posted_at, job_id, reverse
+
+    def get_page_size(self, request):
+        """
+        Returns the page size requested by the client, or the default `PAGE_SIZE`.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            int: The page size.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Returns the jobs of one page.
+
+        Args:
+            queryset (QuerySet): The jobs to paginate, without an ordering.
+            request (Request): The incoming request, holding the cursor and the page size.
+            view (APIView): The view paginating the jobs.
+
+        Returns:
+            list: The jobs of the page, newest first.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+        position = self.decode_cursor(cursor) if cursor else None
+        reverse = bool(position and position[2])
+
+        if position:
+            posted_at, job_id = position[:2]
+            if reverse:
+                after = Q(posted_at__gte=posted_at) & (Q(posted_at__gt=posted_at) | Q(id__gt=job_id))
+            else:
+                after = Q(posted_at__lte=posted_at) & (Q(posted_at__lt=posted_at) | Q(id__lt=job_id))
+            queryset = queryset.filter(after)
+        ordering = [field.lstrip("-") for field in self.ordering] if reverse else self.ordering
+
+        # Read one job past the page, to know whether there is a page after it
+        jobs = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(jobs) > self.page_size
+        jobs = jobs[:self.page_size]
+        if reverse:
+            jobs.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = jobs
+        return jobs
+
+    def get_paginated_response(self, data):
+        """
+        Wraps a serialized page with the links to its neighbours in a response.
+
+        Args:
+            data (list): The serialized jobs of the page.
+
+        Returns:
+            Response: A response with 'next', 'previous' and 'results'.
+        """
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        return self._link(self.encode_cursor(last.posted_at, last.pk))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        first = self.page[0]
+        return self._link(self.encode_cursor(first.posted_at, first.pk, reverse=True))
+
+    def _link(self, cursor):
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
@@ -0,0 +1,49 @@
+"""
+Job recommendation engine.
+
+This package keeps a persistent TF-IDF index of the job catalog and scores job seekers against it:
+- `text`: Preprocessing shared by job descriptions and seeker skills.
+- `index`: The immutable `JobIndex` holding the vectorizer and the job matrix.
+- `hashing`: Stateless feature hashing of skill texts and the IDF weights of the hashed columns.
+- `inverted`: Posting lists of the job matrix with MaxScore top-K retrieval.
+- `filters`: Hard location, experience and applied-job filters evaluated before scoring.
+- `store`: The process-wide `index_store`, which loads, updates and periodically rebuilds the index, and the
+  `seeker_index_store` of the job seeker index.
+- `changes`: The queue of job changes applied to the index and the similar jobs outside of requests.
+- `seekers`: The `SeekerIndex` of job seeker skills, used to rank the candidates of a job.
+- `materialized`: The precomputed top-K recommendations stored per job seeker.
+- `ranking`: Ranked lists for paginated results, from the materialized table or the cache.
+- `rankers`: The chain of rankers answering recommendation requests within a latency budget, with cheap fallbacks.
+- `batch`: Scoring of many job seekers or skills texts at once.
+- `similar`: The precomputed most similar jobs of every job.
+- `timing`: Per-stage timing of recommendation requests.
+- `responses`: The cache of recommendation responses and its version tokens.
+
+Only the lightweight modules are imported with the package. The ML stack (NumPy, SciPy, scikit-learn) is loaded by
+the `index` module on first use, so importing the views, URLs or signal handlers does not pay for it.
+"""
+
+from .store import IndexStore, SeekerIndexStore, index_store, seeker_index_store
+
+
+def get_index():
+    """
+    Returns the current job index of this process.
+
+    Returns:
+        JobIndex: The index, loaded from disk or built on first use.
+    """
+    return index_store.get()
+
+
+def __getattr__(name):
+    # Resolve the index classes lazily so that importing the package does not import the ML stack.
+    if name == "JobIndex":
+        from .index import JobIndex
+
+        return JobIndex
+    if name == "SeekerIndex":
+        from .seekers import SeekerIndex
+
+        return SeekerIndex
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
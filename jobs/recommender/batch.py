@@ -0,0 +1,70 @@
+"""
+Batch recommendation API.
+
+Scores many job seekers, or raw skills texts, against the job index in one go instead of one request per seeker. The
+texts go through the same preprocessing and vectorizer as the recommendation endpoint.
+"""
+
+from django.conf import settings
+
+from users.models import JobSeekerProfile
+from .filters import JobFilter
+from .store import index_store
+
+
+def recommend_for_skills(skills, k, memory_budget=None):
+    """
+    Returns the top-K jobs for each of several skills texts.
+
+    Args:
+        skills (list): The raw skills texts.
+        k (int): The number of jobs to return per text.
+        memory_budget (int): The maximum size in bytes of one chunk of the seeker x job product. Defaults to
+            `RECOMMENDATION_BATCH_MEMORY_BUDGET`.
+
+    Returns:
+        list: One list of (job id, score) pairs per text, in the order of `skills`.
+    """
+    if memory_budget is None:
+        memory_budget = settings.RECOMMENDATION_BATCH_MEMORY_BUDGET
+    return index_store.get().top_k_batch(
+        list(skills), k, memory_budget=memory_budget, dense=settings.RECOMMENDATION_RETRIEVAL == "dense"
+    )
+
+
+def recommend_for_seekers(seeker_ids, k, memory_budget=None):
+    """
+    Returns the top-K jobs for each of several job seekers, based on their profile skills.
+
+    Each job seeker gets the default filters of the recommendation endpoint: preferred location, experience ceiling
+    and no jobs already applied to.
+
+    Args:
+        seeker_ids (list): The user ids of the job seekers.
+        k (int): The number of jobs to return per job seeker.
+        memory_budget (int): The maximum size in bytes of one chunk of the seeker x job product. Defaults to
+            `RECOMMENDATION_BATCH_MEMORY_BUDGET`.
+
+    Returns:
+        dict: The (job id, score) pairs of each job seeker, keyed by user id. Ids without a job seeker profile are
+        left out.
+    """
+    if memory_budget is None:
+        memory_budget = settings.RECOMMENDATION_BATCH_MEMORY_BUDGET
+    profiles_by_seeker = {
+        profile.user_id: profile
+        for profile in JobSeekerProfile.objects.filter(user_id__in=seeker_ids).only(
+            "id", "user_id", "skills", "experience", "preferred_location"
+        )
+    }
+    profiles = [
+        profiles_by_seeker[seeker_id] for seeker_id in dict.fromkeys(seeker_ids) if seeker_id in profiles_by_seeker
+    ]
+    results = index_store.get().top_k_batch(
+        [profile.skills for profile in profiles],
+        k,
+        memory_budget=memory_budget,
+        job_filters=JobFilter.for_profiles(profiles),
+        dense=settings.RECOMMENDATION_RETRIEVAL == "dense",
+    )
+    return {profile.user_id: result for profile, result in zip(profiles, results)}
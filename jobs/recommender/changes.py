@@ -0,0 +1,156 @@
+"""
+Queue of job changes, applied to the recommendation index and the similar jobs outside of requests.
+
+Saving or deleting a job queues a `JobChange` row in the transaction that changes it, so the request neither waits
+for the index nor publishes a version of it. `apply_job_changes()` applies the queue in batches of
+`RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE` changes: each batch updates the job index and publishes it once however many
+jobs it holds, updates the similar jobs, invalidates the cached recommendation responses and then deletes its rows.
+Changes to fields outside the index only invalidate the cached responses.
+
+Saving or deleting a job seeker profile queues a `SeekerChange` row the same way, and the queue of profile changes is
+applied to the job seeker index after the job changes, in batches each published once.
+A batch that fails stays queued and is retried.
+
+Every process that queued a change applies the queue in a background thread every
+`RECOMMENDATION_INDEX_UPDATE_INTERVAL` seconds. With an interval of 0, no thread is started and the
+`apply_job_changes` management command applies it instead, for example as a separate long-running process. Processes
+take turns through the lock of the index directory, so each batch is applied once, on top of the latest published
+index.
+"""
+
+import logging
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from jobs.models import JobChange, SeekerChange
+from .materialized import invalidate as invalidate_recommendations
+from .responses import bump_catalog_version
+from .similar import IN_CHUNK_SIZE, update_similar_jobs
+from .store import index_store, seeker_index_store
+
+logger = logging.getLogger(__name__)
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def queue_job_changes(job_ids, kind="indexed"):
+    """
+    Queues changes to jobs in the current transaction, and makes sure this process applies them once it commits.
+
+    Args:
+        job_ids (iterable): The ids of the changed jobs.
+        kind (str): The kind of the changes, see `JobChange.kind`.
+    """
+    JobChange.objects.bulk_create([JobChange(job_id=job_id, kind=kind) for job_id in job_ids], batch_size=1000)
+    transaction.on_commit(start_worker)
+
+
+def queue_seeker_changes(seeker_ids):
+    """
+    Queues changes to job seeker profiles in the current transaction, and makes sure this process applies them once
+    it commits.
+
+    Args:
+        seeker_ids (iterable): The user ids of the job seekers whose profile changed.
+    """
+    SeekerChange.objects.bulk_create([SeekerChange(seeker_id=seeker_id) for seeker_id in seeker_ids], batch_size=1000)
+    transaction.on_commit(start_worker)
+
+
+def reindex_jobs(job_ids, similar_referrers=(), details_ids=()):
+    """
+    Updates the recommendation index, the similar jobs and the stored recommendations for changed jobs, then
+    invalidates the cached recommendation responses.
+
+    The update holds the lock of the index directory, so the similar jobs are updated by one process at a time. The
+    catalog version is replaced after the new index is published, so a response cached under the new version is
+    always computed from an index that includes the change.
+
+    Args:
+        job_ids (iterable): The ids of the created, updated or deleted jobs.
+        similar_referrers (iterable): The ids of jobs that listed a deleted job as similar.
+        details_ids (iterable): The ids of jobs whose fields outside the index changed. The index, the rankings and
+            the similar jobs stay as they are; only the details token of the index directory is replaced, which the
+            response caches depend on.
+    """
+    job_ids = set(job_ids)
+    with index_store.locked():
+        if job_ids or similar_referrers:
+            index = index_store.update(job_ids)
+            if index is not None:
+                update_similar_jobs(index, job_ids, similar_referrers)
+                invalidate_recommendations(index, job_ids)
+        if set(details_ids) - job_ids:
+            index_store.bump_details_version()
+    bump_catalog_version()
+
+
+def apply_job_changes(batch_size=None, blocking=False):
+    """
+    Applies the queued job changes, batch by batch, until the queue is empty, then the queued job seeker profile
+    changes.
+
+    Args:
+        batch_size (int): The largest number of changes applied at once. Defaults to
+            `RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE`.
+        blocking (bool): Whether to wait for another process applying changes to finish, rather than leave the queue
+            to it.
+
+    Returns:
+        int or None: The number of applied changes, or None if another process is applying them.
+    """
+    batch_size = batch_size or settings.RECOMMENDATION_INDEX_UPDATE_BATCH_SIZE
+    applied = 0
+    with index_store.locked(blocking) as held:
+        if not held:
+            return None
+        while changes := list(JobChange.objects.order_by("id").values_list("id", "job_id", "kind")[:batch_size]):
+            jobs = {kind: set() for kind, _ in JobChange.KIND_CHOICES}
+            for _, job_id, kind in changes:
+                jobs[kind].add(job_id)
+            reindex_jobs(jobs["indexed"], jobs["referrer"], jobs["details"] - jobs["indexed"])
+            _delete(JobChange, [change_id for change_id, _, _ in changes])
+            applied += len(changes)
+        while changes := list(SeekerChange.objects.order_by("id").values_list("id", "seeker_id")[:batch_size]):
+            # Without a job seeker index yet, there is nothing to update: its first build reads every profile.
+            seeker_index_store.update({seeker_id for _, seeker_id in changes})
+            _delete(SeekerChange, [change_id for change_id, _ in changes])
+            applied += len(changes)
+    return applied
+
+
+def _delete(model, change_ids):
+    # Rows are deleted by id: changes committed meanwhile may have lower ids than the last applied one.
+    change_ids = iter(change_ids)
+    while chunk := list(islice(change_ids, IN_CHUNK_SIZE)):
+        model.objects.filter(id__in=chunk).delete()
+
+
+def start_worker():
+    """
+    Starts the background thread applying the queued job changes in this process, unless it is running already or
+    `RECOMMENDATION_INDEX_UPDATE_INTERVAL` is 0.
+    """
+    global _worker
+    if settings.RECOMMENDATION_INDEX_UPDATE_INTERVAL <= 0:
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_apply_forever, name="job-change-worker", daemon=True)
+            _worker.start()
+
+
+def _apply_forever():
+    while True:
+        time.sleep(settings.RECOMMENDATION_INDEX_UPDATE_INTERVAL)
+        try:
+            apply_job_changes()
+        except Exception:
+            logger.exception("Applying the queued job changes failed.")
+        finally:
+            connections.close_all()
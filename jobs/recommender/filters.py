@@ -0,0 +1,230 @@
+"""
+Hard filters applied to the job and job seeker indexes before similarity scoring.
+
+A filter rejects jobs that require more experience than a ceiling, are not in a location, or were already applied to.
+It is evaluated against the metadata arrays of the job index as vectorized masks, so rejected jobs are never scored.
+A candidate filter does the same for the job seekers ranked for a job, against the job seeker index.
+
+Like the rest of the ML stack, NumPy is only imported when a filter is first evaluated, so the views can import this
+module at startup.
+"""
+
+import hashlib
+
+from .text import normalize_location
+
+
+class JobFilter:
+    """
+    Hard constraints a job must satisfy to be recommended.
+
+    Attributes:
+        max_experience (int): The highest accepted `experience_required`, or None for no ceiling.
+        location (str): A normalized location the job location must contain, or None for any location.
+        exclude_job_ids (frozenset): Ids of jobs that must not be recommended.
+
+    Methods:
+        for_profile(profile, overrides): Creates the filter of a job seeker, with optional overrides.
+        for_profiles(profiles): Creates the default filters of several job seekers with one query.
+        fingerprint(): Returns a stable string identifying the filter.
+        mask(index): Returns a boolean mask of the allowed jobs of an index.
+        allows(index, positions): Returns which of the given index positions are allowed.
+        filter_queryset(queryset): Applies the filter to a queryset of jobs.
+    """
+
+    def __init__(self, max_experience=None, location=None, exclude_job_ids=()):
+        self.max_experience = max_experience
+        self.location = normalize_location(location or "") or None
+        self.exclude_job_ids = frozenset(exclude_job_ids)
+
+    def __bool__(self):
+        return self.max_experience is not None or self.location is not None or bool(self.exclude_job_ids)
+
+    @classmethod
+    def for_profile(cls, profile, overrides=None):
+        """
+        Creates the filter of a job seeker.
+
+        By default, jobs must be in the profile's preferred location (if any), must not require more experience than
+        the profile has, and must not have been applied to already. Each constraint can be overridden.
+
+        Args:
+            profile (JobSeekerProfile): The job seeker profile.
+            overrides (dict): Optional overrides: 'location' (str, "" for any location), 'max_experience' (int, None
+                for no ceiling) and 'include_applied' (bool).
+
+        Returns:
+            JobFilter: The filter of the job seeker.
+        """
+        from applications.models import JobApplication
+
+        overrides = overrides or {}
+        exclude_job_ids = ()
+        if not overrides.get("include_applied", False):
+            exclude_job_ids = JobApplication.objects.filter(job_seeker_id=profile.user_id).values_list(
+                "job_id", flat=True
+            )
+        return cls(
+            max_experience=overrides.get("max_experience", profile.experience),
+            location=overrides.get("location", profile.preferred_location),
+            exclude_job_ids=exclude_job_ids,
+        )
+
+    @classmethod
+    def for_profiles(cls, profiles):
+        """
+        Creates the default filters of several job seekers, reading their applications with a single query.
+
+        Args:
+            profiles (list): The job seeker profiles.
+
+        Returns:
+            list: One JobFilter per profile, in the order of `profiles`.
+        """
+        from applications.models import JobApplication
+
+        applied = {profile.user_id: [] for profile in profiles}
+        for seeker_id, job_id in JobApplication.objects.filter(job_seeker_id__in=applied).values_list(
+            "job_seeker_id", "job_id"
+        ):
+            applied[seeker_id].append(job_id)
+        return [
+            cls(profile.experience, profile.preferred_location, applied[profile.user_id]) for profile in profiles
+        ]
+
+    def fingerprint(self):
+        """
+        Identifies the filter, so rankings computed with it can be cached.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest of the constraints.
+        """
+        key = repr((self.max_experience, self.location, sorted(self.exclude_job_ids)))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def mask(self, index):
+        """
+        Evaluates the filter against every job of an index.
+
+        Args:
+            index (JobIndex): The job index.
+
+        Returns:
+            ndarray: A boolean array with one entry per job, True for allowed jobs.
+        """
+        import numpy as np
+
+        return self.allows(index, np.arange(len(index)))
+
+    def allows(self, index, positions):
+        """
+        Evaluates the filter against some jobs of an index.
+
+        Args:
+            index (JobIndex): The job index.
+            positions (ndarray): The index positions of the jobs to check.
+
+        Returns:
+            ndarray: A boolean array aligned with `positions`, True for allowed jobs.
+        """
+        import numpy as np
+
+        allowed = np.ones(len(positions), dtype=bool)
+        if self.max_experience is not None:
+            allowed &= index.experience[positions] <= self.max_experience
+        if self.location is not None:
+            matching = np.fromiter(
+                (self.location in name for name in index.location_names), dtype=bool, count=len(index.location_names)
+            )
+            allowed &= matching[index.location_codes[positions]]
+        if self.exclude_job_ids:
+            excluded = [index.position(job_id) for job_id in self.exclude_job_ids]
+            allowed &= ~np.isin(positions, [position for position in excluded if position is not None])
+        return allowed
+
+    def filter_queryset(self, queryset):
+        """
+        Applies the filter to a queryset of jobs, so the database evaluates it when no index is available.
+
+        Locations are matched case-insensitively, without the whitespace normalization of the index.
+
+        Args:
+            queryset (QuerySet): A queryset of jobs.
+
+        Returns:
+            QuerySet: The jobs allowed by the filter.
+        """
+        if self.max_experience is not None:
+            queryset = queryset.filter(experience_required__lte=self.max_experience)
+        if self.location is not None:
+            queryset = queryset.filter(location__icontains=self.location)
+        if self.exclude_job_ids:
+            queryset = queryset.exclude(id__in=self.exclude_job_ids)
+        return queryset
+
+
+class CandidateFilter:
+    """
+    Hard constraints a job seeker must satisfy to be ranked as a candidate for a job.
+
+    By default these mirror the filters of the seeker-side recommendations: a seeker is a candidate for a job only if
+    the job would pass their own filters, that is if they have at least the required experience and have no preferred
+    location or one that the job location contains.
+
+    Attributes:
+        min_experience (int): The lowest accepted years of experience, or None for no floor.
+        location (str): A normalized job location the seeker's preferred location must be part of, or None for any
+            preferred location.
+
+    Methods:
+        for_job(job, overrides): Creates the filter of a job, with optional overrides.
+        mask(index): Returns a boolean mask of the allowed seekers of a seeker index.
+    """
+
+    def __init__(self, min_experience=None, location=None):
+        self.min_experience = min_experience
+        self.location = normalize_location(location or "") or None
+
+    def __bool__(self):
+        return self.min_experience is not None or self.location is not None
+
+    @classmethod
+    def for_job(cls, job, overrides=None):
+        """
+        Creates the filter of a job.
+
+        Args:
+            job (Job): The job posting.
+            overrides (dict): Optional overrides: 'location' (str, "" for any preferred location) and
+                'min_experience' (int, None for no floor).
+
+        Returns:
+            CandidateFilter: The filter of the job.
+        """
+        overrides = overrides or {}
+        return cls(
+            min_experience=overrides.get("min_experience", job.experience_required),
+            location=overrides.get("location", job.location),
+        )
+
+    def mask(self, index):
+        """
+        Evaluates the filter against every job seeker of a seeker index.
+
+        Args:
+            index (SeekerIndex): The job seeker index.
+
+        Returns:
+            ndarray: A boolean array with one entry per job seeker, True for allowed seekers.
+        """
+        import numpy as np
+
+        allowed = np.ones(len(index), dtype=bool)
+        if self.min_experience is not None:
+            allowed &= index.experience >= self.min_experience
+        if self.location is not None:
+            matching = np.fromiter(
+                (name in self.location for name in index.location_names), dtype=bool, count=len(index.location_names)
+            )
+            allowed &= matching[index.location_codes]
+        return allowed
@@ -0,0 +1,141 @@
+"""
+Stateless feature hashing of skill texts, the vectorizer used when `RECOMMENDATION_VECTORIZER` is "hashing".
+
+A fitted vocabulary differs between two builds, so vectors computed against one index cannot be reused by another
+index or by another node. With feature hashing, a term's column is a fixed hash of the term modulo a fixed number of
+columns (`RECOMMENDATION_HASHING_FEATURES`), so any process vectorizes a text the same way without any fitted state:
+
+- When a job is saved in hashing mode, the hashes of its terms and their counts are stored on the job
+  (`Job.skill_hashes`), so building the index never analyzes a job text again. In TF-IDF mode nothing is hashed, and
+  the jobs saved meanwhile are hashed when the first hashed index is built.
+- The IDF weight of every column is a small array of its own (`RECOMMENDATION_HASHING_IDF_PATH`), computed from the
+  stored hashes of the catalog by the `refresh_hashing_idf` management command and copied to the other nodes like any
+  other file. It is the only state shared between nodes.
+- Seeker skills are hashed at request time and weighted with the IDF array of the index.
+
+Terms are hashed with CRC-32, which is stable across processes and Python versions (unlike `hash()`), and fast enough
+for a handful of terms per query. Distinct terms that land in the same column are counted together.
+
+NumPy is only imported when IDF weights are computed or read, so models can hash terms without loading it.
+"""
+
+import os
+import tempfile
+import zlib
+from collections import Counter
+
+from django.conf import settings
+
+from .text import analyze
+
+
+def term_hash(term):
+    """
+    Returns the stable hash of an analyzed term.
+
+    Args:
+        term (str): A term, as returned by `analyze()`.
+
+    Returns:
+        int: An unsigned 32-bit hash.
+    """
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def hash_terms(text):
+    """
+    Hashes the terms of a skills text, as stored on a job when it is saved.
+
+    The hashes are kept whole rather than reduced to columns, so the stored values stay valid for any number of
+    hashed columns.
+
+    Args:
+        text (str): The raw skills text.
+
+    Returns:
+        list: Sorted [term hash, count] pairs, one per distinct hash.
+    """
+    return sorted([term, count] for term, count in Counter(map(term_hash, analyze(text))).items())
+
+
+def stored_hashes(text):
+    """
+    Returns the term hashes to store on a job with the given skills text.
+
+    Args:
+        text (str): The raw skills text.
+
+    Returns:
+        list or None: The pairs returned by `hash_terms()` when `RECOMMENDATION_VECTORIZER` is "hashing", else None,
+        since only a hashed index reads them. Stored hashes are cleared rather than left stale when the text changes.
+    """
+    if settings.RECOMMENDATION_VECTORIZER != "hashing":
+        return None
+    return hash_terms(text)
+
+
+def compute_idf(hashed_texts, features):
+    """
+    Computes the IDF weight of every hashed column from the term hashes of a catalog.
+
+    The weighting is the same as TfidfVectorizer's smoothed IDF: ln((1 + n) / (1 + df)) + 1.
+
+    Args:
+        hashed_texts (iterable): The [term hash, count] pairs of each job, as returned by `hash_terms()`.
+        features (int): The number of hashed columns.
+
+    Returns:
+        ndarray: One float32 weight per column.
+    """
+    import numpy as np  # Imports NumPy on first use
+
+    document_frequencies = np.zeros(features, dtype=np.int64)
+    documents = 0
+    for pairs in hashed_texts:
+        documents += 1
+        if pairs:
+            columns = np.unique(np.array([term for term, _ in pairs], dtype=np.int64) % features)
+            document_frequencies[columns] += 1
+    return (np.log((1 + documents) / (1 + document_frequencies)) + 1).astype(np.float32)
+
+
+def load_idf(path, features):
+    """
+    Reads the IDF weights synced to this node.
+
+    Args:
+        path (str): The .npy file written by `save_idf()`.
+        features (int): The expected number of hashed columns.
+
+    Returns:
+        ndarray or None: The weights, or None if the file is missing or was computed for another number of columns.
+    """
+    import numpy as np  # Imports NumPy on first use
+
+    try:
+        idf = np.load(path, allow_pickle=False)
+    except FileNotFoundError:
+        return None
+    return idf if idf.shape == (features,) else None
+
+
+def save_idf(idf, path):
+    """
+    Writes IDF weights atomically, so readers on this node never see a partial file.
+
+    Args:
+        idf (ndarray): One weight per hashed column.
+        path (str): The .npy file to write.
+    """
+    import numpy as np  # Imports NumPy on first use
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, staging = tempfile.mkstemp(dir=directory, prefix=".idf-", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            np.save(handle, np.asarray(idf, dtype=np.float32), allow_pickle=False)
+        os.replace(staging, path)
+    except BaseException:
+        os.unlink(staging)
+        raise
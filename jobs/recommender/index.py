@@ -0,0 +1,950 @@
+"""
+TF-IDF index over the job catalog.
+
+The index holds the vocabulary and IDF weights of the catalog and the L2-normalized TF-IDF matrix of every job's
+required skills, so a request only has to vectorize the seeker's skills and multiply it against the prebuilt matrix.
+
+The matrix and its posting lists hold float32 weights and int32 indices, half the size of the float64 matrices fitted
+by scikit-learn, so more of the index stays in the CPU caches while scoring. Weights below a pruning threshold can be
+dropped from every job as well; they barely move any score, but every stored entry costs memory and scoring time.
+
+An index is saved as a directory of plain NumPy arrays (the CSR matrix, its posting lists, the job ids and metadata,
+the vocabulary and the IDF weights) and loaded back with memory mapping. Every worker process that loads the same
+directory maps the same files, so the operating system keeps a single copy of the index in memory for all of them.
+
+An index can also hold dense low-rank (LSA) embeddings of the jobs, computed from the TF-IDF matrix by truncated SVD.
+They are stored as one contiguous float32 (or float16) array, so a query is scored against every job with a single
+matrix-vector product, and related skills that never co-occur in a text can still match.
+
+Instead of a fitted vocabulary, the columns of an index can be hashed terms (see `hashing`). Such an index is built from
+the term hashes stored on the jobs and an IDF array computed separately, so nothing is fitted when it is built and any
+process vectorizes texts for it the same way.
+"""
+
+import json
+import os
+import time
+import uuid
+from functools import cached_property
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from .hashing import term_hash
+from .inverted import InvertedIndex, select_top_k
+from .text import analyze, analyze_batch, normalize_location
+from .timing import current_timer
+
+# Rows of float16 embeddings converted to float32 at once when scoring, few enough for the copy to stay in cache.
+DENSE_BLOCK_ROWS = 8192
+
+# Bytes held per nonzero of a seeker x job product: a float32 score and an int32 column index, counted twice because
+# the product is materialized once by the multiplication and once by the conversion to CSR.
+PRODUCT_BYTES_PER_NONZERO = 2 * (4 + 4)
+
+
+def compact(matrix):
+    """
+    Converts a sparse matrix to the compact CSR layout of the index: float32 values and int32 indices.
+
+    Arrays that already have these types, such as memory-mapped ones, are used as they are rather than copied.
+
+    Args:
+        matrix (spmatrix): A sparse matrix.
+
+    Returns:
+        csr_matrix: The compact matrix.
+    """
+    matrix = matrix.tocsr()
+    # Offsets only need 64 bits past 2^31 stored entries.
+    index_dtype = np.int32 if matrix.nnz < np.iinfo(np.int32).max else np.int64
+    return sparse.csr_matrix(
+        (
+            matrix.data.astype(np.float32, copy=False),
+            matrix.indices.astype(index_dtype, copy=False),
+            matrix.indptr.astype(index_dtype, copy=False),
+        ),
+        shape=matrix.shape,
+    )
+
+
+def prune(matrix, threshold):
+    """
+    Drops the weights below a threshold from a TF-IDF matrix.
+
+    The remaining weights are kept as they are rather than renormalized, so a score against a pruned row is the exact
+    score minus the contributions of the dropped terms.
+
+    Args:
+        matrix (csr_matrix): The matrix with one L2-normalized row per job.
+        threshold (float): The smallest weight kept, or 0 to keep every weight.
+
+    Returns:
+        csr_matrix: The pruned matrix.
+    """
+    if threshold <= 0:
+        return matrix
+    matrix = matrix.copy()
+    matrix.data[matrix.data < threshold] = 0
+    matrix.eliminate_zeros()
+    return matrix
+
+
+class JobIndex:
+    """
+    Immutable TF-IDF index of job postings.
+
+    Every update returns a new index instead of modifying the current one, so a request that is scoring against an
+    index never observes a half-applied change and the process-wide index can be swapped with a single assignment.
+
+    Jobs added after the last full build are vectorized with the existing vocabulary and IDF weights. Terms that are
+    not in the vocabulary are ignored until the next rebuild refits them.
+
+    Attributes:
+        vocabulary (ndarray): The sorted vocabulary terms; the position of a term is its matrix column. Empty for a
+            hashed index.
+        idf (ndarray): The IDF weight of every vocabulary term, or of every hashed column.
+        matrix (csr_matrix): The TF-IDF matrix with one L2-normalized row per job, float32 with int32 indices.
+        job_ids (ndarray): The job id of every matrix row.
+        experience (ndarray): The experience required by every job, used by filters.
+        location_codes (ndarray): The position of every job's normalized location in `location_names`.
+        location_names (tuple): The distinct normalized job locations.
+        projection (ndarray): The vocabulary x dimensions LSA projection of TF-IDF rows, or None without embeddings.
+        embeddings (ndarray): The L2-normalized LSA embedding of every job, or None without embeddings.
+        features (int): The number of hashed term columns, or 0 if the columns are the vocabulary terms.
+        prune_threshold (float): The smallest weight kept in the job rows, or 0 if none was dropped.
+        built_at (float): The timestamp of the last full build the index is derived from.
+        version (str): An identifier that changes whenever the indexed jobs change.
+        format (int): The FORMAT of the code that created the index.
+
+    Methods:
+        build(rows, dimensions, dense_dtype, prune_threshold): Fits a new index from (job id, required skills,
+            experience required, location) rows, with LSA embeddings of the given number of dimensions.
+        build_hashed(rows, idf, dimensions, dense_dtype, prune_threshold): Builds a hashed index from (job id, term
+            hashes, experience required, location) rows without fitting anything.
+        finish(dimensions, dense_dtype, prune_threshold): Prunes a freshly built index and fits its embeddings.
+        pruned(threshold): Returns a copy of the index without the job weights below a threshold.
+        with_embeddings(dimensions, dense_dtype): Returns a copy of the index with LSA embeddings.
+        position(job_id): Returns the matrix row of a job.
+        transform(text): Vectorizes a skills text with the index vocabulary.
+        vectorize(analyzed): Vectorizes already analyzed texts with the index vocabulary.
+        scores(text): Computes the cosine similarity of a skills text to every job.
+        top_k(text, k, job_filter, dense): Returns the k best matching job ids with their scores, using the inverted
+            index or the embeddings.
+        top_k_overlap(text, k, job_filter): Returns the k jobs sharing the most terms with a text, a cheap fallback.
+        top_k_batch(texts, k, memory_budget, job_filters, dense): Returns the k best matching jobs for many texts.
+        top_k_vectors(queries, k, memory_budget, job_filters, dense): Returns the k best matching jobs for vectorized
+            queries.
+        matches(positions, scores, k, mask): Turns ranked index positions into (job id, score) pairs.
+        upsert(job_id, text, experience_required, location): Returns a copy of the index with the job added or replaced.
+        upsert_many(rows): Returns a copy of the index with many jobs added or replaced at once.
+        remove(job_id): Returns a copy of the index without the job.
+        remove_many(job_ids): Returns a copy of the index without many jobs at once.
+        save(directory): Writes the index as a directory of arrays.
+        load(directory): Memory-maps an index written by save().
+    """
+
+    # Bumped whenever the preprocessing or the stored layout changes, so older indexes are rebuilt.
+    FORMAT = 5
+
+    # The arrays written by save(), one .npy file each.
+    ARRAYS = (
+        "matrix_data", "matrix_indices", "matrix_indptr", "postings_indptr", "postings_positions", "postings_weights",
+        "max_weights", "job_ids", "sorted_ids", "sorted_positions", "experience", "location_codes", "vocabulary", "idf",
+    )
+
+    # The arrays only written when the index has LSA embeddings.
+    DENSE_ARRAYS = ("projection", "embeddings")
+
+    def __init__(self, vocabulary, idf, matrix, job_ids, experience=None, location_codes=None, location_names=(),
+                 built_at=None, version=None, sorted_ids=None, sorted_positions=None, inverted=None, projection=None,
+                 embeddings=None, features=0, prune_threshold=0.0):
+        self.vocabulary = np.asarray(vocabulary, dtype=str)
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.matrix = compact(matrix)
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        if experience is None:
+            experience = np.zeros(len(self.job_ids))
+        if location_codes is None:
+            location_codes, location_names = np.zeros(len(self.job_ids)), ("",)
+        self.experience = np.asarray(experience, dtype=np.int32)
+        self.location_codes = np.asarray(location_codes, dtype=np.int32)
+        self.location_names = tuple(location_names)
+        self.projection = projection
+        self.embeddings = embeddings
+        self.features = int(features)
+        self.prune_threshold = float(prune_threshold)
+        self.built_at = built_at if built_at is not None else time.time()
+        self.version = version or uuid.uuid4().hex
+        self.format = self.FORMAT
+        if sorted_ids is None:
+            sorted_positions = np.argsort(self.job_ids, kind="stable")
+            sorted_ids = self.job_ids[sorted_positions]
+        # Job ids in increasing order and their rows, so a job is found with a binary search instead of a per-process
+        # dictionary.
+        self.sorted_ids = sorted_ids
+        self.sorted_positions = sorted_positions
+        if inverted is not None:
+            self.inverted = inverted
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def __contains__(self, job_id):
+        return self.position(job_id) is not None
+
+    @classmethod
+    def empty(cls):
+        """
+        Creates an index without any jobs.
+
+        Returns:
+            JobIndex: An index with no vocabulary and an empty matrix.
+        """
+        return cls([], [], sparse.csr_matrix((0, 0)), [])
+
+    @classmethod
+    def build(cls, rows, dimensions=0, dense_dtype="float32", prune_threshold=0.0):
+        """
+        Fits a new index from scratch.
+
+        Args:
+            rows (iterable): Tuples of (job id, required skills, experience required, location).
+            dimensions (int): The number of dimensions of the LSA embeddings, or 0 for none.
+            dense_dtype (str): The type the embeddings are stored as, 'float32' or 'float16'.
+            prune_threshold (float): The smallest weight kept in the job rows, or 0 to keep every weight.
+
+        Returns:
+            JobIndex: The freshly built index.
+        """
+        job_ids, texts, experience, locations = [], [], [], []
+        for job_id, required_skills, experience_required, location in rows:
+            job_ids.append(job_id)
+            texts.append(required_skills)
+            experience.append(experience_required)
+            locations.append(normalize_location(location))
+
+        if not job_ids:
+            return cls.empty()
+
+        location_names, location_codes = np.unique(np.array(locations, dtype=object), return_inverse=True)
+        metadata = dict(experience=experience, location_codes=location_codes, location_names=location_names)
+        vectorizer = TfidfVectorizer(analyzer=analyze)
+        try:
+            matrix = vectorizer.fit_transform(texts)
+        except ValueError:
+            # Every job only contains stopwords or punctuation, so there is no vocabulary to fit.
+            return cls([], [], sparse.csr_matrix((len(job_ids), 0)), job_ids, **metadata)
+        # The fitted vocabulary is sorted, so the position of a term in the feature names is its column.
+        index = cls(vectorizer.get_feature_names_out(), vectorizer.idf_, matrix, job_ids, **metadata)
+        return index.finish(dimensions, dense_dtype, prune_threshold)
+
+    @classmethod
+    def build_hashed(cls, rows, idf, dimensions=0, dense_dtype="float32", prune_threshold=0.0):
+        """
+        Builds a new index whose columns are hashed terms, from term hashes computed when the jobs were saved.
+
+        Nothing is fitted: the rows are weighted with the given IDF array and L2-normalized, as the fitted vectorizer
+        would do.
+
+        Args:
+            rows (iterable): Tuples of (job id, term hashes, experience required, location), where the term hashes are
+                the [term hash, count] pairs returned by `hash_terms()`.
+            idf (ndarray): The IDF weight of every hashed column; its length is the number of columns.
+            dimensions (int): The number of dimensions of the LSA embeddings, or 0 for none.
+            dense_dtype (str): The type the embeddings are stored as, 'float32' or 'float16'.
+            prune_threshold (float): The smallest weight kept in the job rows, or 0 to keep every weight.
+
+        Returns:
+            JobIndex: The freshly built index.
+        """
+        features = len(idf)
+        job_ids, experience, locations, rows_of, hashes, counts = [], [], [], [], [], []
+        for job_id, pairs, experience_required, location in rows:
+            for term, count in pairs:
+                rows_of.append(len(job_ids))
+                hashes.append(term)
+                counts.append(count)
+            job_ids.append(job_id)
+            experience.append(experience_required)
+            locations.append(normalize_location(location))
+
+        if not job_ids:
+            return cls([], idf, sparse.csr_matrix((0, features)), [], features=features)
+
+        location_names, location_codes = np.unique(np.array(locations, dtype=object), return_inverse=True)
+        columns = np.array(hashes, dtype=np.int64) % features
+        counts = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float64), (np.array(rows_of, dtype=np.int64), columns)),
+            shape=(len(job_ids), features),
+        )
+        # Terms hashed to the same column are counted together, as in the vectorized queries.
+        counts.sum_duplicates()
+        counts.data *= np.asarray(idf, dtype=np.float64)[counts.indices]
+        index = cls(
+            [],
+            idf,
+            normalize(counts, copy=False),
+            job_ids,
+            experience=experience,
+            location_codes=location_codes,
+            location_names=location_names,
+            features=features,
+        )
+        return index.finish(dimensions, dense_dtype, prune_threshold)
+
+    def finish(self, dimensions=0, dense_dtype="float32", prune_threshold=0.0):
+        """
+        Applies the build options to a freshly built index: prunes its weights, then fits its LSA embeddings.
+
+        Args:
+            dimensions (int): The number of dimensions of the LSA embeddings, or 0 for none.
+            dense_dtype (str): The type the embeddings are stored as, 'float32' or 'float16'.
+            prune_threshold (float): The smallest weight kept in the job rows, or 0 to keep every weight.
+
+        Returns:
+            JobIndex: The finished index.
+        """
+        index = self.pruned(prune_threshold) if prune_threshold else self
+        return index.with_embeddings(dimensions, dense_dtype) if dimensions else index
+
+    def pruned(self, threshold):
+        """
+        Returns a copy of the index without the job weights below a threshold.
+
+        Jobs added later are pruned with the same threshold.
+
+        Args:
+            threshold (float): The smallest weight kept.
+
+        Returns:
+            JobIndex: The pruned index.
+        """
+        return type(self)(
+            self.vocabulary,
+            self.idf,
+            prune(self.matrix, threshold),
+            self.job_ids,
+            experience=self.experience,
+            location_codes=self.location_codes,
+            location_names=self.location_names,
+            built_at=self.built_at,
+            sorted_ids=self.sorted_ids,
+            sorted_positions=self.sorted_positions,
+            projection=self.projection,
+            embeddings=self.embeddings,
+            features=self.features,
+            prune_threshold=threshold,
+        )
+
+    def with_embeddings(self, dimensions, dense_dtype="float32"):
+        """
+        Returns a copy of the index with dense LSA embeddings fitted by truncated SVD of the TF-IDF matrix.
+
+        The number of dimensions is capped below the vocabulary and catalog sizes; an index too small for any
+        dimension is returned without embeddings.
+
+        Args:
+            dimensions (int): The number of dimensions of the embeddings.
+            dense_dtype (str): The type the embeddings are stored as, 'float32' or 'float16'. Queries are always
+                projected in float32.
+
+        Returns:
+            JobIndex: The index with embeddings.
+        """
+        from sklearn.decomposition import TruncatedSVD
+
+        dimensions = min(dimensions, self.matrix.shape[1] - 1, len(self))
+        if dimensions < 1:
+            return self
+        svd = TruncatedSVD(n_components=dimensions, algorithm="randomized", random_state=0)
+        embeddings = normalize(svd.fit_transform(self.matrix)).astype(dense_dtype)
+        # The transposed components, so projecting a sparse query only reads the rows of its terms.
+        projection = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+        return type(self)(
+            self.vocabulary,
+            self.idf,
+            self.matrix,
+            self.job_ids,
+            experience=self.experience,
+            location_codes=self.location_codes,
+            location_names=self.location_names,
+            built_at=self.built_at,
+            sorted_ids=self.sorted_ids,
+            sorted_positions=self.sorted_positions,
+            projection=projection,
+            embeddings=embeddings,
+            features=self.features,
+            prune_threshold=self.prune_threshold,
+        )
+
+    def position(self, job_id):
+        """
+        Returns the matrix row of a job.
+
+        Args:
+            job_id (int): The id of the job.
+
+        Returns:
+            int or None: The row of the job, or None if it is not indexed.
+        """
+        found = np.searchsorted(self.sorted_ids, job_id)
+        if found < len(self.sorted_ids) and self.sorted_ids[found] == job_id:
+            return int(self.sorted_positions[found])
+        return None
+
+    def transform(self, text):
+        """
+        Vectorizes a skills text with the index vocabulary.
+
+        Args:
+            text (str): The raw skills text.
+
+        Returns:
+            csr_matrix: A 1 x vocabulary L2-normalized TF-IDF row.
+        """
+        return self.transform_many([text])
+
+    def transform_many(self, texts):
+        """
+        Vectorizes several skills texts with the index vocabulary.
+
+        Args:
+            texts (list): The raw skills texts.
+
+        Returns:
+            csr_matrix: A len(texts) x vocabulary matrix of L2-normalized TF-IDF rows.
+        """
+        return self.vectorize(analyze_batch(texts))
+
+    def vectorize(self, analyzed):
+        """
+        Vectorizes already analyzed skills texts with the index vocabulary, or by hashing their terms.
+
+        Args:
+            analyzed (list): The terms of each text, as returned by `analyze_batch()`.
+
+        Returns:
+            csr_matrix: A len(analyzed) x vocabulary matrix of L2-normalized float32 TF-IDF rows.
+        """
+        rows, terms = [], []
+        for row, tokens in enumerate(analyzed):
+            rows.extend([row] * len(tokens))
+            terms.extend(tokens)
+        shape = (len(analyzed), self.matrix.shape[1])
+        if not terms or not shape[1]:
+            return sparse.csr_matrix(shape, dtype=np.float32)
+
+        if self.features:
+            # Every term has a column, whether or not any job contains it.
+            columns = np.array([term_hash(term) for term in terms], dtype=np.int64) % self.features
+            known = np.ones(len(terms), dtype=bool)
+        else:
+            # Look the terms up in the sorted vocabulary; terms outside of it are ignored.
+            terms = np.array(terms)
+            columns = np.searchsorted(self.vocabulary, terms)
+            known = columns < len(self.vocabulary)
+            known[known] = self.vocabulary[columns[known]] == terms[known]
+        counts = sparse.csr_matrix(
+            (np.ones(known.sum()), (np.array(rows)[known], columns[known])), shape=shape
+        )
+        # Same weighting as the fitted TfidfVectorizer: raw counts times IDF, then L2 normalization.
+        counts.sum_duplicates()
+        counts.data *= self.idf[counts.indices]
+        # Same type as the job matrix, so products with it do not convert the whole matrix.
+        return compact(normalize(counts, copy=False))
+
+    def scores(self, text):
+        """
+        Computes the cosine similarity between a skills text and every job in the index.
+
+        Both the job rows and the query are L2-normalized, so the dot product is the cosine similarity.
+
+        Args:
+            text (str): The raw skills text.
+
+        Returns:
+            ndarray: One similarity score per job, aligned with job_ids.
+        """
+        if not len(self):
+            return np.zeros(0)
+        query = self.transform(text)
+        return np.asarray((self.matrix @ query.T).todense()).ravel()
+
+    def score_positions(self, queries, positions, dense=False):
+        """
+        Computes the scores of some jobs for already vectorized queries, as the rankings compute them.
+
+        Args:
+            queries (csr_matrix): One L2-normalized row per query, with the index vocabulary as columns.
+            positions (list): The index positions of the jobs to score.
+            dense (bool): Whether to score by the LSA embeddings, if the index has them.
+
+        Returns:
+            ndarray: A len(queries) x len(positions) array of scores.
+        """
+        if dense and self.embeddings is not None:
+            projected = normalize(np.asarray(queries @ self.projection, dtype=np.float32))
+            return projected @ self.embeddings[positions].astype(np.float32).T
+        return (queries @ self.matrix[positions].T).toarray()
+
+    def top_k(self, text, k, job_filter=None, dense=False):
+        """
+        Returns the best matching jobs for a skills text.
+
+        Candidates are retrieved from the inverted index, so only jobs sharing at least one term with the text are
+        scored. Jobs rejected by the filter are masked out before scoring. If fewer than k jobs match, the list is
+        filled up with zero-score jobs in index order.
+
+        With `dense`, and if the index has embeddings, the text is projected into the LSA space instead and scored
+        against every allowed job with a single matrix-vector product.
+
+        Args:
+            text (str): The raw skills text.
+            k (int): The maximum number of jobs to return.
+            job_filter (JobFilter): Hard constraints the returned jobs must satisfy, or None.
+            dense (bool): Whether to rank by the LSA embeddings rather than the TF-IDF vectors.
+
+        Returns:
+            list: (job id, score) pairs ordered by decreasing score.
+        """
+        if not len(self):
+            return []
+        timer = current_timer()
+        with timer.stage("preprocess"):
+            analyzed = analyze_batch([text])
+        with timer.stage("vectorize"):
+            query = self.vectorize(analyzed)
+        with timer.stage("score"):
+            mask = job_filter.mask(self) if job_filter else None
+            stats = {} if timer.enabled else None
+            if dense and self.embeddings is not None:
+                positions, scores = self._dense_top_k(query, k, mask, stats)
+            else:
+                positions, scores = self.inverted.top_k(query, k, mask=mask, stats=stats)
+        with timer.stage("rank"):
+            matches = self.matches(positions, scores, k, mask)
+        if timer.enabled:
+            timer.count("catalog", len(self))
+            timer.count("candidates", stats["candidates"])
+        return matches
+
+    def top_k_overlap(self, text, k, job_filter=None):
+        """
+        Returns the jobs sharing the most terms with a skills text.
+
+        This is a cheap approximation of top_k() for when there is no time for it: the jobs of every query term's
+        posting list are counted in one pass, without weights or pruning, and each job scores the fraction of the
+        text's known terms it contains. Ties, zero scores and filters are handled as in top_k().
+
+        Args:
+            text (str): The raw skills text.
+            k (int): The maximum number of jobs to return.
+            job_filter (JobFilter): Hard constraints the returned jobs must satisfy, or None.
+
+        Returns:
+            list: (job id, score) pairs ordered by decreasing score.
+        """
+        if not len(self):
+            return []
+        timer = current_timer()
+        with timer.stage("preprocess"):
+            analyzed = analyze_batch([text])
+        with timer.stage("vectorize"):
+            terms = self.vectorize(analyzed).indices.tolist()
+        with timer.stage("score"):
+            mask = job_filter.mask(self) if job_filter else None
+            inverted = self.inverted
+            postings = [inverted.positions[inverted.indptr[term]:inverted.indptr[term + 1]] for term in terms]
+            positions, counts = np.unique(np.concatenate(postings or [np.zeros(0, dtype=np.int32)]), return_counts=True)
+            if mask is not None:
+                allowed = mask[positions]
+                positions, counts = positions[allowed], counts[allowed]
+            positions, scores = select_top_k(positions, counts / max(len(terms), 1), k)
+        with timer.stage("rank"):
+            matches = self.matches(positions, scores, k, mask)
+        timer.count("catalog", len(self))
+        return matches
+
+    def top_k_batch(self, texts, k, memory_budget=None, job_filters=None, dense=False):
+        """
+        Returns the best matching jobs for several skills texts with chunked sparse matrix products.
+
+        The texts are vectorized at once and multiplied against the job matrix in chunks of rows. When a memory budget
+        is given, each chunk is sized so that an upper bound of its seeker x job product stays within the budget; the
+        bound counts, for every query, the jobs that share at least one term with it. Each text's filter is applied
+        to the jobs of its product row before they are ranked.
+
+        The ranking is the same as top_k(): jobs are ordered by decreasing score, ties and zero scores by their
+        position in the index.
+
+        Args:
+            texts (list): The raw skills texts.
+            k (int): The maximum number of jobs to return per text.
+            memory_budget (int): The maximum size in bytes of one chunk's product, or None for a single product.
+            job_filters (list): One JobFilter (or None) per text, or None to return unfiltered results.
+            dense (bool): Whether to rank by the LSA embeddings, one matrix-vector product per text, if the index
+                has them.
+
+        Returns:
+            list: One list of (job id, score) pairs per text.
+        """
+        if not len(self):
+            return [[] for _ in texts]
+        timer = current_timer()
+        with timer.stage("preprocess"):
+            analyzed = analyze_batch(texts)
+        with timer.stage("vectorize"):
+            queries = self.vectorize(analyzed)
+        return self.top_k_vectors(queries, k, memory_budget, job_filters, dense)
+
+    def top_k_vectors(self, queries, k, memory_budget=None, job_filters=None, dense=False):
+        """
+        Returns the best matching jobs for already vectorized queries, as top_k_batch() does for raw texts.
+
+        Any matrix with the index vocabulary as columns can be given, including rows of the job matrix itself.
+
+        Args:
+            queries (csr_matrix): One L2-normalized row per query.
+            k (int): The maximum number of jobs to return per query.
+            memory_budget (int): The maximum size in bytes of one chunk's product, or None for a single product.
+            job_filters (list): One JobFilter (or None) per query, or None to return unfiltered results.
+            dense (bool): Whether to rank by the LSA embeddings if the index has them.
+
+        Returns:
+            list: One list of (job id, score) pairs per query.
+        """
+        if not len(self):
+            return [[] for _ in range(queries.shape[0])]
+        if job_filters is None:
+            job_filters = [None] * queries.shape[0]
+        timer = current_timer()
+        if dense and self.embeddings is not None:
+            results = []
+            for row, job_filter in enumerate(job_filters):
+                with timer.stage("score"):
+                    mask = job_filter.mask(self) if job_filter else None
+                    positions, scores = self._dense_top_k(queries[row], k, mask)
+                with timer.stage("rank"):
+                    results.append(self.matches(positions, scores, k, mask))
+            timer.count("catalog", len(self))
+            return results
+        results = []
+        for start, end in self._chunks(queries, memory_budget):
+            with timer.stage("score"):
+                products = (queries[start:end] @ self.matrix.T).tocsr()
+            with timer.stage("rank"):
+                results.extend(
+                    self._rank_row(products, row, k, job_filters[start + row]) for row in range(products.shape[0])
+                )
+            timer.count("candidates", products.nnz)
+        timer.count("catalog", len(self))
+        return results
+
+    @cached_property
+    def inverted(self):
+        """
+        The inverted index of the job matrix, built on first use unless it was loaded with the index.
+
+        Since every change to the jobs produces a new JobIndex, the inverted index always matches the matrix.
+
+        Returns:
+            InvertedIndex: The posting lists of the job matrix.
+        """
+        return InvertedIndex.from_matrix(self.matrix)
+
+    @cached_property
+    def document_frequencies(self):
+        """
+        The number of jobs containing each vocabulary term.
+
+        Returns:
+            ndarray: One count per column of the job matrix.
+        """
+        return np.diff(self.inverted.indptr)
+
+    def _dense_top_k(self, query, k, mask=None, stats=None):
+        projected = np.asarray(query @ self.projection, dtype=np.float32).ravel()
+        norm = np.linalg.norm(projected)
+        if not norm:
+            # No known term: leave the ranking to the zero-score fill, as the inverted index does.
+            positions, scores = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        else:
+            scores = self._dense_scores(projected / norm)
+            positions = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+            positions, scores = select_top_k(positions, scores[positions], k)
+        if stats is not None:
+            stats["candidates"] = len(self) if mask is None else int(mask.sum())
+        return positions, scores
+
+    def _dense_scores(self, query):
+        if self.embeddings.dtype == np.float32:
+            return self.embeddings @ query
+        # There is no BLAS routine for float16, so blocks of rows are converted first.
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), DENSE_BLOCK_ROWS):
+            block = self.embeddings[start:start + DENSE_BLOCK_ROWS]
+            np.matmul(block.astype(np.float32), query, out=scores[start:start + DENSE_BLOCK_ROWS])
+        return scores
+
+    def _chunks(self, queries, memory_budget):
+        rows = queries.shape[0]
+        if memory_budget is None:
+            yield 0, rows
+            return
+        bounds = (queries != 0).astype(np.int64) @ self.document_frequencies
+        costs = np.minimum(bounds, len(self)) * PRODUCT_BYTES_PER_NONZERO
+        start, used = 0, 0
+        for row, cost in enumerate(costs.tolist()):
+            if row > start and used + cost > memory_budget:
+                yield start, row
+                start, used = row, 0
+            used += cost
+        if start < rows:
+            yield start, rows
+
+    def _rank_row(self, products, row, k, job_filter):
+        start, end = products.indptr[row], products.indptr[row + 1]
+        positions = products.indices[start:end]
+        scores = products.data[start:end]
+        if job_filter:
+            allowed = job_filter.allows(self, positions)
+            positions, scores = positions[allowed], scores[allowed]
+        positions, scores = select_top_k(positions, scores, k)
+        mask = job_filter.mask(self) if job_filter and len(positions) < k else None
+        return self.matches(positions, scores, k, mask)
+
+    def matches(self, positions, scores, k, mask=None):
+        """
+        Turns ranked index positions into the (job id, score) pairs returned to callers.
+
+        If fewer than k positions are given, the list is filled up with zero-score jobs in index order, as a stable
+        sort of every score would rank them.
+
+        Args:
+            positions (ndarray): The ranked positions of the matching jobs.
+            scores (ndarray): The score of each position.
+            k (int): The number of jobs to return.
+            mask (ndarray): A boolean array with one entry per job, False for jobs that must not be filled in, or
+                None.
+
+        Returns:
+            list: Up to k (job id, score) pairs ordered by decreasing score.
+        """
+        matches = [(int(self.job_ids[position]), float(score)) for position, score in zip(positions, scores)]
+        if len(matches) >= k:
+            return matches
+        matched = set(positions.tolist())
+        eligible = np.flatnonzero(mask) if mask is not None else range(len(self))
+        for position in eligible:
+            if len(matches) >= k:
+                break
+            if position not in matched:
+                matches.append((int(self.job_ids[position]), 0.0))
+        return matches
+
+    def upsert(self, job_id, text, experience_required=0, location=""):
+        """
+        Returns a copy of the index with a job added, or replaced if it is already indexed.
+
+        Args:
+            job_id (int): The id of the job.
+            text (str): The job's required skills.
+            experience_required (int): The job's required years of experience.
+            location (str): The job's location.
+
+        Returns:
+            JobIndex: The updated index.
+        """
+        return self.upsert_many([(job_id, text, experience_required, location)])
+
+    def upsert_many(self, rows):
+        """
+        Returns a copy of the index with many jobs added, or replaced if they are already indexed.
+
+        The jobs are vectorized together and the index is copied once, however many jobs there are.
+
+        Args:
+            rows (list): (job id, required skills, experience required, location) rows.
+
+        Returns:
+            JobIndex: The updated index.
+        """
+        if not rows:
+            return self
+        job_ids, texts, experience, locations = zip(*rows)
+        base = self.remove_many(job_ids)
+        matrix = prune(base.transform_many(list(texts)), self.prune_threshold)
+        if base.matrix.shape[1] != matrix.shape[1]:
+            # Only happens for an index without vocabulary, where every row is empty.
+            matrix = sparse.csr_matrix((len(rows), base.matrix.shape[1]), dtype=np.float32)
+
+        location_names = base.location_names
+        location_codes = []
+        for location in map(normalize_location, locations):
+            if location not in location_names:
+                location_names += (location,)
+            location_codes.append(location_names.index(location))
+
+        embeddings = None
+        if base.embeddings is not None:
+            # Project the new jobs with the existing components, as their TF-IDF rows use the existing vocabulary.
+            embedding = normalize(np.asarray(matrix @ base.projection, dtype=np.float32))
+            embeddings = np.concatenate([base.embeddings, embedding.astype(base.embeddings.dtype)])
+
+        return type(self)(
+            base.vocabulary,
+            base.idf,
+            sparse.vstack([base.matrix, matrix], format="csr"),
+            np.append(base.job_ids, job_ids),
+            experience=np.append(base.experience, experience),
+            location_codes=np.append(base.location_codes, location_codes),
+            location_names=location_names,
+            built_at=self.built_at,
+            projection=base.projection,
+            embeddings=embeddings,
+            features=base.features,
+            prune_threshold=self.prune_threshold,
+        )
+
+    def remove(self, job_id):
+        """
+        Returns a copy of the index without the given job.
+
+        Args:
+            job_id (int): The id of the job to drop.
+
+        Returns:
+            JobIndex: The updated index, or this index if the job was not indexed.
+        """
+        return self.remove_many([job_id])
+
+    def remove_many(self, job_ids):
+        """
+        Returns a copy of the index without the given jobs.
+
+        Args:
+            job_ids (iterable): The ids of the jobs to drop. Ids that are not indexed are ignored.
+
+        Returns:
+            JobIndex: The updated index, or this index if none of the jobs was indexed.
+        """
+        positions = [position for position in map(self.position, job_ids) if position is not None]
+        if not positions:
+            return self
+        keep = np.ones(len(self), dtype=bool)
+        keep[positions] = False
+        return type(self)(
+            self.vocabulary,
+            self.idf,
+            self.matrix[keep],
+            self.job_ids[keep],
+            experience=self.experience[keep],
+            location_codes=self.location_codes[keep],
+            location_names=self.location_names,
+            built_at=self.built_at,
+            projection=self.projection,
+            embeddings=self.embeddings[keep] if self.embeddings is not None else None,
+            features=self.features,
+            prune_threshold=self.prune_threshold,
+        )
+
+    def save(self, directory):
+        """
+        Writes the index to a new directory, one .npy file per array plus a JSON file of metadata.
+
+        Args:
+            directory (str or Path): The directory to create. It must not exist yet.
+        """
+        inverted = self.inverted
+        arrays = {
+            "matrix_data": self.matrix.data,
+            "matrix_indices": self.matrix.indices,
+            "matrix_indptr": self.matrix.indptr,
+            "postings_indptr": inverted.indptr,
+            "postings_positions": inverted.positions,
+            "postings_weights": inverted.weights,
+            "max_weights": inverted.max_weights,
+            "job_ids": self.job_ids,
+            "sorted_ids": self.sorted_ids,
+            "sorted_positions": self.sorted_positions,
+            "experience": self.experience,
+            "location_codes": self.location_codes,
+            "vocabulary": self.vocabulary,
+            "idf": self.idf,
+            "projection": self.projection,
+            "embeddings": self.embeddings,
+        }
+        metadata = {
+            "format": self.format,
+            "version": self.version,
+            "built_at": self.built_at,
+            "shape": list(self.matrix.shape),
+            "location_names": list(self.location_names),
+            "dense": self.embeddings is not None,
+            "features": self.features,
+            "prune_threshold": self.prune_threshold,
+        }
+        os.makedirs(directory)
+        for name in self.ARRAYS + self.DENSE_ARRAYS:
+            if arrays[name] is not None:
+                np.save(os.path.join(directory, f"{name}.npy"), arrays[name], allow_pickle=False)
+        with open(os.path.join(directory, "metadata.json"), "w", encoding="utf-8") as handle:
+            json.dump(metadata, handle)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Opens an index previously written by save().
+
+        The arrays are memory-mapped read-only rather than read, so loading is fast and the pages are shared with
+        every other process that maps the same directory.
+
+        Args:
+            directory (str or Path): The index directory.
+
+        Returns:
+            JobIndex: The loaded index, or an index of another FORMAT that the caller should discard.
+        """
+        with open(os.path.join(directory, "metadata.json"), encoding="utf-8") as handle:
+            metadata = json.load(handle)
+        if metadata.get("format") != cls.FORMAT:
+            index = cls.empty()
+            index.format = metadata.get("format")
+            return index
+
+        names = cls.ARRAYS + (cls.DENSE_ARRAYS if metadata.get("dense") else ())
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+            for name in names
+        }
+        matrix = sparse.csr_matrix(
+            (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]), shape=metadata["shape"]
+        )
+        inverted = InvertedIndex(
+            arrays["postings_indptr"],
+            arrays["postings_positions"],
+            arrays["postings_weights"],
+            metadata["shape"][0],
+            max_weights=arrays["max_weights"],
+        )
+        return cls(
+            arrays["vocabulary"],
+            arrays["idf"],
+            matrix,
+            arrays["job_ids"],
+            experience=arrays["experience"],
+            location_codes=arrays["location_codes"],
+            location_names=metadata["location_names"],
+            built_at=metadata["built_at"],
+            version=metadata["version"],
+            sorted_ids=arrays["sorted_ids"],
+            sorted_positions=arrays["sorted_positions"],
+            inverted=inverted,
+            projection=arrays.get("projection"),
+            embeddings=arrays.get("embeddings"),
+            features=metadata["features"],
+            prune_threshold=metadata["prune_threshold"],
+        )
@@ -0,0 +1,173 @@
+"""
+Inverted index over the job TF-IDF matrix with MaxScore top-K retrieval.
+
+A seeker usually shares terms with a small fraction of the catalog, so instead of multiplying the query against every
+job row, the index walks the posting lists of the query terms only. Terms are visited by decreasing upper bound of
+their contribution; once the jobs seen so far guarantee a top-K threshold that the remaining terms cannot reach on
+their own, no new candidates are admitted and the remaining posting lists are only probed for existing candidates.
+Candidates that can no longer reach the threshold are dropped as well.
+
+The scores are the same dot products as the full matrix product, so the ranking matches the cosine ranking of
+`JobIndex.scores()`.
+"""
+
+import threading
+
+import numpy as np
+
+# Tolerance for floating point differences between the pruning bounds and the accumulated scores, above the rounding
+# error of float32 weights.
+EPSILON = 1e-6
+
+
+def select_top_k(positions, scores, k):
+    """
+    Orders the k best scoring jobs by decreasing score, then by position.
+
+    The k-th best score is found with a partial selection, so only the jobs reaching it are sorted, not every scored
+    job.
+
+    Args:
+        positions (ndarray): The job positions.
+        scores (ndarray): The score of each position.
+        k (int): The maximum number of jobs to return.
+
+    Returns:
+        tuple: The k best positions and their scores, in ranking order.
+    """
+    if len(scores) > k > 0:
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        # Keep every job tied with the k-th score, so ties are still broken by position.
+        best = scores >= kth
+        positions, scores = positions[best], scores[best]
+    order = np.lexsort((positions, -scores))[:k]
+    return positions[order], scores[order]
+
+
+class InvertedIndex:
+    """
+    Posting lists of (job position, weight) per vocabulary term.
+
+    Attributes:
+        indptr (ndarray): The start of each term's postings in `positions` and `weights`.
+        positions (ndarray): The job positions of all postings, sorted within each term.
+        weights (ndarray): The TF-IDF weight of each posting.
+        max_weights (ndarray): The largest weight of each term, used as its score upper bound.
+        size (int): The number of jobs.
+
+    Scores are accumulated in a per-thread buffer with one slot per job. Only the slots of candidate jobs are ever
+    written, and they are reset after each query, so a query costs time in proportion to the postings it reads.
+
+    The arrays can be memory-mapped from a saved job index, in which case they are shared between processes.
+
+    Methods:
+        from_matrix(matrix): Builds the posting lists of a job matrix.
+        top_k(query, k, mask): Returns the k best scoring job positions for a query vector.
+    """
+
+    def __init__(self, indptr, positions, weights, size, max_weights=None):
+        self.indptr = indptr
+        self.positions = positions
+        self.weights = weights
+        self.size = size
+        if max_weights is None:
+            max_weights = np.zeros(len(indptr) - 1)
+            non_empty = np.flatnonzero(np.diff(indptr))
+            if len(non_empty):
+                max_weights[non_empty] = np.maximum.reduceat(weights, indptr[non_empty])
+        self.max_weights = max_weights
+        self._local = threading.local()
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """
+        Builds the posting lists of a job matrix.
+
+        Args:
+            matrix (csr_matrix): The jobs x vocabulary TF-IDF matrix.
+
+        Returns:
+            InvertedIndex: The inverted index of the matrix.
+        """
+        postings = matrix.tocsc()
+        postings.sort_indices()
+        return cls(postings.indptr, postings.indices, postings.data, postings.shape[0])
+
+    def top_k(self, query, k, mask=None, stats=None):
+        """
+        Returns the best scoring jobs for a query vector.
+
+        Only jobs that share at least one term with the query, and are allowed by the mask, are scored, so jobs with
+        a zero score are never returned.
+
+        Args:
+            query (csr_matrix): A 1 x vocabulary query row.
+            k (int): The maximum number of jobs to return.
+            mask (ndarray): A boolean array with one entry per job, False for jobs to skip, or None.
+            stats (dict): If given, receives the number of 'candidates' that were scored.
+
+        Returns:
+            tuple: The job positions and their scores, ordered by decreasing score and then by position.
+        """
+        terms, query_weights = query.indices, query.data
+        bounds = query_weights * self.max_weights[terms]
+        order = np.argsort(-bounds, kind="stable")
+        order = order[bounds[order] > 0]
+        terms, query_weights, bounds = terms[order], query_weights[order], bounds[order]
+        # remaining[i] bounds the score a job can still gain from terms i and later.
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+
+        accumulator, seen = self._buffers()
+        candidates = np.zeros(0, dtype=self.positions.dtype)
+        threshold = 0.0
+        scored = 0
+        try:
+            for i, (term, weight) in enumerate(zip(terms.tolist(), query_weights.tolist())):
+                start, end = self.indptr[term], self.indptr[term + 1]
+                positions = self.positions[start:end]
+                contributions = self.weights[start:end] * weight
+
+                if remaining[i] >= threshold - EPSILON:
+                    # Essential term: jobs only found from here on could still make it into the top k.
+                    if mask is not None:
+                        allowed = mask[positions]
+                        positions, contributions = positions[allowed], contributions[allowed]
+                    new = positions[~seen[positions]]
+                    seen[new] = True
+                    scored += len(new)
+                    candidates = np.concatenate([candidates, new])
+                    accumulator[positions] += contributions
+                elif len(candidates) * np.log2(len(positions) + 1) < len(positions):
+                    # Non-essential term with few candidates left: probe its postings for them.
+                    found = np.minimum(np.searchsorted(positions, candidates), len(positions) - 1)
+                    hits = positions[found] == candidates
+                    accumulator[candidates[hits]] += contributions[found[hits]]
+                else:
+                    # Non-essential term: only add its contribution to the existing candidates.
+                    hits = seen[positions]
+                    accumulator[positions[hits]] += contributions[hits]
+
+                if len(candidates) >= k:
+                    scores = accumulator[candidates]
+                    threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                    alive = scores + remaining[i + 1] >= threshold - EPSILON
+                    seen[candidates[~alive]] = False
+                    accumulator[candidates[~alive]] = 0.0
+                    candidates = candidates[alive]
+
+            if stats is not None:
+                stats["candidates"] = scored
+            return select_top_k(candidates, accumulator[candidates], k)
+        finally:
+            # Only reset the entries this query touched, so the buffers stay cheap to reuse.
+            seen[candidates] = False
+            accumulator[candidates] = 0.0
+
+    def _buffers(self):
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = (np.zeros(self.size, dtype=np.float32), np.zeros(self.size, dtype=bool))
+            self._local.buffers = buffers
+        return buffers
+
+
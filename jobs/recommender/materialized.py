@@ -0,0 +1,165 @@
+"""
+Materialized top-K recommendations per job seeker.
+
+Most seekers request recommendations again without having changed their profile, so their ranking (with their default
+filters applied) is stored in the `SeekerRecommendation` table and served with a single indexed read until it is
+invalidated.
+
+Incremental updates of the job index keep its vocabulary and IDF weights, so the score of a job for a seeker only
+changes with the job itself. Rows therefore stay valid until the next full build, and each batch of applied job changes
+only deletes the rows those jobs could change (`invalidate()`).
+"""
+
+import hashlib
+from itertools import islice
+
+from django.conf import settings
+
+from jobs.models import SeekerRecommendation
+from .filters import JobFilter
+from .similar import IN_CHUNK_SIZE
+from .store import index_store
+from .timing import current_timer
+
+# Scores recomputed for a batch of changed jobs may differ from the stored ones in the last bits of float32 precision.
+SCORE_TOLERANCE = 1e-6
+
+
+def profile_fingerprint(profile):
+    """
+    Hashes the profile fields recommendations depend on, so stored recommendations can be matched against the
+    current profile.
+
+    Args:
+        profile (JobSeekerProfile): The job seeker profile.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the skills, experience and preferred location.
+    """
+    key = "\0".join([profile.skills, str(profile.experience), profile.preferred_location])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def lookup(index, profile):
+    """
+    Reads the stored recommendations of a profile if they are still valid.
+
+    Rows computed against any version of the index derived from the same full build are valid: job changes applied
+    since deleted the rows they changed.
+
+    Args:
+        index (JobIndex): The current job index.
+        profile (JobSeekerProfile): The job seeker profile.
+
+    Returns:
+        list or None: (job id, score) pairs ordered by decreasing score, or None if nothing valid is stored.
+    """
+    stored = SeekerRecommendation.objects.filter(
+        profile_id=profile.pk,
+        index_built_at=index.built_at,
+        profile_hash=profile_fingerprint(profile),
+    ).values_list("job_ids", "scores").first()
+    if stored is None:
+        return None
+    return list(zip(*stored))
+
+
+def materialize(index, profiles, k, memory_budget=None):
+    """
+    Scores a batch of profiles against the job index and stores their top-K recommendations.
+
+    Each profile's default filters (experience ceiling, preferred location, applied jobs) are applied. All profiles of
+    the batch are scored with chunked sparse matrix products, and their rows are inserted or replaced with one bulk
+    query. Rows are only stored if the index is still the published one: rows computed against an index that job
+    changes were applied to since would have been missed by their invalidation.
+
+    Args:
+        index (JobIndex): The current job index.
+        profiles (list): The job seeker profiles to score.
+        k (int): The number of recommendations to store per profile.
+        memory_budget (int): The maximum size in bytes of one chunk of the seeker x job product, or None.
+
+    Returns:
+        list: The (job id, score) pairs of each profile, in the order of `profiles`.
+    """
+    timer = current_timer()
+    with timer.stage("fetch"):
+        job_filters = JobFilter.for_profiles(profiles)
+    results = index.top_k_batch(
+        [profile.skills for profile in profiles],
+        k,
+        memory_budget=memory_budget,
+        job_filters=job_filters,
+        dense=settings.RECOMMENDATION_RETRIEVAL == "dense",
+    )
+    rows = [
+        SeekerRecommendation(
+            profile_id=profile.pk,
+            profile_hash=profile_fingerprint(profile),
+            index_version=index.version,
+            index_built_at=index.built_at,
+            job_ids=[job_id for job_id, _ in matches],
+            scores=[score for _, score in matches],
+        )
+        for profile, matches in zip(profiles, results)
+    ]
+    with timer.stage("store"):
+        if index.version == index_store.published_version():
+            SeekerRecommendation.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["profile"],
+                update_fields=["profile_hash", "index_version", "index_built_at", "job_ids", "scores", "computed_at"],
+            )
+    return results
+
+
+def invalidate(index, job_ids, batch_size=1000):
+    """
+    Deletes the stored recommendations that changed jobs could alter, once the changes are applied to the index.
+
+    A row is deleted if it lists one of the jobs, or if one of the jobs now in the index scores at least as high as
+    the row's last job, or if it holds fewer than `RECOMMENDATION_MATERIALIZED_TOP_K` jobs, so that any job passing the
+    filters would be added. The filters themselves are not evaluated: some rows are deleted needlessly, but none is
+    kept stale. Rows computed against an earlier full build are deleted as well.
+
+    Args:
+        index (JobIndex): The updated job index.
+        job_ids (iterable): The ids of the added, updated and removed jobs.
+        batch_size (int): The number of rows read and scored at once.
+
+    Returns:
+        int: The number of deleted rows.
+    """
+    job_ids = set(job_ids)
+    deleted, _ = SeekerRecommendation.objects.exclude(index_built_at=index.built_at).delete()
+    if not job_ids:
+        return deleted
+    positions = [position for position in map(index.position, job_ids) if position is not None]
+    dense = settings.RECOMMENDATION_RETRIEVAL == "dense"
+    k = settings.RECOMMENDATION_MATERIALIZED_TOP_K
+
+    stale = []
+    rows = SeekerRecommendation.objects.values_list("id", "job_ids", "scores", "profile__skills").iterator(
+        chunk_size=batch_size
+    )
+    while chunk := list(islice(rows, batch_size)):
+        scored = []
+        for row_id, stored_ids, scores, skills in chunk:
+            if job_ids.intersection(stored_ids) or (positions and len(stored_ids) < k):
+                stale.append(row_id)
+            elif positions:
+                scored.append((row_id, scores[-1], skills))
+        if scored:
+            queries = index.transform_many([skills for _, _, skills in scored])
+            best = index.score_positions(queries, positions, dense).max(axis=1)
+            # A changed job scoring 0 is appended after the zero-score jobs filling the row, so it cannot enter it.
+            stale.extend(
+                row_id for (row_id, lowest, _), score in zip(scored, best.tolist())
+                if score and score >= lowest - SCORE_TOLERANCE
+            )
+
+    stale = iter(stale)
+    while chunk := list(islice(stale, IN_CHUNK_SIZE)):
+        deleted += SeekerRecommendation.objects.filter(id__in=chunk).delete()[0]
+    return deleted
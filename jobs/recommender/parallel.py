@@ -0,0 +1,178 @@
+"""
+Parallel full build of the job index.
+
+A full build analyzes and vectorizes every job's required skills, which is CPU-bound Python. `build_parallel()` splits
+the catalog into shards of consecutive job ids and hands each shard to a worker process, which reads its jobs and
+counts their terms against a vocabulary of its own. The parent only merges the shards: it takes the union of their
+vocabularies, renumbers each shard's columns into it (both are sorted, so the order of every row is kept), stacks the
+shards into a single CSR matrix in id order and applies the IDF weights. The result is the same index as
+`JobIndex.build()` fits on a single core, so the expensive part of the build scales with the number of workers.
+
+With the hashing vectorizer, shards count the stored term hashes of their jobs into the fixed hashed columns instead,
+and the IDF weights come from the synced IDF array.
+"""
+
+import logging
+import time
+
+import django
+import numpy as np
+from django.db import connections
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from jobs.models import Job
+from .hashing import hash_terms, load_idf, save_idf
+from .index import JobIndex
+from .store import HASHED_FIELDS, INDEXED_FIELDS
+from .text import analyze, normalize_location
+
+logger = logging.getLogger(__name__)
+
+
+def shard_bounds(shard_size):
+    """
+    Splits the job catalog into ranges of ids holding the same number of jobs.
+
+    Args:
+        shard_size (int): The number of jobs per shard.
+
+    Returns:
+        list: (first id, first id of the next shard) pairs, the last one open-ended with None.
+    """
+    starts = list(Job.objects.order_by("id").values_list("id", flat=True))[::shard_size]
+    return list(zip(starts, starts[1:] + [None]))
+
+
+def _vectorize_shard(start, end, features):
+    # Runs in a worker process: read the jobs of one id range and count their terms.
+    jobs = Job.objects.filter(id__gte=start).order_by("id")
+    if end is not None:
+        jobs = jobs.filter(id__lt=end)
+
+    job_ids, experience, locations, texts = [], [], [], []
+    if features:
+        rows, columns, counts = [], [], []
+        for job_id, skill_hashes, required_skills, experience_required, location in jobs.values_list(*HASHED_FIELDS):
+            if skill_hashes is None:
+                skill_hashes = hash_terms(required_skills)
+            for term, count in skill_hashes:
+                rows.append(len(job_ids))
+                columns.append(term % features)
+                counts.append(count)
+            job_ids.append(job_id)
+            experience.append(experience_required)
+            locations.append(normalize_location(location))
+        matrix = sparse.csr_matrix((counts, (rows, columns)), shape=(len(job_ids), features), dtype=np.float64)
+        matrix.sum_duplicates()
+        return np.array(job_ids, dtype=np.int64), experience, locations, None, matrix
+
+    for job_id, required_skills, experience_required, location in jobs.values_list(*INDEXED_FIELDS):
+        job_ids.append(job_id)
+        texts.append(required_skills)
+        experience.append(experience_required)
+        locations.append(normalize_location(location))
+    vectorizer = CountVectorizer(analyzer=analyze, dtype=np.float64)
+    try:
+        matrix = vectorizer.fit_transform(texts)
+        vocabulary = vectorizer.get_feature_names_out().astype(str)
+    except ValueError:
+        # Every job of the shard only contains stopwords or punctuation.
+        matrix, vocabulary = sparse.csr_matrix((len(job_ids), 0)), np.array([], dtype=str)
+    return np.array(job_ids, dtype=np.int64), experience, locations, vocabulary, matrix
+
+
+def build_parallel(workers, shard_size, dimensions=0, dense_dtype="float32", prune_threshold=0.0, features=0,
+                   idf_path=None):
+    """
+    Builds the job index from the database, vectorizing shards of the catalog in parallel processes.
+
+    Args:
+        workers (int): The number of worker processes. With 1, the shards are vectorized in this process.
+        shard_size (int): The number of jobs per shard.
+        dimensions (int): The number of dimensions of the LSA embeddings, or 0 for none.
+        dense_dtype (str): The type the embeddings are stored as, 'float32' or 'float16'.
+        prune_threshold (float): The smallest weight kept in the job rows, or 0 to keep every weight.
+        features (int): The number of hashed term columns, or 0 to fit a vocabulary.
+        idf_path (str): The IDF array of the hashed columns. It is computed from the catalog and written there if it
+            is missing.
+
+    Returns:
+        JobIndex: The built index, the same as `JobIndex.build()` or `JobIndex.build_hashed()` would return.
+    """
+    started = time.perf_counter()
+    bounds = shard_bounds(shard_size)
+    if workers <= 1 or len(bounds) <= 1:
+        shards = [_vectorize_shard(start, end, features) for start, end in bounds]
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # Imports multiprocessing, only needed offline
+
+        # Workers open their own database connections; closing ours first keeps them from sharing its socket.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            shards = list(executor.map(
+                _vectorize_shard,
+                [start for start, _ in bounds],
+                [end for _, end in bounds],
+                [features] * len(bounds),
+            ))
+    vectorized = time.perf_counter()
+
+    index = _merge(shards, features, idf_path)
+    if len(index):
+        index = index.finish(dimensions, dense_dtype, prune_threshold)
+    logger.info(
+        "Built the job index of %d jobs from %d shards with %d workers: vectorized in %.2fs, merged in %.2fs.",
+        len(index), len(bounds), workers, vectorized - started, time.perf_counter() - vectorized,
+    )
+    return index
+
+
+def _merge(shards, features, idf_path):
+    if not shards and not features:
+        return JobIndex.empty()
+    if not shards:
+        idf = load_idf(idf_path, features)
+        idf = idf if idf is not None else np.ones(features, dtype=np.float32)
+        return JobIndex([], idf, sparse.csr_matrix((0, features)), [], features=features)
+    job_ids = np.concatenate([shard[0] for shard in shards])
+    experience = [value for shard in shards for value in shard[1]]
+    location_names, location_codes = np.unique(
+        np.array([value for shard in shards for value in shard[2]], dtype=object), return_inverse=True
+    )
+
+    if features:
+        vocabulary = []
+        matrix = sparse.vstack([shard[4] for shard in shards], format="csr")
+    else:
+        vocabulary = np.unique(np.concatenate([shard[3] for shard in shards]))
+        blocks = []
+        for _, _, _, shard_vocabulary, counts in shards:
+            # Both vocabularies are sorted, so renumbering the columns keeps every row's columns in order.
+            columns = np.searchsorted(vocabulary, shard_vocabulary)
+            blocks.append(sparse.csr_matrix(
+                (counts.data, columns[counts.indices], counts.indptr), shape=(counts.shape[0], len(vocabulary))
+            ))
+        matrix = sparse.vstack(blocks, format="csr")
+
+    idf = load_idf(idf_path, features) if features else None
+    if idf is None:
+        # Same weighting as the fitted TfidfVectorizer: smoothed IDF over the document frequency of each column.
+        document_frequencies = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log((1 + len(job_ids)) / (1 + document_frequencies)) + 1
+        if features:
+            # Rounded as stored in the synced file, so later builds from the file weight jobs the same way.
+            idf = idf.astype(np.float32)
+            save_idf(idf, idf_path)
+    matrix.data *= np.asarray(idf, dtype=np.float64)[matrix.indices]
+    return JobIndex(
+        vocabulary,
+        idf,
+        normalize(matrix, copy=False),
+        job_ids,
+        experience=experience,
+        location_codes=location_codes,
+        location_names=location_names,
+        features=features,
+    )
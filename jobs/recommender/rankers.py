@@ -0,0 +1,278 @@
+"""
+Deadline-aware ranking of recommendations with fallbacks to cheaper rankers.
+
+A recommendation request is answered by a chain of rankers (`RECOMMENDATION_RANKERS`), skipping those that cannot
+answer yet. The first one, the primary ranker, runs in a worker thread under the request's latency budget
+(`RECOMMENDATION_DEADLINE_MS`). If it has not returned by the deadline, or fails, the next rankers are tried in order
+in the request's thread until one answers; they are expected to be cheap, and the last one's errors are raised. The
+built-in rankers are:
+
+- "index": the TF-IDF ranking of the job index, with the materialized and cached rankings (`ranking.ranked_jobs()`).
+- "streaming": the streaming scorer, only available while no job index is loaded (`streaming.stream_top_k()`).
+- "keyword_overlap": the share of the seeker's skill terms each job contains, counted from the posting lists of the
+  index without any weights (`JobIndex.top_k_overlap()`).
+- "latest": the most recently posted jobs that pass the filters, with zero scores, which only needs the database.
+
+Other rankers are given by the dotted path of a `Ranker` subclass. A primary ranker that is still running when the
+request moved on is not interrupted; it finishes in its worker thread and its result is dropped, although what it
+stored on the way (materialized recommendations, cached rankings) is kept for the next requests.
+
+Without a budget, the primary ranker runs in the request's thread as well. The number of requests each ranker
+answered, missed the deadline on or failed on is counted per process in `ranker_counters`.
+"""
+
+import logging
+import threading
+import time
+from concurrent import futures
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+from .filters import JobFilter
+from .ranking import ranked_jobs
+from .store import index_store
+from .streaming import stream_top_k
+from .timing import StageTimer, activate, current_timer
+
+logger = logging.getLogger(__name__)
+
+
+class Ranker:
+    """
+    A way of ranking the jobs of a job seeker, one link of the fallback chain.
+
+    Attributes:
+        name (str): The name reported in responses and counters.
+        cacheable (bool): Whether responses ranked by it may be cached. The rankings of fallbacks are not, so the
+            next request gets another chance at the primary ranker.
+
+    Methods:
+        available(): Returns whether the ranker can answer now.
+        rank(profile, depth, overrides): Returns the head of a job seeker's ranking.
+    """
+
+    name = None
+    cacheable = False
+
+    def available(self):
+        """
+        Returns whether the ranker can answer now, for example whether the data it needs is loaded.
+
+        Returns:
+            bool: True if the ranker can be tried.
+        """
+        return True
+
+    def rank(self, profile, depth, overrides):
+        """
+        Returns the head of a job seeker's ranking.
+
+        Args:
+            profile (JobSeekerProfile): The job seeker profile.
+            depth (int): The number of ranked jobs needed.
+            overrides (dict): Filter overrides, as accepted by `JobFilter.for_profile()`.
+
+        Returns:
+            list: Up to `depth` (job id, score) pairs in ranking order.
+        """
+        raise NotImplementedError
+
+
+class IndexRanker(Ranker):
+    """
+    Ranks jobs by the cosine similarity of their TF-IDF vectors in the job index.
+    """
+
+    name = "index"
+    cacheable = True
+
+    def available(self):
+        return index_store.get(build=False) is not None
+
+    def rank(self, profile, depth, overrides):
+        return ranked_jobs(index_store.get(), profile, depth, overrides)
+
+
+class StreamingRanker(Ranker):
+    """
+    Ranks jobs by streaming the job catalog, until the job index is loaded.
+    """
+
+    name = "streaming"
+
+    def available(self):
+        return index_store.get(build=False) is None
+
+    def rank(self, profile, depth, overrides):
+        with current_timer().stage("fetch"):
+            job_filter = JobFilter.for_profile(profile, overrides)
+        return stream_top_k(profile.skills, depth, job_filter)
+
+
+class KeywordOverlapRanker(Ranker):
+    """
+    Ranks jobs by the share of the job seeker's skill terms they contain, from the posting lists of the job index.
+    """
+
+    name = "keyword_overlap"
+
+    def available(self):
+        return index_store.get(build=False) is not None
+
+    def rank(self, profile, depth, overrides):
+        with current_timer().stage("fetch"):
+            job_filter = JobFilter.for_profile(profile, overrides)
+        return index_store.get().top_k_overlap(profile.skills, depth, job_filter)
+
+
+class LatestJobsRanker(Ranker):
+    """
+    Lists the most recently posted jobs that pass the filters, with zero scores.
+    """
+
+    name = "latest"
+
+    def rank(self, profile, depth, overrides):
+        with current_timer().stage("fetch"):
+            job_filter = JobFilter.for_profile(profile, overrides)
+            jobs = job_filter.filter_queryset(Job.objects.order_by("-posted_at", "-id"))
+            return [(job_id, 0.0) for job_id in jobs.values_list("id", flat=True)[:depth]]
+
+
+RANKERS = {
+    ranker.name: ranker
+    for ranker in (IndexRanker, StreamingRanker, KeywordOverlapRanker, LatestJobsRanker)
+}
+
+
+def configured_rankers():
+    """
+    Returns the ranker chain configured by `RECOMMENDATION_RANKERS`.
+
+    Returns:
+        list: `Ranker` instances in fallback order.
+    """
+    names = [name.strip() for name in settings.RECOMMENDATION_RANKERS.split(",") if name.strip()]
+    return [(RANKERS[name] if name in RANKERS else import_string(name))() for name in names]
+
+
+class RankerCounters:
+    """
+    Per-process counts of the requests each ranker answered, missed the deadline on, or failed on.
+
+    Methods:
+        add(ranker, outcome): Counts one outcome of a ranker.
+        snapshot(): Returns a copy of the counts.
+    """
+
+    OUTCOMES = ("answered", "fallbacks", "timeouts", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def add(self, ranker, outcome):
+        """
+        Counts one outcome of a ranker.
+
+        Args:
+            ranker (str): The name of the ranker.
+            outcome (str): 'answered', 'fallbacks' (answered after another ranker did not), 'timeouts' or 'errors'.
+        """
+        with self._lock:
+            counts = self._counts.setdefault(ranker, dict.fromkeys(self.OUTCOMES, 0))
+            counts[outcome] += 1
+
+    def snapshot(self):
+        """
+        Returns a copy of the counts.
+
+        Returns:
+            dict: The counts of every outcome, per ranker name.
+        """
+        with self._lock:
+            return {ranker: dict(counts) for ranker, counts in self._counts.items()}
+
+
+ranker_counters = RankerCounters()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    # Created on first use, so processes that never rank under a deadline do not start threads.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = futures.ThreadPoolExecutor(
+                max_workers=settings.RECOMMENDATION_RANKER_THREADS, thread_name_prefix="ranker"
+            )
+        return _executor
+
+
+def _run(ranker, timer, profile, depth, overrides):
+    # Runs in a worker thread, which has database connections of its own.
+    close_old_connections()
+    try:
+        with activate(timer):
+            return ranker.rank(profile, depth, overrides)
+    finally:
+        close_old_connections()
+
+
+def rank_with_fallback(profile, depth, overrides, deadline=None):
+    """
+    Returns the head of a job seeker's ranking from the primary ranker, or from a fallback if it misses the deadline.
+
+    Args:
+        profile (JobSeekerProfile): The job seeker profile.
+        depth (int): The number of ranked jobs needed.
+        overrides (dict): Filter overrides, as accepted by `JobFilter.for_profile()`.
+        deadline (float): The `time.monotonic()` time by which the primary ranker must answer, or None to wait for
+            it.
+
+    Returns:
+        tuple: The (job id, score) pairs and the `Ranker` that ranked them.
+
+    Raises:
+        ImproperlyConfigured: If no ranker of the chain is available.
+    """
+    rankers = [ranker for ranker in configured_rankers() if ranker.available()]
+    if not rankers:
+        from django.core.exceptions import ImproperlyConfigured
+
+        raise ImproperlyConfigured("No ranker of RECOMMENDATION_RANKERS is available.")
+
+    timer = current_timer()
+    for position, ranker in enumerate(rankers):
+        try:
+            if position or deadline is None or len(rankers) == 1:
+                matches = ranker.rank(profile, depth, overrides)
+            else:
+                # The stages of the primary ranker are only reported if it answers in time.
+                ranker_timer = StageTimer() if timer.enabled else timer
+                future = _get_executor().submit(_run, ranker, ranker_timer, profile, depth, overrides)
+                try:
+                    matches = future.result(timeout=max(deadline - time.monotonic(), 0))
+                except futures.TimeoutError:  # Only an alias of the builtin TimeoutError from Python 3.11
+                    future.cancel()
+                    ranker_counters.add(ranker.name, "timeouts")
+                    logger.warning("The %s ranker missed the recommendation deadline, falling back.", ranker.name)
+                    continue
+                if ranker_timer is not timer:
+                    timer.merge(ranker_timer)
+        except Exception:
+            ranker_counters.add(ranker.name, "errors")
+            if position == len(rankers) - 1:
+                raise
+            logger.exception("The %s ranker failed, falling back.", ranker.name)
+            continue
+
+        ranker_counters.add(ranker.name, "answered")
+        if position:
+            ranker_counters.add(ranker.name, "fallbacks")
+        return matches, ranker
@@ -0,0 +1,60 @@
+"""
+Ranked recommendation lists for paginated results.
+
+The first page of a job seeker with the default filters is served from the materialized recommendations. Deeper pages,
+and rankings with overridden filters, are computed once at a depth of at least a few pages and kept in the Django cache,
+so paging through them does not rank the catalog again. A cached ranking is keyed by the index version, the retrieval
+mode, the profile and the filter, so any change to one of them starts a new ranking.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .filters import JobFilter
+from .materialized import lookup, materialize, profile_fingerprint
+from .timing import current_timer
+
+
+def ranked_jobs(index, profile, depth, overrides=None):
+    """
+    Returns the head of a job seeker's ranking.
+
+    Args:
+        index (JobIndex): The current job index.
+        profile (JobSeekerProfile): The job seeker profile.
+        depth (int): The number of ranked jobs needed.
+        overrides (dict): Filter overrides, as accepted by `JobFilter.for_profile()`, or None for the default filters.
+
+    Returns:
+        list: Up to `depth` (job id, score) pairs ordered by decreasing score. The list is shorter only when fewer
+        jobs pass the filters.
+    """
+    timer = current_timer()
+    materialized_k = settings.RECOMMENDATION_MATERIALIZED_TOP_K
+    if not overrides and depth <= materialized_k:
+        with timer.stage("fetch"):
+            matches = lookup(index, profile)
+        if matches is None:
+            [matches] = materialize(index, [profile], materialized_k)
+        return matches[:depth]
+
+    depth = min(depth, len(index))
+    with timer.stage("fetch"):
+        job_filter = JobFilter.for_profile(profile, overrides)
+        key = "recommendations:ranking:{}:{}:{}:{}:{}".format(
+            profile.pk, index.version, settings.RECOMMENDATION_RETRIEVAL, profile_fingerprint(profile),
+            job_filter.fingerprint(),
+        )
+        cached = cache.get(key)
+    if cached is not None:
+        computed_depth, matches = cached
+        # A ranking shorter than the depth it was computed at already holds every allowed job.
+        if computed_depth >= depth or len(matches) < computed_depth:
+            return matches[:depth]
+        depth = max(depth, 2 * computed_depth)
+
+    depth = min(max(depth, materialized_k), len(index))
+    matches = index.top_k(profile.skills, depth, job_filter, dense=settings.RECOMMENDATION_RETRIEVAL == "dense")
+    with timer.stage("store"):
+        cache.set(key, (depth, matches), settings.RECOMMENDATION_RANKING_CACHE_TIMEOUT)
+    return matches
@@ -0,0 +1,150 @@
+"""
+Cache of recommendation responses.
+
+A job seeker reloading the recommendation page gets the response stored by the previous load instead of going through
+the whole pipeline again. The cache key combines the seeker, a fingerprint of their profile, the request parameters
+and four versions:
+
+- the published version of the job index, which changes whenever queued changes to indexed job fields are applied.
+  Every worker reads it from the index directory, so a job change invalidates the responses of every worker at once,
+  even when each worker has a cache of its own;
+- the details token of the index directory, which is replaced instead when only job fields outside the index (shown in
+  the responses, such as the salary) changed, so the rankings stay valid;
+- the catalog version, a token replaced after job changes were applied, which also invalidates the responses while no
+  index has been published yet (shared between workers only if the cache is);
+- the seeker version, a token replaced whenever the seeker's profile or applications change, which only invalidates
+  theirs.
+
+Tokens are random rather than counters, so a token that was evicted from the cache can be recreated without ever
+colliding with an older one.
+
+Concurrent misses on the same key are computed once: the first request takes a short-lived lock with `cache.add()`
+and the others wait for its result. Only operations every Django backend supports are used, so this works with the
+local-memory and file-based backends as well as shared ones. With the local-memory backend, the cache and the lock are
+per process.
+"""
+
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .store import index_store
+
+CATALOG_VERSION_KEY = "recommendations:catalog-version"
+
+# Seconds between two checks for the result of a request holding the lock.
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _seeker_version_key(seeker_id):
+    return f"recommendations:seeker-version:{seeker_id}"
+
+
+def bump_catalog_version():
+    """
+    Invalidates the cached responses of every job seeker, after a job changed.
+    """
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def bump_seeker_version(seeker_id):
+    """
+    Invalidates the cached responses of one job seeker, after their profile or applications changed.
+
+    Args:
+        seeker_id (int): The user id of the job seeker.
+    """
+    cache.set(_seeker_version_key(seeker_id), uuid.uuid4().hex, None)
+
+
+def catalog_version():
+    """
+    Returns the current catalog version, for caches of other responses that depend on the jobs.
+
+    Returns:
+        str: The published job index version, the details token and the catalog token, which change whenever job
+        changes are applied.
+    """
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # add() keeps a version another request created in the meantime.
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return f"{index_store.published_version()}:{index_store.details_version()}:{version}"
+
+
+def _versions(seeker_id):
+    keys = [CATALOG_VERSION_KEY, _seeker_version_key(seeker_id)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # add() keeps a version another request created in the meantime.
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def response_key(profile, fingerprint, parameters):
+    """
+    Builds the cache key of a recommendation response.
+
+    Args:
+        profile (JobSeekerProfile): The job seeker profile.
+        fingerprint (str): A hash of the profile fields recommendations depend on.
+        parameters (dict): Everything else the response depends on, such as the page and the filter overrides.
+
+    Returns:
+        str: The cache key. The versions, the fingerprint and the parameters are hashed together, so the key stays
+        within the 250 characters memcached accepts.
+    """
+    catalog_version, seeker_version = _versions(profile.user_id)
+    index_versions = index_store.published_version(), index_store.details_version()
+    versioned = (index_versions, catalog_version, seeker_version, fingerprint, sorted(parameters.items()))
+    digest = hashlib.sha256(repr(versioned).encode("utf-8")).hexdigest()
+    return f"recommendations:response:{profile.user_id}:{digest}"
+
+
+def get_or_compute(key, compute, cache_if=None, timeout=None):
+    """
+    Returns a cached response, computing and caching it on a miss.
+
+    Only one request computes a missing entry: the others wait up to `RECOMMENDATION_RESPONSE_CACHE_LOCK_TIMEOUT`
+    seconds for it to be stored, and compute it themselves if it still is not.
+
+    Args:
+        key (str): The cache key, from `response_key()`.
+        compute (callable): Computes the response data when it is not cached.
+        cache_if (callable): Tells from computed data whether it may be cached, or None to cache any data.
+        timeout (int): Seconds the data is cached for. Defaults to `RECOMMENDATION_RESPONSE_CACHE_TIMEOUT`.
+
+    Returns:
+        tuple: The response data and whether it came from the cache.
+    """
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.RECOMMENDATION_RESPONSE_CACHE_LOCK_TIMEOUT
+    if not cache.add(lock_key, 1, lock_timeout):
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            data = cache.get(key)
+            if data is not None:
+                return data, True
+            if cache.add(lock_key, 1, lock_timeout):
+                break  # The other request gave up without storing a result
+        else:
+            return compute(), False
+
+    try:
+        data = compute()
+        if cache_if is None or cache_if(data):
+            cache.set(key, data, settings.RECOMMENDATION_RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+        return data, False
+    finally:
+        cache.delete(lock_key)
@@ -0,0 +1,66 @@
+"""
+TF-IDF index over the job seeker profiles, used to rank the candidates of a job.
+
+The index has the same layout as the job index, with one row per job seeker instead of one per job, so it is saved,
+memory-mapped, published and updated the same way. Instead of fitting its own vocabulary, it vectorizes the seekers'
+skills with the vocabulary (or hashed columns) and IDF weights of the job index, which makes a seeker's score for a job
+the same as the job's score in the seeker's recommendations.
+"""
+
+import numpy as np
+from scipy import sparse
+
+from .index import JobIndex
+from .text import normalize_location
+
+
+class SeekerIndex(JobIndex):
+    """
+    Immutable TF-IDF index of job seeker skills.
+
+    Rows are keyed by the user id of the job seeker: `job_ids` holds the seeker ids, `experience` their years of
+    experience and `location_codes` their preferred location. Everything else is inherited from JobIndex, including
+    top-K retrieval with the inverted index, so ranking the candidates of a job is a `top_k()` call with the job's
+    required skills.
+
+    Methods:
+        build(rows, vocabulary, idf, features): Vectorizes (seeker id, skills, experience, preferred location) rows.
+    """
+
+    @classmethod
+    def build(cls, rows, vocabulary=(), idf=(), features=0):
+        """
+        Builds a new index from scratch with a given vocabulary.
+
+        Args:
+            rows (iterable): Tuples of (seeker id, skills, experience, preferred location).
+            vocabulary (ndarray): The sorted vocabulary terms of the job index.
+            idf (ndarray): The IDF weight of every vocabulary term or hashed column.
+            features (int): The number of hashed columns of the job index, or 0 if its columns are the vocabulary.
+
+        Returns:
+            SeekerIndex: The freshly built index.
+        """
+        seeker_ids, texts, experience, locations = [], [], [], []
+        for seeker_id, skills, seeker_experience, preferred_location in rows:
+            seeker_ids.append(seeker_id)
+            texts.append(skills)
+            experience.append(seeker_experience)
+            locations.append(normalize_location(preferred_location))
+
+        columns = features or len(vocabulary)
+        base = cls(vocabulary, idf, sparse.csr_matrix((0, columns)), [], features=features)
+        if not seeker_ids:
+            return base
+
+        location_names, location_codes = np.unique(np.array(locations, dtype=object), return_inverse=True)
+        return cls(
+            base.vocabulary,
+            base.idf,
+            base.transform_many(texts),
+            seeker_ids,
+            experience=experience,
+            location_codes=location_codes,
+            location_names=location_names,
+            features=base.features,
+        )
@@ -0,0 +1,261 @@
+"""
+Precomputed similar jobs.
+
+The jobs most similar to each job, by cosine similarity of their required skills, are stored in the `SimilarJob` table,
+so the similar jobs of a posting are served with a single indexed read instead of comparing it with every other job.
+
+The table is filled offline by `compute_similar_jobs()`, which multiplies blocks of rows of the job matrix against the
+whole matrix. Blocks can be scored in several worker processes; each worker memory-maps the published index version
+instead of receiving the matrix, so all of them share its pages. Between two full computations, the table is kept up
+to date for created, updated and deleted jobs by `update_similar_jobs()`, which the queue of job changes runs in the
+background (see `changes`).
+"""
+
+from itertools import islice, repeat
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+
+from jobs.models import Job, SimilarJob
+
+# Maximum number of ids per `__in` lookup, below the parameter limits of every supported database.
+IN_CHUNK_SIZE = 900
+
+# The index opened by each worker process, keyed by its version directory.
+_worker_indexes = {}
+
+
+def _chunked(values, size=IN_CHUNK_SIZE):
+    values = iter(values)
+    while chunk := list(islice(values, size)):
+        yield chunk
+
+
+def neighbours(index, positions, n, memory_budget=None):
+    """
+    Computes the most similar jobs of some jobs of the index.
+
+    Args:
+        index (JobIndex): The job index.
+        positions (list or slice): The matrix rows of the jobs.
+        n (int): The maximum number of similar jobs per job.
+        memory_budget (int): The maximum size in bytes of one chunk of the job x job product, or None.
+
+    Returns:
+        list: For every position, up to n (job id, score) pairs ordered by decreasing score. Jobs sharing no skill
+        with the job are left out.
+    """
+    # One more than needed, since the job itself is usually its own best match.
+    results = index.top_k_vectors(index.matrix[positions], n + 1, memory_budget)
+    return [
+        [(job_id, score) for job_id, score in matches if job_id != own and score > 0][:n]
+        for own, matches in zip(index.job_ids[positions].tolist(), results)
+    ]
+
+
+def _similar_block(directory, start, end, n, memory_budget):
+    # Runs in a worker process: open the index version once, then score blocks of it.
+    if directory not in _worker_indexes:
+        from .index import JobIndex
+
+        _worker_indexes[directory] = JobIndex.load(directory)
+    index = _worker_indexes[directory]
+    return index.job_ids[start:end].tolist(), neighbours(index, slice(start, end), n, memory_budget)
+
+
+def compute_similar_jobs(index, n, block_size, workers=1, directory=None, memory_budget=None):
+    """
+    Computes the most similar jobs of every job of the index, block by block.
+
+    Args:
+        index (JobIndex): The job index.
+        n (int): The maximum number of similar jobs per job.
+        block_size (int): The number of jobs scored per block.
+        workers (int): The number of processes scoring blocks in parallel.
+        directory (str): The directory the index version is published in, which the worker processes memory-map.
+            Without it, blocks are scored in this process.
+        memory_budget (int): The maximum size in bytes of one chunk of a block's job x job product, or None.
+
+    Yields:
+        tuple: The job ids of a block and their similar jobs, as returned by `neighbours()`, in index order.
+    """
+    blocks = [(start, min(start + block_size, len(index))) for start in range(0, len(index), block_size)]
+    if workers <= 1 or directory is None or len(blocks) <= 1:
+        for start, end in blocks:
+            yield index.job_ids[start:end].tolist(), neighbours(index, slice(start, end), n, memory_budget)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # Imports multiprocessing, only needed offline
+
+    # Workers set Django up themselves, since they may be started without a copy of this process.
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        yield from executor.map(
+            _similar_block,
+            repeat(directory),
+            [start for start, _ in blocks],
+            [end for _, end in blocks],
+            repeat(n),
+            repeat(memory_budget),
+        )
+
+
+def store_similar_jobs(job_ids, similar):
+    """
+    Replaces the stored similar jobs of some jobs.
+
+    Similar jobs that were deleted since the index was built are skipped.
+
+    Args:
+        job_ids (list): The ids of the jobs.
+        similar (list): The (job id, score) pairs of each job.
+    """
+    with transaction.atomic():
+        for chunk in _chunked(job_ids):
+            SimilarJob.objects.filter(job_id__in=chunk).delete()
+        _insert([
+            SimilarJob(job_id=job_id, similar_id=similar_id, score=score)
+            for job_id, matches in zip(job_ids, similar)
+            for similar_id, score in matches
+        ])
+
+
+def update_similar_jobs(index, job_ids, stale_ids=(), n=None, memory_budget=None):
+    """
+    Updates the stored similar jobs after jobs were created, updated or deleted.
+
+    The changed jobs get their similar jobs recomputed, as do the jobs that listed one of them, since their lists lost
+    an entry. Every other job is scored against the changed jobs, in blocks of jobs bounded by the memory budget, and
+    gets the changed jobs that are now more similar to it than the last entry of its list inserted, its list being
+    cut back to n entries. Jobs without any stored similar job get nothing inserted, so an empty table is filled by
+    `refresh_similar_jobs` rather than one job at a time. The outcome is the same as recomputing every list, as long
+    as the table was complete beforehand.
+
+    The lists are computed before they are written, in a single short transaction.
+
+    Args:
+        index (JobIndex): The job index, already updated for the changed jobs.
+        job_ids (iterable): The ids of the created, updated or deleted jobs.
+        stale_ids (iterable): The ids of other jobs whose lists must be recomputed, such as the jobs that listed a
+            deleted job before its rows were removed along with it.
+        n (int): The maximum number of similar jobs per job. Defaults to `RECOMMENDATION_SIMILAR_JOBS_TOP_N`.
+        memory_budget (int): The maximum size in bytes of one chunk of a job x job product. Defaults to
+            `RECOMMENDATION_BATCH_MEMORY_BUDGET`.
+    """
+    n = n or settings.RECOMMENDATION_SIMILAR_JOBS_TOP_N
+    memory_budget = memory_budget or settings.RECOMMENDATION_BATCH_MEMORY_BUDGET
+    job_ids = set(job_ids)
+    stale = set(stale_ids)
+    for chunk in _chunked(job_ids):
+        stale.update(SimilarJob.objects.filter(similar_id__in=chunk).values_list("job_id", flat=True))
+
+    recompute = sorted(position for position in map(index.position, job_ids | stale) if position is not None)
+    rows = [
+        SimilarJob(job_id=job_id, similar_id=similar_id, score=score)
+        for job_id, matches in zip(
+            index.job_ids[recompute].tolist(), neighbours(index, recompute, n, memory_budget) if recompute else []
+        )
+        for similar_id, score in matches
+    ]
+    # Score the changed jobs against every other job, to find the lists they now belong to.
+    changed = [position for position in map(index.position, job_ids) if position is not None]
+    accepted = _accepted_offers(index, changed, recompute, n, memory_budget) if changed else []
+
+    with transaction.atomic():
+        for chunk in _chunked(job_ids):
+            SimilarJob.objects.filter(similar_id__in=chunk).delete()
+        for chunk in _chunked(job_ids | stale):
+            SimilarJob.objects.filter(job_id__in=chunk).delete()
+        _insert(rows + accepted)
+        _trim([row.job_id for row in accepted], n)
+
+
+def _accepted_offers(index, changed, recomputed, n, memory_budget):
+    # Keep, per job, the changed jobs that beat the last entry of its full list or join a list that is not full.
+    import numpy as np  # Imported on first use, like the rest of the ML stack
+
+    from .index import PRODUCT_BYTES_PER_NONZERO
+
+    changed_ids = index.job_ids[changed]
+    columns = index.matrix[changed].T.tocsc()
+    skipped = np.zeros(len(index), dtype=bool)
+    skipped[recomputed] = True
+    # Each row of a block holds a dense float32 score and, while it is multiplied, a sparse one per changed job.
+    block_size = max(1, memory_budget // (len(changed) * (4 + PRODUCT_BYTES_PER_NONZERO)))
+
+    accepted = []
+    for start in range(0, len(index), block_size):
+        end = min(start + block_size, len(index))
+        scores = (index.matrix[start:end] @ columns).toarray()
+        scores[skipped[start:end]] = 0
+        rows = np.flatnonzero(scores.max(axis=1) > 0)
+        if not len(rows):
+            continue
+        scores = scores[rows]
+        if len(changed) > n:
+            # No list takes more than n of the changed jobs: drop all but the n best of each row.
+            worst = np.argpartition(-scores, n - 1, axis=1)[:, n:]
+            np.put_along_axis(scores, worst, 0, axis=1)
+
+        block_ids = index.job_ids[start + rows]
+        counts, lowest = _list_stats(block_ids.tolist())
+        offered = (scores > 0) & (counts > 0)[:, None]
+        offered &= (counts < n)[:, None] | (scores > lowest[:, None])
+        accepted.extend(
+            SimilarJob(
+                job_id=int(block_ids[row]), similar_id=int(changed_ids[column]), score=float(scores[row, column])
+            )
+            for row, column in zip(*np.nonzero(offered))
+        )
+    return accepted
+
+
+def _list_stats(job_ids):
+    # The number of stored similar jobs of each job and the score of its last one, as arrays aligned with job_ids.
+    import numpy as np
+
+    if len(job_ids) <= IN_CHUNK_SIZE:
+        rows = SimilarJob.objects.filter(job_id__in=job_ids)
+    else:
+        # One grouped scan of the ids' range is cheaper than many `__in` lookups.
+        rows = SimilarJob.objects.filter(job_id__gte=min(job_ids), job_id__lte=max(job_ids))
+    lists = rows.values("job_id").annotate(count=Count("id"), lowest=Min("score"))
+    stats = {job_id: (count, lowest) for job_id, count, lowest in lists.values_list("job_id", "count", "lowest")}
+    counts = np.array([stats.get(job_id, (0, 0.0))[0] for job_id in job_ids], dtype=np.int64)
+    lowest = np.array([stats.get(job_id, (0, 0.0))[1] for job_id in job_ids], dtype=np.float32)
+    return counts, lowest
+
+
+def _trim(job_ids, n):
+    # Drop the entries past the n most similar jobs of each list.
+    surplus = []
+    for chunk in _chunked(set(job_ids)):
+        counts = dict(
+            SimilarJob.objects.filter(job_id__in=chunk).values("job_id").annotate(count=Count("id"))
+            .filter(count__gt=n).values_list("job_id", "count")
+        )
+        if not counts:
+            continue
+        seen = {}
+        for row_id, job_id in SimilarJob.objects.filter(job_id__in=counts).order_by(
+            "job_id", "-score", "similar_id"
+        ).values_list("id", "job_id"):
+            seen[job_id] = seen.get(job_id, 0) + 1
+            if seen[job_id] > n:
+                surplus.append(row_id)
+    for chunk in _chunked(surplus):
+        SimilarJob.objects.filter(id__in=chunk).delete()
+
+
+def _insert(rows):
+    # The index may still list jobs deleted in the meantime, which cannot be referenced.
+    referenced = {row.job_id for row in rows} | {row.similar_id for row in rows}
+    existing = set()
+    for chunk in _chunked(referenced):
+        existing.update(Job.objects.filter(id__in=chunk).values_list("id", flat=True))
+    SimilarJob.objects.bulk_create(
+        [row for row in rows if row.job_id in existing and row.similar_id in existing],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,551 @@
+"""
+Process-wide holders of the current job index and job seeker index.
+
+The store loads the index from disk (or builds it on first use), applies incremental updates when jobs change,
+periodically rebuilds it from the database in a background thread and swaps the new index in atomically.
+
+Indexes are published as versions of a shared directory:
+
+    <RECOMMENDATION_INDEX_DIR>/
+        CURRENT              the name of the current version
+        DETAILS              a token replaced when job fields outside the index change
+        LOCK                 locked by the process publishing a version
+        versions/<version>/  the arrays of one index, see JobIndex.save()
+
+A version is written completely under a temporary name and renamed into place before `CURRENT` is replaced to point at
+it, so a reader never sees a partial index. Every worker memory-maps the version named by `CURRENT` and switches to a
+newer one on its next request after the pointer changed; old versions are pruned, keeping the few most recent ones.
+Changes to job fields that are not indexed, such as the salary, leave the index as it is and only replace the
+`DETAILS` token, which the caches of responses showing job details depend on along with the version.
+
+Processes publish in turn, holding a `flock()` on the `LOCK` file of the directory: an update first switches to the
+version another process may have published since, then applies its changes on top of it, so no process publishes an
+index that misses another one's changes. A rebuild holds the lock from the moment it reads the database, so the
+updates that wait for it are applied to the rebuilt index.
+
+The job seeker index, used to rank candidates for a job, is published the same way to its own directory by
+`seeker_index_store`.
+
+With `RECOMMENDATION_VECTORIZER` set to "hashing", the job index is built from the term hashes stored on the jobs and
+the IDF array synced to `RECOMMENDATION_HASHING_IDF_PATH` instead of fitting a vocabulary. If no IDF array was synced
+yet, the first build computes it from the catalog and writes it there.
+
+The index modules, and with them NumPy, SciPy and scikit-learn, are only imported when an index is first loaded or
+built, so importing this module (for example from the views or signal handlers) stays cheap.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from jobs.models import Job
+from users.models import JobSeekerProfile
+from .hashing import compute_idf, hash_terms, load_idf, save_idf
+
+logger = logging.getLogger(__name__)
+
+# The job fields the index is built from, in the order JobIndex.build() expects them.
+INDEXED_FIELDS = ("id", "required_skills", "experience_required", "location")
+
+# The job fields a hashed index is built from. The skills text is only read for jobs saved before their term hashes
+# were stored.
+HASHED_FIELDS = ("id", "skill_hashes", "required_skills", "experience_required", "location")
+
+# The job seeker profile fields the seeker index is built from, in the order SeekerIndex.build() expects them.
+INDEXED_PROFILE_FIELDS = ("user_id", "skills", "experience", "preferred_location")
+
+
+class IndexStore:
+    """
+    Owns the job index of the current process.
+
+    Readers get the current index with a plain attribute read and never wait on a rebuild: a rebuild fits a new index
+    on the side and replaces the reference when it is done. Updates, in this process or another one, wait for a
+    running rebuild and are applied to the new index.
+
+    Subclasses index other records by overriding `_index_class()`, `_build()` and `_apply()`.
+
+    Attributes:
+        directory (str): The directory the index versions are published to.
+        rebuild_interval (int): Seconds between background rebuilds, or 0 to disable them.
+        keep_versions (int): The number of published versions kept on disk.
+
+    Methods:
+        get(build): Returns the current index, loading or building it on first use.
+        rebuild(workers, shard_size): Rebuilds the index from the database and swaps it in.
+        update(ids): Re-indexes the given records from their current database state.
+        locked(blocking): Holds the lock serializing the processes that publish to the directory.
+        warm_up(): Loads the index and reads it into memory ahead of the first request.
+        version_directory(version): Returns the directory a published index version is stored in.
+        published_version(): Returns the version named by `CURRENT`, without loading the index.
+        details_version(): Returns the token of the `DETAILS` file.
+        bump_details_version(): Replaces the token of the `DETAILS` file.
+        reset(): Forgets the index and the tokens read by this process.
+    """
+
+    # The name of the index in log messages.
+    label = "job index"
+
+    def __init__(self, directory=None, rebuild_interval=None, keep_versions=None):
+        self._directory = directory
+        self._rebuild_interval = rebuild_interval
+        self._keep_versions = keep_versions
+        self._index = None
+        self._stamp = None
+        self._published = None
+        self._details = None
+        self._lock = threading.RLock()
+        self._held = threading.local()
+        self._rebuilder = None
+        self._builder = None
+
+    @property
+    def directory(self):
+        return os.fspath(self._directory or settings.RECOMMENDATION_INDEX_DIR)
+
+    @property
+    def rebuild_interval(self):
+        if self._rebuild_interval is not None:
+            return self._rebuild_interval
+        return settings.RECOMMENDATION_INDEX_REBUILD_INTERVAL
+
+    @property
+    def keep_versions(self):
+        if self._keep_versions is not None:
+            return self._keep_versions
+        return settings.RECOMMENDATION_INDEX_KEEP_VERSIONS
+
+    def reset(self):
+        """
+        Forgets the index and the tokens read by this process, so they are read again from the directory on next use.
+
+        Needed when the directory itself changes, such as in tests and benchmarks that override its setting.
+        """
+        with self._lock:
+            self._index = self._stamp = self._published = self._details = None
+
+    def version_directory(self, version):
+        """
+        Returns the directory a published index version is stored in, for other processes to memory-map it.
+
+        Args:
+            version (str): The version of the index.
+
+        Returns:
+            str: The version directory. It no longer exists once the version was pruned.
+        """
+        return os.path.join(self.directory, "versions", version)
+
+    def published_version(self):
+        """
+        Returns the version currently published to the directory, without loading the index.
+
+        The pointer is only read again after it changed, so this costs a `stat()` per call.
+
+        Returns:
+            str or None: The version named by `CURRENT`, or None if no index was published yet.
+        """
+        self._published = self._read_token(self._pointer_path(), self._published)
+        return self._published and self._published[1]
+
+    def details_version(self):
+        """
+        Returns the token replaced whenever job fields outside the index change, without loading the index.
+
+        Like the pointer, the file is only read again after it changed.
+
+        Returns:
+            str or None: The token of the `DETAILS` file, or None if no such change was applied yet.
+        """
+        self._details = self._read_token(os.path.join(self.directory, "DETAILS"), self._details)
+        return self._details and self._details[1]
+
+    def bump_details_version(self):
+        """
+        Replaces the token of the `DETAILS` file, after job fields outside the index changed, so every process
+        invalidates the cached responses showing them without a new index version.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix=".DETAILS-")
+        with os.fdopen(fd, "w") as handle:
+            handle.write(uuid.uuid4().hex)
+        os.replace(path, os.path.join(self.directory, "DETAILS"))
+
+    def get(self, build=True):
+        """
+        Returns the current job index.
+
+        On first use the index is loaded from disk, or built from the database if none was published yet. Later
+        calls switch to a newer version published by another process.
+
+        Args:
+            build (bool): Whether to wait for the index to be built if none was published yet. When False, the build
+                is started in a background thread and None is returned until it is done.
+
+        Returns:
+            JobIndex or None: The current index, or None if it is being built and `build` is False.
+        """
+        if self._index is None and not build:
+            return self._load_or_start_build()
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._load()
+            if self._index is None:
+                # Another process may be building the first index as well; the lock lets one of them publish it.
+                with self.locked(), self._lock:
+                    if self._index is None and not self._load():
+                        self._publish(self._build())
+            self._start_rebuilder()
+        elif self._pointer_stamp() not in (None, self._stamp):
+            with self._lock:
+                self._load()
+        return self._index
+
+    def _load_or_start_build(self):
+        if not self._lock.acquire(blocking=False):
+            return None  # Another thread is loading or building the index
+        try:
+            if self._index is None and not self._load():
+                if self._builder is None or not self._builder.is_alive():
+                    self._builder = threading.Thread(
+                        target=self._build_in_background, name=f"{self.label.replace(' ', '-')}-builder", daemon=True
+                    )
+                    self._builder.start()
+                return None
+        finally:
+            self._lock.release()
+        self._start_rebuilder()
+        return self._index
+
+    def _build_in_background(self):
+        try:
+            self.get()
+        except Exception:
+            logger.exception("Background build of the %s failed.", self.label)
+        finally:
+            connections.close_all()
+
+    def warm_up(self):
+        """
+        Loads the current index and reads all of its pages, so the first requests do not wait on disk reads.
+
+        The pages stay in the operating system's page cache, where they are shared with the other workers mapping the
+        same version.
+
+        Returns:
+            JobIndex: The current index.
+        """
+        index = self.get()
+        inverted = index.inverted
+        for array in (index.matrix.data, index.matrix.indices, index.matrix.indptr, inverted.indptr,
+                      inverted.positions, inverted.weights, inverted.max_weights, index.job_ids, index.sorted_ids,
+                      index.sorted_positions, index.experience, index.location_codes, index.vocabulary, index.idf,
+                      *(array for array in (index.projection, index.embeddings) if array is not None)):
+            # Touching one element per page faults the whole array in.
+            array.ravel()[::max(1, mmap.PAGESIZE // max(array.itemsize, 1))].copy()
+        # Scoring once allocates the per-thread buffers and imports the rest of the ML stack.
+        index.top_k("", 1)
+        return index
+
+    def rebuild(self, workers=1, shard_size=None):
+        """
+        Rebuilds the index from the database and swaps it in.
+
+        Args:
+            workers (int): The number of processes vectorizing shards of the catalog in parallel, see
+                `parallel.build_parallel()`. With 1, the index is built in this process.
+            shard_size (int): The number of records per shard. Defaults to `RECOMMENDATION_INDEX_SHARD_SIZE`.
+
+        Returns:
+            JobIndex: The new index.
+        """
+        with self.locked():
+            index = self._build(workers, shard_size or settings.RECOMMENDATION_INDEX_SHARD_SIZE)
+            with self._lock:
+                self._publish(index)
+        logger.info("Rebuilt the %s with %d entries.", self.label, len(index))
+        return index
+
+    def update(self, ids):
+        """
+        Re-indexes records, such as jobs, after they were created, updated or deleted.
+
+        Records that still exist are (re)vectorized, missing ones are dropped from the index. The changes are applied
+        to the latest published version, under the lock of the directory, and published as one new version. If no
+        index has been built yet, nothing is done: the first build will read the current state of the database anyway.
+
+        Args:
+            ids (iterable): The ids of the changed records.
+
+        Returns:
+            JobIndex or None: The updated index, or None if no index has been built yet.
+        """
+        ids = set(ids)
+        with self.locked(), self._lock:
+            if self._pointer_stamp() not in (None, self._stamp):
+                self._load()  # Another process published a newer version
+            if self._index is None and not self._load():
+                return None
+            self._publish(self._apply(self._index, ids))
+            return self._index
+
+    @contextmanager
+    def locked(self, blocking=True):
+        """
+        Holds the lock serializing the processes, and the threads, that publish to the index directory.
+
+        The lock is a `flock()` on the `LOCK` file of the directory. It is reentrant within a thread.
+
+        Args:
+            blocking (bool): Whether to wait for the lock. When False and the lock is held elsewhere, the context is
+                entered without it.
+
+        Yields:
+            bool: Whether the lock is held.
+        """
+        if getattr(self._held, "depth", 0):
+            self._held.depth += 1
+            try:
+                yield True
+            finally:
+                self._held.depth -= 1
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Every acquisition opens the file anew, so threads of the same process exclude each other too.
+        with open(os.path.join(self.directory, "LOCK"), "a") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            self._held.depth = 1
+            try:
+                yield True
+            finally:
+                self._held.depth = 0
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _index_class(self):
+        from .index import JobIndex  # Imports the ML stack on first use
+
+        return JobIndex
+
+    def _build(self, workers=1, shard_size=None):
+        options = dict(
+            dimensions=settings.RECOMMENDATION_DENSE_DIMENSIONS,
+            dense_dtype=settings.RECOMMENDATION_DENSE_DTYPE,
+            prune_threshold=settings.RECOMMENDATION_INDEX_PRUNE_THRESHOLD,
+        )
+        if workers > 1:
+            from .parallel import build_parallel  # Imports the ML stack on first use
+
+            return build_parallel(
+                workers,
+                shard_size or settings.RECOMMENDATION_INDEX_SHARD_SIZE,
+                features=hashing_features(),
+                idf_path=settings.RECOMMENDATION_HASHING_IDF_PATH,
+                **options,
+            )
+        if not hashing_features():
+            rows = Job.objects.values_list(*INDEXED_FIELDS).iterator()
+            return self._index_class().build(rows, **options)
+
+        rows = list(hashed_job_rows())
+        idf = load_idf(settings.RECOMMENDATION_HASHING_IDF_PATH, hashing_features())
+        if idf is None:
+            idf = compute_idf((row[1] for row in rows), hashing_features())
+            save_idf(idf, settings.RECOMMENDATION_HASHING_IDF_PATH)
+            logger.info("Computed the hashed IDF weights of %d jobs.", len(rows))
+        return self._index_class().build_hashed(rows, idf, **options)
+
+    def _apply(self, index, job_ids):
+        if not job_ids:
+            return index
+        rows = list(Job.objects.filter(id__in=job_ids).values_list(*INDEXED_FIELDS))
+        found = {row[0] for row in rows}
+        # Changes are applied in one copy of the index, however many jobs changed
+        index = index.remove_many([job_id for job_id in job_ids if job_id not in found])
+        return index.upsert_many(rows)
+
+    def _publish(self, index):
+        versions = os.path.join(self.directory, "versions")
+        os.makedirs(versions, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=versions, prefix=".staging-")
+        try:
+            index.save(os.path.join(staging, index.version))
+            os.rename(os.path.join(staging, index.version), os.path.join(versions, index.version))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        fd, pointer = tempfile.mkstemp(dir=self.directory, prefix=".CURRENT-")
+        with os.fdopen(fd, "w") as handle:
+            handle.write(index.version)
+        os.replace(pointer, self._pointer_path())
+
+        # Serve from the mapped files rather than the in-memory copy, so this worker shares the pages too.
+        self._index = self._index_class().load(os.path.join(versions, index.version))
+        self._stamp = self._pointer_stamp()
+        self._prune(versions, index.version)
+
+    def _load(self):
+        stamp = self._pointer_stamp()
+        if stamp is None:
+            return False
+        index_class = self._index_class()
+        try:
+            with open(self._pointer_path(), encoding="utf-8") as handle:
+                version = handle.read().strip()
+            index = index_class.load(self.version_directory(version))
+        except Exception:
+            logger.exception("Could not load the %s from %s.", self.label, self.directory)
+            return False
+        if index.format != index_class.FORMAT:
+            logger.info("Ignoring the %s in %s, it was built by an incompatible version.", self.label, self.directory)
+            return False
+        if index.features != hashing_features():
+            logger.info("Ignoring the %s in %s, it was built with another vectorizer.", self.label, self.directory)
+            return False
+        self._index = index
+        self._stamp = stamp
+        return True
+
+    def _prune(self, versions, current):
+        # Mapped files stay readable after they are deleted, so workers still on an old version are not affected.
+        published = []
+        for name in os.listdir(versions):
+            if name.startswith(".") or name == current:
+                continue
+            try:
+                published.append((os.stat(os.path.join(versions, name)).st_mtime_ns, name))
+            except FileNotFoundError:
+                continue  # Pruned by another process
+        for _, name in sorted(published, reverse=True)[max(self.keep_versions - 1, 0):]:
+            shutil.rmtree(os.path.join(versions, name), ignore_errors=True)
+
+    def _pointer_path(self):
+        return os.path.join(self.directory, "CURRENT")
+
+    def _read_token(self, path, cached):
+        # Returns the (stamp, content) of a small file replaced atomically, reading it only after it changed.
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = stat.st_ino, stat.st_mtime_ns
+        if cached is not None and cached[0] == stamp:
+            return cached
+        try:
+            with open(path, encoding="utf-8") as handle:
+                return stamp, handle.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def _pointer_stamp(self):
+        # Replacing the pointer creates a new file, so its inode and modification time identify the version.
+        try:
+            stat = os.stat(self._pointer_path())
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _start_rebuilder(self):
+        if self._rebuilder is not None or self.rebuild_interval <= 0:
+            return
+        with self._lock:
+            if self._rebuilder is None:
+                self._rebuilder = threading.Thread(
+                    target=self._rebuild_forever, name=f"{self.label.replace(' ', '-')}-rebuilder", daemon=True
+                )
+                self._rebuilder.start()
+
+    def _rebuild_forever(self):
+        while True:
+            time.sleep(self.rebuild_interval)
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception("Background rebuild of the %s failed.", self.label)
+            finally:
+                connections.close_all()
+
+
+class SeekerIndexStore(IndexStore):
+    """
+    Owns the job seeker index of the current process, used to rank the candidates of a job.
+
+    Job seeker profiles are vectorized with the vocabulary and IDF weights of the job index at the time the seeker
+    index is built, so a seeker's score for a job is the same as the job's score in the seeker's recommendations.
+    Records are keyed by the user id of the job seeker.
+    """
+
+    label = "job seeker index"
+
+    @property
+    def directory(self):
+        return os.fspath(self._directory or settings.RECOMMENDATION_SEEKER_INDEX_DIR)
+
+    def _index_class(self):
+        from .seekers import SeekerIndex  # Imports the ML stack on first use
+
+        return SeekerIndex
+
+    def _build(self, workers=1, shard_size=None):
+        # Profiles are only vectorized in this process: they are few compared to jobs, and short.
+        job_index = index_store.get()
+        rows = JobSeekerProfile.objects.values_list(*INDEXED_PROFILE_FIELDS).iterator()
+        return self._index_class().build(rows, job_index.vocabulary, job_index.idf, job_index.features)
+
+    def _apply(self, index, ids):
+        if not ids:
+            return index
+        rows = {
+            row[0]: row[1:]
+            for row in JobSeekerProfile.objects.filter(user_id__in=ids).values_list(*INDEXED_PROFILE_FIELDS)
+        }
+        for seeker_id in ids:
+            if seeker_id in rows:
+                index = index.upsert(seeker_id, *rows[seeker_id])
+            else:
+                index = index.remove(seeker_id)
+        return index
+
+
+def hashing_features():
+    """
+    Returns the number of hashed term columns indexes are built with.
+
+    Returns:
+        int: `RECOMMENDATION_HASHING_FEATURES` if `RECOMMENDATION_VECTORIZER` is "hashing", else 0 for a fitted
+        vocabulary.
+    """
+    return settings.RECOMMENDATION_HASHING_FEATURES if settings.RECOMMENDATION_VECTORIZER == "hashing" else 0
+
+
+def hashed_job_rows():
+    """
+    Reads the term hashes of every job, hashing the skills of jobs saved before they were stored.
+
+    Yields:
+        tuple: (job id, term hashes, experience required, location) rows, as JobIndex.build_hashed() expects them.
+    """
+    for job_id, skill_hashes, required_skills, experience_required, location in (
+        Job.objects.values_list(*HASHED_FIELDS).iterator()
+    ):
+        if skill_hashes is None:
+            skill_hashes = hash_terms(required_skills)
+        yield job_id, skill_hashes, experience_required, location
+
+
+index_store = IndexStore()
+seeker_index_store = SeekerIndexStore()
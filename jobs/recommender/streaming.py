@@ -0,0 +1,80 @@
+"""
+Streaming scorer for when no job index is available.
+
+Building the job index reads and vectorizes the whole catalog, which takes a while for a large one. Until it is ready,
+for example right after a deployment that started with an empty index directory, requests are scored by streaming the
+catalog instead: jobs are read through a server-side cursor in fixed-size chunks, each chunk is vectorized with a
+stateless hashing vectorizer, and only a heap of the k best jobs seen so far is kept. Memory use depends on the chunk
+size and k, not on the size of the catalog.
+
+Without a fitted vocabulary there are no IDF weights, so jobs are ranked by the cosine similarity of their term
+frequencies. The scores are close to, but not the same as, those of the index.
+
+NumPy and scikit-learn are only imported when a request is scored, so the views can import this module at startup.
+"""
+
+import heapq
+
+from django.conf import settings
+
+from jobs.models import Job
+from .text import analyze
+from .timing import current_timer
+
+
+def stream_top_k(text, k, job_filter=None, chunk_size=None):
+    """
+    Returns the best matching jobs for a skills text by streaming the job catalog.
+
+    The ranking follows `JobIndex.top_k()`: jobs are ordered by decreasing score, ties by id, and the list is filled
+    up with zero-score jobs when fewer than k jobs share a term with the text.
+
+    Args:
+        text (str): The raw skills text.
+        k (int): The maximum number of jobs to return.
+        job_filter (JobFilter): Hard constraints the returned jobs must satisfy, evaluated by the database, or None.
+        chunk_size (int): The number of jobs read and vectorized at once. Defaults to
+            `RECOMMENDATION_STREAMING_CHUNK_SIZE`.
+
+    Returns:
+        list: (job id, score) pairs ordered by decreasing score.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer  # Imports the ML stack on first use
+
+    chunk_size = chunk_size or settings.RECOMMENDATION_STREAMING_CHUNK_SIZE
+    vectorizer = HashingVectorizer(
+        analyzer=analyze, n_features=settings.RECOMMENDATION_STREAMING_FEATURES, alternate_sign=False
+    )
+    timer = current_timer()
+    with timer.stage("vectorize"):
+        query = vectorizer.transform([text]).T.tocsc()
+
+    jobs = Job.objects.order_by("id")
+    if job_filter:
+        jobs = job_filter.filter_queryset(jobs)
+    rows = jobs.values_list("id", "required_skills").iterator(chunk_size=chunk_size)
+
+    # A min-heap of (score, -job id) keeps the k best jobs, the weakest on top.
+    heap = []
+    scanned = 0
+    while True:
+        with timer.stage("fetch"):
+            chunk = [row for _, row in zip(range(chunk_size), rows)]
+        if not chunk:
+            break
+        with timer.stage("vectorize"):
+            matrix = vectorizer.transform([required_skills for _, required_skills in chunk])
+        with timer.stage("score"):
+            scores = (matrix @ query).toarray().ravel().tolist()
+            for (job_id, _), score in zip(chunk, scores):
+                entry = (score, -job_id)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+        scanned += len(chunk)
+
+    with timer.stage("rank"):
+        matches = [(-negated_id, float(score)) for score, negated_id in sorted(heap, reverse=True)]
+    timer.count("catalog", scanned)
+    return matches
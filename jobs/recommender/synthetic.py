@@ -0,0 +1,109 @@
+"""
+Reproducible synthetic skill texts for benchmarks.
+
+Texts are drawn from a fixed list of technology skills with a Zipf-like popularity, mixed with the filler words and
+punctuation found in real postings. Locations and years of experience follow the same kind of skewed distribution.
+The same seed always yields the same values.
+"""
+
+import random
+from itertools import accumulate
+
+SKILLS = [
+    "python", "java", "javascript", "sql", "c++", "c#", "typescript", "go", "rust", "kotlin", "swift", "php", "ruby",
+    "scala", "r", "node.js", "react", "angular", "vue.js", ".net", "asp.net", "django", "flask", "fastapi", "spring",
+    "rails", "laravel", "express", "next.js", "graphql", "rest", "grpc", "postgresql", "mysql", "mongodb", "redis",
+    "elasticsearch", "kafka", "rabbitmq", "spark", "hadoop", "airflow", "dbt", "snowflake", "bigquery", "pandas",
+    "numpy", "scikit-learn", "tensorflow", "pytorch", "nlp", "computer vision", "machine learning", "deep learning",
+    "statistics", "data analysis", "data engineering", "etl", "tableau", "power bi", "excel", "docker", "kubernetes",
+    "terraform", "ansible", "aws", "azure", "gcp", "linux", "bash", "git", "ci/cd", "jenkins", "github actions",
+    "microservices", "distributed systems", "system design", "security", "networking", "html", "css", "sass",
+    "figma", "ux design", "accessibility", "android", "ios", "flutter", "react native", "unity", "embedded",
+    "fpga", "matlab", "sap", "salesforce", "jira", "agile", "scrum", "project management", "communication",
+    "leadership", "mentoring", "testing", "selenium", "cypress", "pytest", "junit", "front-end", "back-end",
+    "full-stack", "devops", "sre", "observability", "prometheus", "grafana", "blockchain", "solidity",
+]
+
+FILLERS = [
+    "experience with", "knowledge of", "strong", "solid understanding of", "familiarity with", "years of",
+    "hands-on", "proficiency in", "is a plus", "and", "or", "nice to have:", "must have:", "including",
+]
+
+LOCATIONS = [
+    "Berlin", "Remote", "London", "Amsterdam", "Paris", "Munich", "Hamburg", "Madrid", "Barcelona", "Lisbon", "Dublin",
+    "Warsaw", "Stockholm", "Copenhagen", "Vienna", "Zurich", "Milan", "Prague", "Brussels", "Helsinki",
+]
+
+_SKILL_WEIGHTS = list(accumulate(1.0 / (rank + 1) for rank in range(len(SKILLS))))
+_LOCATION_WEIGHTS = list(accumulate(1.0 / (rank + 1) for rank in range(len(LOCATIONS))))
+
+
+def _skill_text(rng, min_skills, max_skills):
+    parts = []
+    for skill in rng.choices(SKILLS, cum_weights=_SKILL_WEIGHTS, k=rng.randint(min_skills, max_skills)):
+        if rng.random() < 0.3:
+            parts.append(rng.choice(FILLERS))
+        if rng.random() < 0.1:
+            parts.append(f"{rng.randint(1, 10)}+")
+        parts.append(skill.upper() if rng.random() < 0.1 else skill)
+    return ", ".join(parts) + "."
+
+
+def job_skill_texts(count, seed=0):
+    """
+    Generates the required skills of synthetic jobs.
+
+    Args:
+        count (int): The number of texts to generate.
+        seed (int): The random seed.
+
+    Returns:
+        list: `count` skills texts.
+    """
+    rng = random.Random(seed)
+    return [_skill_text(rng, 5, 20) for _ in range(count)]
+
+
+def seeker_skill_texts(count, seed=1):
+    """
+    Generates the skills of synthetic job seeker profiles.
+
+    Args:
+        count (int): The number of texts to generate.
+        seed (int): The random seed.
+
+    Returns:
+        list: `count` skills texts.
+    """
+    rng = random.Random(seed)
+    return [_skill_text(rng, 3, 12) for _ in range(count)]
+
+
+def locations(count, seed=2):
+    """
+    Generates job locations or preferred locations.
+
+    Args:
+        count (int): The number of locations to generate.
+        seed (int): The random seed.
+
+    Returns:
+        list: `count` location names.
+    """
+    rng = random.Random(seed)
+    return rng.choices(LOCATIONS, cum_weights=_LOCATION_WEIGHTS, k=count)
+
+
+def experience_years(count, seed=3):
+    """
+    Generates years of experience, required by jobs or held by job seekers.
+
+    Args:
+        count (int): The number of values to generate.
+        seed (int): The random seed.
+
+    Returns:
+        list: `count` integers between 0 and 15, mostly below 6.
+    """
+    rng = random.Random(seed)
+    return [min(int(rng.expovariate(1 / 3)), 15) for _ in range(count)]
@@ -0,0 +1,92 @@
+"""
+Skill-text normalization shared by the job index and seeker queries.
+
+Job descriptions and seeker skills must go through exactly the same normalization, otherwise the TF-IDF vectors of the
+two sides would not be comparable. `analyze()` is plugged into the vectorizer as its analyzer, so a text is lowercased,
+tokenized and filtered in a single pass without any intermediate joined string.
+
+The tokenizer is a single compiled regular expression that keeps technology names intact: "c++", "c#", "node.js",
+".net" and "front-end" are one token each, while surrounding punctuation is dropped. Nothing is downloaded at runtime:
+the stopwords are read once from the NLTK English list bundled in `data/`.
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+STOPWORDS_PATH = Path(__file__).resolve().parent / "data" / "stopwords_english.txt"
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?:(?<![^\s(\[{,;:/|])\.)?  # a leading dot at the start of a word, as in ".net"
+    [^\W_]+                     # letters and digits
+    (?:[.\-][^\W_]+)*           # inner dots and hyphens, as in "node.js", "asp.net" or "front-end"
+    (?:\+\+|\+|\#)?             # trailing plus signs or sharp, as in "c++" or "c#"
+    """,
+    re.VERBOSE,
+)
+
+HAS_LETTER = re.compile(r"[^\W\d_]")
+
+
+@lru_cache(maxsize=1)
+def get_stop_words():
+    """
+    Returns the set of English stopwords, loaded once per process.
+
+    The list is the NLTK English stopword corpus, bundled with the app so no download is needed.
+
+    Returns:
+        frozenset: The English stopwords.
+    """
+    return frozenset(STOPWORDS_PATH.read_text(encoding="utf-8").split())
+
+
+def analyze(text):
+    """
+    Turns a skills text into the terms that are vectorized.
+
+    This is the analyzer of the TF-IDF vectorizer: the text is tokenized, and stopwords and tokens without any letter
+    (such as "5" or "3+") are dropped.
+
+    Args:
+        text (str): The raw skills text of a job or a job seeker.
+
+    Returns:
+        list: The remaining terms.
+    """
+    stop_words = get_stop_words()
+    has_letter = HAS_LETTER.search
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in stop_words and has_letter(token)]
+
+
+def analyze_batch(texts):
+    """
+    Analyzes a whole list of skills texts.
+
+    Args:
+        texts (iterable): The raw skills texts.
+
+    Returns:
+        list: The terms of each text, in the order of `texts`.
+    """
+    stop_words = get_stop_words()
+    has_letter = HAS_LETTER.search
+    findall = TOKEN_PATTERN.findall
+    return [
+        [token for token in findall(text.lower()) if token not in stop_words and has_letter(token)]
+        for text in texts
+    ]
+
+
+def normalize_location(location):
+    """
+    Normalizes a location for matching: casefolded, with whitespace collapsed.
+
+    Args:
+        location (str): A job location or a preferred location.
+
+    Returns:
+        str: The normalized location.
+    """
+    return " ".join(location.casefold().split())
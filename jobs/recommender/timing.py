@@ -0,0 +1,282 @@
+"""
+Per-stage timing of recommendation requests.
+
+A request wrapped in `timed_request()` gets a `StageTimer`, which the recommender code reaches through
+`current_timer()` instead of having it passed around. Each stage (fetch, preprocess, vectorize, score, rank,
+serialize) is timed with `timer.stage(name)`, and counters such as the catalog size and the number of scored candidates
+are recorded with `timer.count(name, value)`. When the request ends, the timings are written as a structured log record
+and a sample of them is added to the in-process `histograms`; the view also returns them in a `Server-Timing` header.
+
+When `RECOMMENDATION_TIMING_ENABLED` is off, `current_timer()` returns a shared timer whose methods do nothing, so the
+instrumentation costs a context variable lookup and an empty context manager per stage.
+"""
+
+import bisect
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_NO_STAGE = nullcontext()
+
+
+class NullTimer:
+    """
+    The timer of requests that are not timed: every method is a no-op.
+
+    Attributes:
+        enabled (bool): Always False, so callers can skip work that only feeds the timer.
+    """
+
+    enabled = False
+
+    def stage(self, name):
+        return _NO_STAGE
+
+    def count(self, name, value):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+_current_timer = contextvars.ContextVar("recommendation_timer", default=NULL_TIMER)
+
+
+class StageTimer:
+    """
+    Collects the stage durations and counters of one request.
+
+    A stage that runs several times in a request (for example two database fetches) accumulates its durations.
+
+    Attributes:
+        enabled (bool): Always True.
+        stages (dict): The accumulated seconds of each stage, in the order the stages first ran.
+        counters (dict): The accumulated value of each counter.
+        total (float): The seconds between the creation of the timer and finish(), or None before finish().
+
+    Methods:
+        stage(name): Times a block of code as the given stage.
+        count(name, value): Adds a value to a counter.
+        merge(other): Adds the stages and counters of another timer.
+        finish(): Stops the request clock.
+        server_timing(): Formats the timings as a Server-Timing header value.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.total = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times a block of code.
+
+        Args:
+            name (str): The name of the stage.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name, value):
+        """
+        Adds a value to a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (int): The value to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other):
+        """
+        Adds the stage durations and counters of another timer, such as one used by a helper thread.
+
+        Args:
+            other (StageTimer): The timer to merge.
+        """
+        for name, seconds in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def finish(self):
+        """
+        Stops the request clock.
+        """
+        self.total = time.perf_counter() - self._started
+
+    def server_timing(self):
+        """
+        Formats the timings as a Server-Timing header value, with durations in milliseconds.
+
+        Returns:
+            str: The header value, for example 'fetch;dur=1.20, score;dur=3.41, total;dur=5.02, catalog;desc="5000"'.
+        """
+        metrics = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()]
+        if self.total is not None:
+            metrics.append(f"total;dur={self.total * 1000:.2f}")
+        metrics.extend(f'{name};desc="{value}"' for name, value in self.counters.items())
+        return ", ".join(metrics)
+
+
+class StageHistograms:
+    """
+    Latency histograms per stage, kept in the memory of the current process.
+
+    Durations are counted in fixed buckets on a roughly logarithmic scale, so recording a sample is a binary search
+    and an increment, and the memory used does not grow with the number of requests.
+
+    Attributes:
+        BOUNDS_MS (tuple): The upper bound of every bucket in milliseconds; slower samples go to an overflow bucket.
+
+    Methods:
+        record(stages, total): Adds the durations of one request.
+        snapshot(): Returns the counts and approximate percentiles of every stage.
+        reset(): Drops all samples.
+    """
+
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, stages, total=None):
+        """
+        Adds the durations of one request.
+
+        Args:
+            stages (dict): The seconds spent in each stage.
+            total (float): The seconds spent in the whole request, or None.
+        """
+        samples = dict(stages)
+        if total is not None:
+            samples["total"] = total
+        with self._lock:
+            for name, seconds in samples.items():
+                counts = self._counts.setdefault(name, [0] * (len(self.BOUNDS_MS) + 1))
+                counts[bisect.bisect_left(self.BOUNDS_MS, seconds * 1000)] += 1
+
+    def snapshot(self):
+        """
+        Returns the histograms recorded so far.
+
+        Percentiles are estimated as the upper bound of the bucket they fall in, or None for the overflow bucket.
+
+        Returns:
+            dict: For every stage, its sample 'count', its 'buckets' as (upper bound in ms, count) pairs, and its
+            approximate 'p50_ms', 'p95_ms' and 'p99_ms'.
+        """
+        with self._lock:
+            counts = {name: list(values) for name, values in self._counts.items()}
+
+        bounds = [*self.BOUNDS_MS, None]
+        snapshot = {}
+        for name, values in counts.items():
+            total = sum(values)
+            summary = {"count": total, "buckets": [[bound, count] for bound, count in zip(bounds, values) if count]}
+            for label, quantile in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                seen = 0
+                for bound, count in zip(bounds, values):
+                    seen += count
+                    if seen >= quantile * total:
+                        summary[label] = bound
+                        break
+            snapshot[name] = summary
+        return snapshot
+
+    def reset(self):
+        """
+        Drops all samples.
+        """
+        with self._lock:
+            self._counts.clear()
+
+
+histograms = StageHistograms()
+
+
+def current_timer():
+    """
+    Returns the timer of the request being served.
+
+    Returns:
+        StageTimer or NullTimer: The active timer, or a no-op timer outside of a timed request.
+    """
+    return _current_timer.get()
+
+
+@contextmanager
+def activate(timer):
+    """
+    Makes a timer current for the duration of a block, for example in a thread working for a request.
+
+    Args:
+        timer (StageTimer or NullTimer): The timer.
+
+    Yields:
+        StageTimer or NullTimer: The timer.
+    """
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def timed_request(name):
+    """
+    Times the stages of a request.
+
+    When timing is enabled, the timer is made current for the duration of the block, and the timings are logged and
+    sampled into `histograms` when the block exits.
+
+    Args:
+        name (str): The name of the endpoint in the log records (their 'endpoint' attribute), such as
+            'recommendations'.
+
+    Yields:
+        StageTimer or NullTimer: The timer of the request, a no-op timer when timing is disabled.
+    """
+    if not settings.RECOMMENDATION_TIMING_ENABLED:
+        yield NULL_TIMER
+        return
+
+    timer = StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+        timer.finish()
+        logger.info(
+            "%s took %.2fms: %s",
+            name,
+            timer.total * 1000,
+            ", ".join(f"{stage}={seconds * 1000:.2f}ms" for stage, seconds in timer.stages.items()),
+            # Not "request": Django's log handlers expect an HttpRequest in that attribute.
+            extra={
+                "endpoint": name,
+                "total_ms": timer.total * 1000,
+                "stages_ms": {stage: seconds * 1000 for stage, seconds in timer.stages.items()},
+                "counters": dict(timer.counters),
+                "pid": os.getpid(),
+            },
+        )
+        if random.random() < settings.RECOMMENDATION_TIMING_SAMPLE_RATE:
+            histograms.record(timer.stages, timer.total)
@@ -0,0 +1,221 @@
+"""
+Full-text search and facet counts of the job list.
+
+Jobs are matched against the words of a search text in their title, company and required skills, and ranked by
+relevance, with title matches weighing most and skill matches least. The implementation depends on the database:
+
+- On PostgreSQL, the weighted `tsvector` of the three fields is indexed by a GIN expression index
+  (`job_search_idx`), and a search is a `websearch_to_tsquery()` match on the same expression, ranked by `ts_rank()`.
+  Searches support quoted phrases, `or` and `-` exclusions.
+- On SQLite, used for local runs, the fields are indexed by an FTS5 table (`jobs_job_fts`) that reads its content
+  from the jobs table and is kept in sync by triggers. The table is joined to the jobs through the unmanaged
+  `JobSearchEntry` model. A search matches the jobs containing every word of the text, ranked by BM25.
+
+Both indexes are created by the `0007_job_search` migration, which only creates the one matching the database.
+Migrations that rebuild the jobs table on SQLite drop its triggers, which the `jobs.W001` system check reports;
+`install_sqlite_search()` reinstalls them and reindexes the table.
+
+Facet counts of the (filtered) job list per location, experience bucket and posting time bucket come from a single
+query grouping the jobs by all three at once (`job_facets()`).
+"""
+
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, Case, CharField, Count, F, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+# The searched fields and their weights, from the most to the least significant
+SEARCH_FIELDS = (("title", "A"), ("company", "B"), ("required_skills", "C"))
+
+# The text search configuration of PostgreSQL
+SEARCH_CONFIG = "english"
+
+SEARCH_INDEX_NAME = "job_search_idx"
+
+FTS_TABLE = "jobs_job_fts"
+
+# BM25 weights of the SQLite columns, in the order of SEARCH_FIELDS
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Experience facet buckets and the highest required years of experience in each; the last one is open-ended
+EXPERIENCE_BUCKETS = (("0-1", 1), ("2-4", 4), ("5-9", 9), ("10+", None))
+
+# Posting time facet buckets and their age
+POSTED_BUCKETS = (("past_day", timedelta(days=1)), ("past_week", timedelta(days=7)), ("past_month", timedelta(days=30)))
+
+
+def search_vector():
+    """
+    Returns the weighted search vector of a job on PostgreSQL, the expression indexed by `job_search_idx`. It must
+    stay identical to the indexed expression, or searches no longer use the index.
+
+    Returns:
+        SearchVector: The combined vector of the searched fields.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    vector = None
+    for field, weight in SEARCH_FIELDS:
+        field_vector = SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+        vector = field_vector if vector is None else vector + field_vector
+    return vector
+
+
+def search_jobs(queryset, text, ranked=True):
+    """
+    Restricts a queryset of jobs to those matching a search text, ranked by relevance.
+
+    Args:
+        queryset (QuerySet): A queryset of jobs.
+        text (str): The search text.
+        ranked (bool): Whether to rank the matches. Counting them does not need it.
+
+    Returns:
+        QuerySet: The matching jobs. If ranked, they are annotated with their relevance as 'rank' and ordered by
+        decreasing relevance.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+        queryset = queryset.alias(search=search_vector()).filter(search=query)
+        if not ranked:
+            return queryset
+        return queryset.annotate(rank=SearchRank(F("search"), query)).order_by("-rank", "-id")
+
+    # FTS5 syntax is not exposed to clients: every word is quoted as a plain term, and all of them must match.
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return queryset.none()
+    # The FTS table is joined as a one-to-one relation of the jobs, so the match and the ranking read the same row.
+    match = RawSQL(f"{FTS_TABLE} MATCH %s", [" ".join(f'"{term}"' for term in terms)], output_field=BooleanField())
+    queryset = queryset.filter(match, search_entry__isnull=False)
+    if not ranked:
+        return queryset
+    rank = RawSQL(f"-bm25({FTS_TABLE}, {', '.join(map(str, FTS_WEIGHTS))})", [], output_field=FloatField())
+    return queryset.annotate(rank=rank).order_by("-rank", "-id")
+
+
+def filter_jobs(queryset, filters, ranked=True):
+    """
+    Applies the search and filters of the job list to a queryset of jobs.
+
+    Locations are matched case-insensitively against the whole location, which `job_location_idx` serves. The
+    experience and posting time bounds are inclusive.
+
+    Args:
+        queryset (QuerySet): A queryset of jobs.
+        filters (dict): The validated parameters of `JobSearchQuerySerializer`. Parameters that were not given are
+            left out.
+        ranked (bool): Whether to rank the jobs by relevance when a search text was given.
+
+    Returns:
+        QuerySet: The allowed jobs.
+    """
+    if "location" in filters:
+        queryset = queryset.alias(location_key=Lower("location")).filter(location_key=filters["location"].lower())
+    if "min_experience" in filters:
+        queryset = queryset.filter(experience_required__gte=filters["min_experience"])
+    if "max_experience" in filters:
+        queryset = queryset.filter(experience_required__lte=filters["max_experience"])
+    if "posted_after" in filters:
+        queryset = queryset.filter(posted_at__gte=filters["posted_after"])
+    if "posted_before" in filters:
+        queryset = queryset.filter(posted_at__lte=filters["posted_before"])
+    if "q" in filters:
+        queryset = search_jobs(queryset, filters["q"], ranked)
+    return queryset
+
+
+def job_facets(queryset, now=None):
+    """
+    Counts jobs per location, per experience bucket and per posting time bucket in a single grouped query.
+
+    The jobs are grouped by the three keys at once, and the facets are summed up from the groups, whose number only
+    depends on the number of distinct locations.
+
+    Args:
+        queryset (QuerySet): The jobs to count, usually filtered by `filter_jobs()` without ranking.
+        now (datetime): The time posting time buckets are relative to. Defaults to the current time.
+
+    Returns:
+        dict: The 'total' number of jobs and the 'location', 'experience' and 'posted' facets, each mapping a
+        bucket to its number of jobs. Locations are lowercased, ordered by decreasing count and limited to
+        `JOB_FACETS_MAX_LOCATIONS`. Posting time buckets are cumulative, from the past day to the past month.
+    """
+    now = now or timezone.now()
+    experience = Case(
+        *[When(experience_required__lte=high, then=Value(label)) for label, high in EXPERIENCE_BUCKETS[:-1]],
+        default=Value(EXPERIENCE_BUCKETS[-1][0]),
+    )
+    posted = Case(
+        *[When(posted_at__gte=now - age, then=Value(label)) for label, age in POSTED_BUCKETS],
+        default=Value(None),
+        output_field=CharField(),
+    )
+    groups = queryset.order_by().values(
+        location_key=Lower("location"), experience_bucket=experience, posted_bucket=posted
+    ).annotate(count=Count("id"))
+
+    facets = {
+        "total": 0,
+        "location": {},
+        "experience": dict.fromkeys((label for label, _ in EXPERIENCE_BUCKETS), 0),
+        "posted": dict.fromkeys((label for label, _ in POSTED_BUCKETS), 0),
+    }
+    posted_labels = [label for label, _ in POSTED_BUCKETS]
+    for group in groups:
+        count = group["count"]
+        facets["total"] += count
+        facets["location"][group["location_key"]] = facets["location"].get(group["location_key"], 0) + count
+        facets["experience"][group["experience_bucket"]] += count
+        if group["posted_bucket"] is not None:
+            # A job posted within the past day was also posted within the past week and month.
+            for label in posted_labels[posted_labels.index(group["posted_bucket"]):]:
+                facets["posted"][label] += count
+    locations = sorted(facets["location"].items(), key=lambda item: (-item[1], item[0]))
+    facets["location"] = dict(locations[:settings.JOB_FACETS_MAX_LOCATIONS])
+    return facets
+
+
+def install_sqlite_search(schema_editor):
+    """
+    Creates the FTS5 table of the jobs and the triggers keeping it in sync on SQLite, and indexes every job.
+
+    The statements are those of the `0007_job_search` migration. Call it from a migration that rebuilt the jobs
+    table, to reinstall the triggers it dropped.
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The schema editor of the migration.
+    """
+    columns = ", ".join(field for field, _ in SEARCH_FIELDS)
+    new = ", ".join(f"new.{field}" for field, _ in SEARCH_FIELDS)
+    old = ", ".join(f"old.{field}" for field, _ in SEARCH_FIELDS)
+    delete = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new});"
+    for statement in (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, content='jobs_job', content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON jobs_job BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON jobs_job BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON jobs_job BEGIN {delete} {insert} END",
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ):
+        schema_editor.execute(statement)
+
+
+def uninstall_sqlite_search(schema_editor):
+    """
+    Drops the FTS5 table of the jobs and its triggers on SQLite.
+
+    Args:
+        schema_editor (BaseDatabaseSchemaEditor): The schema editor of the migration.
+    """
+    for trigger in ("insert", "delete", "update"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
+from users.models import JobSeekerProfile
 from .models import Job
+from .pagination import RecommendationPagination
 
 
 class JobSerializer(serializers.ModelSerializer):
@@ -14,7 +17,7 @@ class JobSerializer(serializers.ModelSerializer):
 
     Meta:
         model (Job): The model that the serializer is based on.
-        fields (list): List of fields to include in the serialized output. The value '__all__' indicates all fields from the model are included.
+        exclude (list): The internal fields left out of the serialized output; every other model field is included.
         read_only_fields (list): Specifies the fields that should be read-only (i.e., not editable by the client).
 
     Methods:
@@ -25,5 +28,266 @@ class JobSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = ['skill_hashes']
         read_only_fields = ['recruiter', 'posted_at']
+
+
+class JobSearchQuerySerializer(serializers.Serializer):
+    """
+    Serializer to validate the search and filter parameters of the job list.
+
+    Attributes:
+        q (CharField): The search text matched against the title, company and required skills. Matches are ranked by
+            relevance.
+        location (CharField): The location of the jobs, matched case-insensitively.
+        min_experience (IntegerField): The lowest required experience in years.
+        max_experience (IntegerField): The highest required experience in years.
+        posted_after (DateTimeField): The earliest posting time.
+        posted_before (DateTimeField): The latest posting time.
+
+    Methods:
+        validate(self, data): Ensures the experience and posting time ranges are not empty.
+    """
+
+    q = serializers.CharField(required=False, allow_blank=True, max_length=255)
+    location = serializers.CharField(required=False, max_length=255)
+    min_experience = serializers.IntegerField(required=False, min_value=0)
+    max_experience = serializers.IntegerField(required=False, min_value=0)
+    posted_after = serializers.DateTimeField(required=False)
+    posted_before = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        """
+        Ensures the experience and posting time ranges are not empty.
+
+        Args:
+            data (dict): The field-level validated data.
+
+        Returns:
+            dict: The parameters that were given, without an empty search text.
+
+        Raises:
+            ValidationError: If a lower bound is above its upper bound.
+        """
+        for low, high in (("min_experience", "max_experience"), ("posted_after", "posted_before")):
+            if low in data and high in data and data[low] > data[high]:
+                raise serializers.ValidationError(f"'{low}' must not be after '{high}'.")
+        if not data.get("q", "").strip():
+            data.pop("q", None)
+        return data
+
+
+class JobExportQuerySerializer(serializers.Serializer):
+    """
+    Serializer to validate the query parameters of the job export.
+
+    Attributes:
+        since (DateTimeField): The watermark of the previous export; only jobs posted after it are exported.
+        gzip (BooleanField): Whether to gzip the export.
+    """
+
+    since = serializers.DateTimeField(required=False)
+    gzip = serializers.BooleanField(default=False)
+
+
+class RecommendationBatchSerializer(serializers.Serializer):
+    """
+    Serializer to validate a batch recommendation request.
+
+    A request names either the job seekers to score (by user id) or raw skills texts, never both, along with the
+    number of jobs to return for each of them.
+
+    Attributes:
+        seeker_ids (ListField): The user ids of the job seekers to score.
+        skills (ListField): Raw skills texts to score.
+        k (IntegerField): The number of jobs to return per job seeker or skills text, at most
+            `RECOMMENDATION_PAGE_MAX_SIZE` like the page size of single recommendations.
+
+    Methods:
+        validate(self, data): Ensures exactly one of 'seeker_ids' and 'skills' is given and within the size limit.
+    """
+
+    seeker_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    skills = serializers.ListField(child=serializers.CharField(allow_blank=True), required=False, allow_empty=False)
+    k = serializers.IntegerField(min_value=1, max_value=settings.RECOMMENDATION_PAGE_MAX_SIZE, default=5)
+
+    def validate(self, data):
+        """
+        Ensures the request contains exactly one non-empty list within the batch size limit.
+
+        Args:
+            data (dict): The field-level validated data.
+
+        Returns:
+            dict: The validated data.
+
+        Raises:
+            ValidationError: If both or neither lists are given, or the list is too long.
+        """
+        given = [field for field in ("seeker_ids", "skills") if field in data]
+        if len(given) != 1:
+            raise serializers.ValidationError("Provide either 'seeker_ids' or 'skills'.")
+
+        max_size = settings.RECOMMENDATION_BATCH_MAX_SIZE
+        if len(data[given[0]]) > max_size:
+            raise serializers.ValidationError({given[0]: f"At most {max_size} entries are allowed per request."})
+        return data
+
+
+class RecommendationQuerySerializer(serializers.Serializer):
+    """
+    Serializer to validate the query parameters of the recommendation endpoint.
+
+    The 'k', 'offset' and 'cursor' parameters select a page of the ranking. The other parameters override the default
+    filters: by default, recommendations are restricted to the job seeker's preferred location, to jobs that do not
+    require more experience than the job seeker has, and to jobs the job seeker has not applied to yet.
+
+    Attributes:
+        k (IntegerField): The number of recommendations per page.
+        offset (IntegerField): The position of the first recommendation of the page.
+        cursor (CharField): An opaque position from the 'next' or 'previous' link of another page.
+        location (CharField): The location jobs must be in, or an empty value for any location.
+        max_experience (IntegerField): The highest required experience, or an empty value for no ceiling.
+        include_applied (BooleanField): Whether jobs the job seeker already applied to may be recommended.
+
+    Methods:
+        to_internal_value(self, data): Reads an empty 'max_experience' value as "no ceiling".
+        validate(self, data): Resolves the page offset and groups the filter overrides.
+    """
+
+    filter_fields = ("location", "max_experience", "include_applied")
+
+    k = serializers.IntegerField(min_value=1, max_value=settings.RECOMMENDATION_PAGE_MAX_SIZE, default=5)
+    offset = serializers.IntegerField(required=False, min_value=0)
+    cursor = serializers.CharField(required=False)
+    location = serializers.CharField(required=False, allow_blank=True, max_length=255)
+    max_experience = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+    include_applied = serializers.BooleanField(required=False)
+
+    def to_internal_value(self, data):
+        """
+        Reads an empty 'max_experience' value as "no ceiling".
+
+        Args:
+            data (QueryDict): The query parameters of the request.
+
+        Returns:
+            dict: The validated parameters. Filters that were not given are left out.
+        """
+        data = {key: data[key] for key in self.fields if key in data}
+        if data.get("max_experience") == "":
+            data["max_experience"] = None
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        """
+        Resolves the page offset from the 'offset' or 'cursor' parameter and groups the filter overrides.
+
+        Args:
+            data (dict): The field-level validated data.
+
+        Returns:
+            dict: 'k', 'offset' and 'overrides', the filter overrides that were given.
+
+        Raises:
+            ValidationError: If both 'offset' and 'cursor' are given.
+            NotFound: If the cursor is malformed.
+        """
+        if "offset" in data and "cursor" in data:
+            raise serializers.ValidationError("Provide either 'offset' or 'cursor'.")
+        if "cursor" in data:
+            offset = RecommendationPagination.decode_cursor(data["cursor"])
+        else:
+            offset = data.get("offset", 0)
+        return {
+            "k": data["k"],
+            "offset": offset,
+            "overrides": {key: data[key] for key in self.filter_fields if key in data},
+        }
+
+
+class RecommendedJobSerializer(JobSerializer):
+    """
+    Serializer for a recommended job: the job details along with its similarity score.
+
+    Attributes:
+        score (FloatField): The cosine similarity between the job seeker's skills (or, for similar jobs, another job's
+            requirements) and the job requirements, set on the job instance by the view (read-only).
+    """
+
+    score = serializers.FloatField(read_only=True)
+
+
+class CandidateQuerySerializer(serializers.Serializer):
+    """
+    Serializer to validate the query parameters of the candidates endpoint.
+
+    By default, candidates are restricted to job seekers with at least the experience the job requires and whose
+    preferred location (if any) is part of the job location. Both filters can be overridden.
+
+    Attributes:
+        k (IntegerField): The number of candidates to return.
+        location (CharField): The location the seekers' preferred location must be part of, or an empty value for any.
+        min_experience (IntegerField): The lowest years of experience, or an empty value for no floor.
+
+    Methods:
+        to_internal_value(self, data): Reads an empty 'min_experience' value as "no floor".
+        validate(self, data): Groups the filter overrides.
+    """
+
+    filter_fields = ("location", "min_experience")
+
+    k = serializers.IntegerField(min_value=1, max_value=settings.RECOMMENDATION_PAGE_MAX_SIZE, default=10)
+    location = serializers.CharField(required=False, allow_blank=True, max_length=255)
+    min_experience = serializers.IntegerField(required=False, allow_null=True, min_value=0)
+
+    def to_internal_value(self, data):
+        """
+        Reads an empty 'min_experience' value as "no floor".
+
+        Args:
+            data (QueryDict): The query parameters of the request.
+
+        Returns:
+            dict: The validated parameters. Filters that were not given are left out.
+        """
+        data = {key: data[key] for key in self.fields if key in data}
+        if data.get("min_experience") == "":
+            data["min_experience"] = None
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        """
+        Groups the filter overrides.
+
+        Args:
+            data (dict): The field-level validated data.
+
+        Returns:
+            dict: 'k' and 'overrides', the filter overrides that were given.
+        """
+        return {"k": data["k"], "overrides": {key: data[key] for key in self.filter_fields if key in data}}
+
+
+class CandidateSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a candidate of a job: the job seeker's profile along with their similarity score.
+
+    Attributes:
+        seeker_id (ReadOnlyField): The user id of the job seeker.
+        username (ReadOnlyField): The username of the job seeker.
+        score (FloatField): The cosine similarity between the job requirements and the job seeker's skills, set on the
+            profile instance by the view (read-only).
+
+    Meta:
+        model (JobSeekerProfile): The model that the serializer is based on.
+        fields (list): List of fields to include in the serialized output.
+    """
+
+    seeker_id = serializers.ReadOnlyField(source='user_id')
+    username = serializers.ReadOnlyField(source='user.username')
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = JobSeekerProfile
+        fields = ['seeker_id', 'username', 'skills', 'experience', 'preferred_location', 'resume', 'score']
@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from applications.models import JobApplication
+from users.models import JobSeekerProfile
+from .models import Job, SeekerRecommendation, SimilarJob
+from .recommender.changes import queue_job_changes, queue_seeker_changes
+from .recommender.responses import bump_seeker_version
+
+# Job fields stored in the recommendation index; saves that touch none of them leave the index unchanged.
+INDEXED_JOB_FIELDS = {"required_skills", "experience_required", "location"}
+
+# Job seeker profile fields stored in the job seeker index.
+INDEXED_PROFILE_FIELDS = {"skills", "experience", "preferred_location"}
+
+
+@receiver(post_save, sender=Job)
+def index_saved_job(sender, instance, update_fields=None, **kwargs):
+    """
+    Signal handler to keep the recommendation index in sync when a job is created or updated.
+
+    The change is queued in the surrounding transaction and applied to the index in the background once it commits,
+    so the index never contains uncommitted jobs. Saves that explicitly leave all indexed fields untouched do not
+    change the job's entry or its similar jobs, so they are queued as 'details' changes, which only invalidate the
+    cached recommendation responses that include the job details.
+
+    Args:
+        sender (Model): The model that sent the signal, which is the `Job` model.
+        instance (Job): The job being saved.
+        update_fields (frozenset): The fields passed to `save(update_fields=...)`, if any.
+        **kwargs: Additional keyword arguments passed to the receiver function.
+    """
+    if update_fields is not None and not INDEXED_JOB_FIELDS.intersection(update_fields):
+        queue_job_changes([instance.pk], "details")
+        return
+    queue_job_changes([instance.pk])
+
+
+@receiver(pre_delete, sender=Job)
+def remember_similar_job_referrers(sender, instance, **kwargs):
+    """
+    Signal handler to record which jobs list a job as similar before it is deleted.
+
+    The rows pointing at the job are deleted along with it, so those jobs are found here and queued, and their similar
+    jobs are recomputed once the job is dropped from the index.
+
+    Args:
+        sender (Model): The model that sent the signal, which is the `Job` model.
+        instance (Job): The job about to be deleted.
+        **kwargs: Additional keyword arguments passed to the receiver function.
+    """
+    queue_job_changes(SimilarJob.objects.filter(similar_id=instance.pk).values_list("job_id", flat=True), "referrer")
+
+
+@receiver(post_delete, sender=Job)
+def unindex_deleted_job(sender, instance, **kwargs):
+    """
+    Signal handler to drop a deleted job from the recommendation index, once the deletion is applied from the queue.
+
+    Args:
+        sender (Model): The model that sent the signal, which is the `Job` model.
+        instance (Job): The job being deleted.
+        **kwargs: Additional keyword arguments passed to the receiver function.
+    """
+    queue_job_changes([instance.pk])
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_applicant_recommendations(sender, instance, **kwargs):
+    """
+    Signal handler to drop the stored recommendations of a job seeker whose applications changed.
+
+    Applied jobs are excluded from recommendations, so the stored ranking and the cached responses are outdated once
+    the seeker applies for a job (or an application is removed).
+
+    Args:
+        sender (Model): The model that sent the signal, which is the `JobApplication` model.
+        instance (JobApplication): The application being saved or deleted.
+        **kwargs: Additional keyword arguments passed to the receiver function.
+    """
+    seeker_id = instance.job_seeker_id
+
+    def invalidate():
+        # After the commit, so a request computing the row meanwhile cannot store it again without the application.
+        SeekerRecommendation.objects.filter(profile__user_id=seeker_id).delete()
+        bump_seeker_version(seeker_id)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+@receiver(post_delete, sender=JobSeekerProfile)
+def invalidate_seeker_responses(sender, instance, **kwargs):
+    """
+    Signal handler to invalidate the cached recommendation responses of a job seeker whose profile changed.
+
+    Args:
+        sender (Model): The model that sent the signal, which is the `JobSeekerProfile` model.
+        instance (JobSeekerProfile): The profile being saved or deleted.
+        **kwargs: Additional keyword arguments passed to the receiver function.
+    """
+    seeker_id = instance.user_id
+    transaction.on_commit(lambda: bump_seeker_version(seeker_id))
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+@receiver(post_delete, sender=JobSeekerProfile)
+def index_changed_profile(sender, instance, update_fields=None, **kwargs):
+    """
+    Signal handler to keep the job seeker index, used to rank the candidates of jobs, in sync with the profiles.
+
+    The change is queued in the surrounding transaction and applied to the index in the background once it commits,
+    batched with other profile changes into a single published version. Saves that explicitly leave all indexed fields
+    untouched are ignored.
+
+    Args:
+        sender (Model): The model that sent the signal, which is the `JobSeekerProfile` model.
+        instance (JobSeekerProfile): The profile being saved or deleted.
+        update_fields (frozenset): The fields passed to `save(update_fields=...)`, if any.
+        **kwargs: Additional keyword arguments passed to the receiver function.
+    """
+    if update_fields is not None and not INDEXED_PROFILE_FIELDS.intersection(update_fields):
+        return
+    queue_seeker_changes([instance.user_id])
+
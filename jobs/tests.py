@@ -1,3 +1,1508 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import math
+import threading
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.checks import Tags, run_checks
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from applications.models import JobApplication
+from .models import Job, JobChange, SeekerChange, SeekerRecommendation, SimilarJob
+from .recommender import IndexStore, index_store, seeker_index_store, synthetic
+from .export import ndjson_chunks
+from .recommender.changes import apply_job_changes
+from .recommender.hashing import compute_idf, hash_terms, load_idf, save_idf
+from .recommender.filters import JobFilter
+from .recommender.index import JobIndex
+from .recommender.materialized import lookup
+from .recommender.parallel import build_parallel, shard_bounds
+from .recommender.rankers import Ranker, rank_with_fallback, ranker_counters
+from .recommender.responses import get_or_compute
+from .recommender.similar import compute_similar_jobs, store_similar_jobs
+from .recommender.streaming import stream_top_k
+from .recommender.timing import histograms
+from .recommender.text import analyze, analyze_batch
+from .search import FTS_TABLE, SEARCH_INDEX_NAME, search_jobs
+
+User = get_user_model()
+
+
+def create_job(recruiter, **fields):
+    """
+    Creates a job posted by a recruiter, with defaults for the fields that are not given.
+
+    Args:
+        recruiter (CustomUser): The recruiter posting the job.
+        **fields (dict): The fields of the job.
+
+    Returns:
+        Job: The created job.
+    """
+    defaults = {
+        "title": "Developer", "company": "Acme", "location": "Berlin", "salary_range": "50-60k",
+        "required_skills": "communication", "experience_required": 1,
+    }
+    return Job.objects.create(recruiter=recruiter, **{**defaults, **fields})
+
+
+@override_settings(RECOMMENDATION_INDEX_UPDATE_INTERVAL=0)
+class SearchTests(TestCase):
+    """
+    Tests the full-text search of the job list on the database the tests run on.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user("recruiter", password="secret", role="recruiter")
+        cls.title = create_job(cls.recruiter, title="Python developer")
+        cls.company = create_job(cls.recruiter, company="Python Software")
+        cls.skills = create_job(cls.recruiter, required_skills="python django")
+        cls.other = create_job(cls.recruiter, title="Java developer", required_skills="java spring")
+
+    def search(self, text, ranked=True):
+        return list(search_jobs(Job.objects.all(), text, ranked).values_list("id", flat=True))
+
+    def test_ranks_title_over_company_over_skills(self):
+        self.assertEqual(self.search("python"), [self.title.id, self.company.id, self.skills.id])
+
+    def test_matches_every_word(self):
+        self.assertEqual(self.search("python django"), [self.skills.id])
+        self.assertEqual(self.search("developer java"), [self.other.id])
+
+    def test_unranked_search_matches_the_same_jobs(self):
+        self.assertCountEqual(self.search("python", ranked=False), self.search("python"))
+
+    def test_follows_job_changes(self):
+        self.other.required_skills = "java python"
+        self.other.save()
+        self.title.delete()
+        self.assertCountEqual(self.search("python"), [self.company.id, self.skills.id, self.other.id])
+        self.assertEqual(self.search("spring"), [])
+
+
+@skipUnless(connection.vendor == "sqlite", "The search table and its triggers only exist on SQLite.")
+class SQLiteSearchTableTests(TestCase):
+    """
+    Tests the FTS5 table of the job search on SQLite and the system check of its triggers.
+    """
+
+    def check_database(self):
+        return [message.id for message in run_checks(tags=[Tags.database], databases=["default"])]
+
+    def test_migrations_install_the_triggers(self):
+        self.assertNotIn("jobs.W001", self.check_database())
+
+    def test_check_reports_missing_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {FTS_TABLE}_update")
+        self.assertIn("jobs.W001", self.check_database())
+
+
+@skipUnless(connection.vendor == "postgresql", "The tsvector search only runs on PostgreSQL.")
+class PostgreSQLSearchIndexTests(TestCase):
+    """
+    Tests that searches on PostgreSQL match the expression indexed by `job_search_idx`.
+    """
+
+    def test_search_uses_the_index(self):
+        recruiter = User.objects.create_user("recruiter", password="secret", role="recruiter")
+        create_job(recruiter, title="Python developer")
+        with connection.cursor() as cursor:
+            # The table is too small for the planner to prefer the index on its own.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        self.assertIn(SEARCH_INDEX_NAME, search_jobs(Job.objects.all(), "python").explain())
+
+
+class IndexTestCase(TestCase):
+    """
+    Base class of the tests using the recommendation index, published to a temporary directory.
+
+    The process-wide stores forget the index of the previous test, and the cached responses are cleared. Queued job
+    changes are only applied when a test calls `apply_job_changes()`.
+    """
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        directories = override_settings(
+            RECOMMENDATION_INDEX_DIR=f"{directory}/jobs",
+            RECOMMENDATION_SEEKER_INDEX_DIR=f"{directory}/seekers",
+            RECOMMENDATION_HASHING_IDF_PATH=f"{directory}/idf.npy",
+            RECOMMENDATION_INDEX_REBUILD_INTERVAL=0,
+            RECOMMENDATION_INDEX_UPDATE_INTERVAL=0,
+        )
+        directories.enable()
+        self.addCleanup(directories.disable)
+        for store in (index_store, seeker_index_store):
+            store.reset()
+        cache.clear()
+        self.recruiter = User.objects.create_user("recruiter", password="secret", role="recruiter")
+
+    def create_jobs(self, texts, **fields):
+        return [create_job(self.recruiter, required_skills=text, **fields) for text in texts]
+
+    def create_seeker(self, skills, username="seeker", experience=10, preferred_location="Berlin"):
+        seeker = User.objects.create_user(username, password="secret", role="job_seeker")
+        profile = seeker.job_seeker_profile
+        profile.skills, profile.experience, profile.preferred_location = skills, experience, preferred_location
+        profile.save()
+        return seeker
+
+
+class JobChangeTests(IndexTestCase):
+    """
+    Tests that job changes queued by the signal handlers reach the published index.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.python, self.java = self.create_jobs(["python django", "java spring"])
+        index_store.rebuild()
+        JobChange.objects.all().delete()
+
+    def test_applies_created_updated_and_deleted_jobs(self):
+        rust, = self.create_jobs(["rust python"])
+        self.java.required_skills = "kotlin spring"
+        self.java.save()
+        self.python.delete()
+        self.assertEqual(JobChange.objects.count(), 3)
+
+        self.assertEqual(apply_job_changes(), 3)
+
+        index = index_store.get()
+        self.assertCountEqual(index.job_ids.tolist(), [rust.id, self.java.id])
+        self.assertEqual(index.top_k("kotlin", 1)[0][0], self.java.id)
+        # New terms wait for the next rebuild, but known ones are indexed right away.
+        self.assertEqual(index.top_k("python", 1)[0][0], rust.id)
+        self.assertFalse(JobChange.objects.exists())
+
+    def test_leaves_the_queue_to_the_process_applying_it(self):
+        self.create_jobs(["rust"])
+        held, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            # Another thread opens the lock file again, so it stands for another process.
+            with index_store.locked():
+                held.set()
+                release.wait()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        held.wait()
+
+        self.assertIsNone(apply_job_changes())
+        self.assertEqual(JobChange.objects.count(), 1)
+
+    def test_concurrent_stores_keep_each_others_updates(self):
+        # Two stores on one directory stand for two processes, each holding the index it loaded.
+        first, second = IndexStore(rebuild_interval=0), IndexStore(rebuild_interval=0)
+        first.get(), second.get()
+        rust, go = self.create_jobs(["rust", "go"])
+
+        first.update([rust.id])
+        index = second.update([go.id])
+
+        self.assertCountEqual(index.job_ids.tolist(), [self.python.id, self.java.id, rust.id, go.id])
+        self.assertEqual(first.get().version, index.version)
+
+
+@override_settings(RECOMMENDATION_MATERIALIZED_TOP_K=2)
+class MaterializedRecommendationTests(IndexTestCase):
+    """
+    Tests that stored recommendations are served until a change could alter them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.python, self.django, self.java = self.create_jobs(["python django", "django rest", "java spring"])
+        self.seeker = self.create_seeker("python django")
+        self.profile = self.seeker.job_seeker_profile
+        index_store.rebuild()
+        JobChange.objects.all().delete()
+        call_command("refresh_recommendations", stdout=StringIO())
+
+    def stored(self):
+        return lookup(index_store.get(), self.profile)
+
+    def test_refresh_stores_the_top_jobs(self):
+        row = SeekerRecommendation.objects.get(profile=self.profile)
+
+        self.assertEqual(row.job_ids, [self.python.id, self.django.id])
+        self.assertEqual(self.stored(), list(zip(row.job_ids, row.scores)))
+
+    def test_profile_changes_are_not_served(self):
+        self.profile.skills = "java"
+
+        self.assertIsNone(self.stored())
+
+    def test_unrelated_job_changes_keep_the_row(self):
+        self.create_jobs(["cooking"])
+        self.java.required_skills = "java kotlin"
+        self.java.save()
+
+        apply_job_changes()
+
+        self.assertEqual([job_id for job_id, _ in self.stored()], [self.python.id, self.django.id])
+
+    def test_changes_that_could_enter_the_row_delete_it(self):
+        self.create_jobs(["python django rest"])
+
+        apply_job_changes()
+
+        self.assertIsNone(self.stored())
+
+    def test_changes_of_listed_jobs_delete_the_row(self):
+        self.django.required_skills = "java"
+        self.django.save()
+
+        apply_job_changes()
+
+        self.assertIsNone(self.stored())
+
+    def test_rebuilds_invalidate_the_rows(self):
+        index_store.rebuild()
+
+        self.assertIsNone(self.stored())
+
+    def test_applications_delete_the_row_once_committed(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            JobApplication.objects.create(job=self.python, job_seeker=self.seeker)
+            self.assertTrue(SeekerRecommendation.objects.exists())
+
+        self.assertTrue(callbacks)
+        self.assertFalse(SeekerRecommendation.objects.exists())
+
+
+class BatchRecommendationTests(IndexTestCase):
+    """
+    Tests that the batch endpoint ranks every entry as single recommendations do.
+    """
+
+    url = "/api/jobs/recommendations/batch/"
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = self.create_jobs(synthetic.job_skill_texts(40))
+        self.create_jobs(synthetic.job_skill_texts(5, seed=1), location="Paris")
+        self.seekers = [
+            self.create_seeker(skills, username=f"seeker{number}", experience=3)
+            for number, skills in enumerate(synthetic.seeker_skill_texts(3))
+        ]
+        index_store.rebuild()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("staff", password="secret", is_staff=True))
+
+    def post(self, data):
+        return self.client.post(self.url, data, format="json")
+
+    def test_skills(self):
+        texts = synthetic.seeker_skill_texts(4, seed=2)
+
+        response = self.post({"skills": texts, "k": 3})
+
+        self.assertEqual(response.status_code, 200)
+        index = index_store.get()
+        for text, result in zip(texts, response.data["results"]):
+            expected = [job_id for job_id, _ in index.top_k(text, 3)]
+            self.assertEqual([job["job_id"] for job in result["recommendations"]], expected)
+
+    def test_seekers_get_their_default_filters(self):
+        seeker_ids = [seeker.id for seeker in self.seekers]
+
+        response = self.post({"seeker_ids": [*seeker_ids, 0], "k": 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result["seeker_id"] for result in response.data["results"]], seeker_ids)
+        self.assertEqual(response.data["not_found"], [0])
+        for seeker, result in zip(self.seekers, response.data["results"]):
+            single = APIClient()
+            single.force_authenticate(seeker)
+            page = single.get("/api/jobs/recommendations/", {"k": 4}).data["results"]
+            self.assertEqual([job["job_id"] for job in result["recommendations"]], [job["id"] for job in page])
+
+    @override_settings(RECOMMENDATION_BATCH_MAX_SIZE=2)
+    def test_rejects_invalid_batches(self):
+        self.assertEqual(self.post({"skills": ["python"], "seeker_ids": [1]}).status_code, 400)
+        self.assertEqual(self.post({"skills": ["python"] * 3}).status_code, 400)
+        self.assertEqual(
+            self.post({"skills": ["python"], "k": settings.RECOMMENDATION_PAGE_MAX_SIZE + 1}).status_code, 400
+        )
+
+    def test_is_restricted_to_staff(self):
+        self.client.force_authenticate(self.seekers[0])
+
+        self.assertEqual(self.post({"skills": ["python"]}).status_code, 403)
+
+
+class AnalyzerTests(SimpleTestCase):
+    """
+    Tests that the skill-text analyzer keeps technology names intact.
+    """
+
+    def test_keeps_technology_names(self):
+        self.assertEqual(analyze("C++, C# and Node.js"), ["c++", "c#", "node.js"])
+        self.assertEqual(analyze("C/C++; .NET (ASP.NET), front-end"), ["c", "c++", ".net", "asp.net", "front-end"])
+
+    def test_drops_stopwords_punctuation_and_numbers(self):
+        self.assertEqual(analyze("Python, with 5 years of SQL!"), ["python", "years", "sql"])
+
+    def test_batches_match_single_texts(self):
+        texts = ["C++ developer", "", "node.js, react"]
+        self.assertEqual(analyze_batch(texts), [analyze(text) for text in texts])
+
+    def test_index_tells_the_languages_apart(self):
+        index = JobIndex.build([(1, "c++", 0, ""), (2, "c#", 0, ""), (3, "c", 0, ""), (4, "node.js", 0, "")])
+
+        self.assertEqual(index.top_k("C++", 1), [(1, 1.0)])
+        self.assertEqual(index.top_k("c#", 1), [(2, 1.0)])
+        self.assertEqual(index.top_k("Node.js", 1), [(4, 1.0)])
+
+
+class RankingTests(SimpleTestCase):
+    """
+    Tests that the matrix product, MaxScore retrieval and brute-force scoring rank jobs alike.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        texts = synthetic.job_skill_texts(300)
+        locations = synthetic.locations(300)
+        experience = synthetic.experience_years(300)
+        cls.index = JobIndex.build(list(zip(range(1, 301), texts, experience, locations)))
+        cls.queries = synthetic.seeker_skill_texts(20)
+
+    def assertRanksLikeBruteForce(self, text, matches, k, mask=None):
+        # Ties may be broken differently, so compare the scores in order and the score of every returned job.
+        scores = self.index.scores(text)
+        allowed = scores[np.flatnonzero(mask)] if mask is not None else scores
+        np.testing.assert_allclose(
+            [score for _, score in matches], np.sort(allowed)[::-1][:k], rtol=1e-5, atol=1e-6
+        )
+        for job_id, score in matches:
+            self.assertAlmostEqual(score, scores[self.index.position(job_id)], places=5)
+
+    def test_rankings_match_brute_force(self):
+        batches = self.index.top_k_batch(self.queries, 10)
+        for text, batch in zip(self.queries, batches):
+            self.assertRanksLikeBruteForce(text, self.index.top_k(text, 10), 10)
+            self.assertRanksLikeBruteForce(text, batch, 10)
+
+    def test_filtered_rankings_match_brute_force(self):
+        job_filter = JobFilter(max_experience=5, location=self.index.location_names[1])
+        mask = job_filter.mask(self.index)
+        for text in self.queries:
+            matches = self.index.top_k(text, 10, job_filter)
+            self.assertRanksLikeBruteForce(text, matches, 10, mask)
+            self.assertTrue(all(mask[self.index.position(job_id)] for job_id, _ in matches))
+
+
+class PaginationTests(IndexTestCase):
+    """
+    Tests that following the cursors of the job list and of the recommendations visits every entry once, in order.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = self.create_jobs(synthetic.job_skill_texts(12))
+        self.seeker = self.create_seeker(synthetic.seeker_skill_texts(1)[0])
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def follow(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            url = response.data["next"]
+        return pages
+
+    def test_recommendation_pages(self):
+        index_store.rebuild()
+        ranking = self.client.get("/api/jobs/recommendations/", {"k": 50}).data["results"]
+
+        pages = self.follow("/api/jobs/recommendations/?k=5")
+
+        self.assertEqual([job["id"] for page in pages for job in page["results"]], [job["id"] for job in ranking])
+        self.assertEqual([len(page["results"]) for page in pages], [5, 5, 2])
+        self.assertEqual(len(ranking), len(self.jobs))
+        scores = [job["score"] for job in ranking]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        previous = self.client.get(pages[-1]["previous"]).data
+        self.assertEqual(previous["results"], pages[1]["results"])
+
+    def post_in_pairs(self):
+        # Jobs posted at the same time are ordered by id.
+        now = timezone.now()
+        for position, job in enumerate(self.jobs):
+            Job.objects.filter(id=job.id).update(posted_at=now - timedelta(hours=position // 2))
+
+    def test_keyset_pages(self):
+        self.post_in_pairs()
+
+        pages = self.follow("/api/jobs/?pagination=cursor&page_size=5")
+
+        ids = [job["id"] for page in pages for job in page["results"]]
+        self.assertEqual(ids, list(Job.objects.order_by("-posted_at", "-id").values_list("id", flat=True)))
+        self.assertEqual([len(page["results"]) for page in pages], [5, 5, 2])
+        self.assertIsNone(pages[0]["previous"])
+        previous = self.client.get(pages[-1]["previous"]).data
+        self.assertEqual(previous["results"], pages[1]["results"])
+
+    def test_keyset_pages_ignore_jobs_posted_meanwhile(self):
+        self.post_in_pairs()
+        first = self.client.get("/api/jobs/?pagination=cursor&page_size=5").data
+
+        self.create_jobs(["python"])
+        pages = [first, *self.follow(first["next"])]
+
+        ids = [job["id"] for page in pages for job in page["results"]]
+        self.assertEqual(sorted(ids), sorted(job.id for job in self.jobs))
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/jobs/", {"cursor": "not a cursor"})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class BenchmarkCommandTests(IndexTestCase):
+    """
+    Tests that the recommendation benchmark measures requests through the view and leaves no data behind.
+    """
+
+    def test_reports_the_stages_of_view_requests(self):
+        output = os.path.join(tempfile.mkdtemp(), "results.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(output), ignore_errors=True)
+        options = {
+            "sizes": "60", "queries": 6, "memory_queries": 1, "seekers": 3, "output": output, "stdout": StringIO(),
+        }
+
+        call_command("benchmark_recommendations", **options)
+        call_command("benchmark_recommendations", compare=output, **options)
+
+        with open(output, encoding="utf-8") as handle:
+            result, = json.load(handle)["results"]
+        self.assertEqual(result["jobs"], 60)
+        # Requests cycle through the 3 job seekers, so the second round is served from the response cache.
+        self.assertEqual(result["cached_ratio"], 0.5)
+        self.assertEqual(result["rankers"], {"index": 6})
+        self.assertGreater(result["stages"]["score"]["p95_ms"], 0)
+        self.assertIn("Change of the p95 latency", options["stdout"].getvalue())
+        self.assertFalse(Job.objects.exists())
+        self.assertIsNone(index_store.published_version())
+
+
+@override_settings(RECOMMENDATION_TIMING_ENABLED=True)
+class ResponseCacheTests(IndexTestCase):
+    """
+    Tests that recommendation responses are cached until a change they depend on, and computed once per miss.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.python, self.java = self.create_jobs(["python django", "java spring"])
+        self.seeker = self.create_seeker("python")
+        index_store.rebuild()
+        JobChange.objects.all().delete()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def recommend(self):
+        response = self.client.get("/api/jobs/recommendations/")
+        self.assertEqual(response.status_code, 200)
+        return response, 'cached;desc="1"' in response["Server-Timing"]
+
+    def test_repeated_requests_are_served_from_the_cache(self):
+        first, cached = self.recommend()
+        self.assertFalse(cached)
+
+        second, cached = self.recommend()
+
+        self.assertTrue(cached)
+        self.assertEqual(second.data, first.data)
+
+    def test_job_changes_invalidate_the_responses(self):
+        self.recommend()
+        self.java.required_skills = "python"
+        self.java.save()
+        apply_job_changes()
+
+        response, cached = self.recommend()
+
+        self.assertFalse(cached)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_details_changes_keep_the_index_and_invalidate_the_responses(self):
+        self.recommend()
+        version, details = index_store.published_version(), index_store.details_version()
+        self.python.salary_range = "70-80k"
+        self.python.save(update_fields=["salary_range"])
+        self.assertEqual(list(JobChange.objects.values_list("kind", flat=True)), ["details"])
+
+        apply_job_changes()
+        response, cached = self.recommend()
+
+        self.assertEqual(index_store.published_version(), version)
+        self.assertNotEqual(index_store.details_version(), details)
+        self.assertFalse(cached)
+        self.assertEqual(response.data["results"][0]["salary_range"], "70-80k")
+
+    def test_profile_and_application_changes_invalidate_the_seekers_responses(self):
+        self.recommend()
+        with self.captureOnCommitCallbacks(execute=True):
+            JobApplication.objects.create(job=self.java, job_seeker=self.seeker)
+        self.assertFalse(self.recommend()[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seeker.job_seeker_profile.save(update_fields=["resume"])
+        self.assertFalse(self.recommend()[1])
+
+    def test_concurrent_misses_are_computed_once(self):
+        computing, release = threading.Event(), threading.Event()
+        results = []
+
+        def compute_slowly():
+            computing.set()
+            release.wait()
+            return {"results": [1]}
+
+        thread = threading.Thread(target=lambda: results.append(get_or_compute("key", compute_slowly)))
+        thread.start()
+        computing.wait()
+        waiting = threading.Thread(target=lambda: results.append(get_or_compute("key", self.fail)))
+        waiting.start()
+        release.set()
+        thread.join()
+        waiting.join()
+
+        self.assertCountEqual(results, [({"results": [1]}, False), ({"results": [1]}, True)])
+
+    @override_settings(RECOMMENDATION_RESPONSE_CACHE_LOCK_TIMEOUT=1)
+    def test_waiting_requests_compute_the_response_past_the_lock_timeout(self):
+        cache.add("key:lock", 1, 60)  # A request that never stores its result
+
+        self.assertEqual(get_or_compute("key", lambda: {"results": []}), ({"results": []}, False))
+
+
+@override_settings(RECOMMENDATION_SIMILAR_JOBS_TOP_N=5)
+class SimilarJobsTests(IndexTestCase):
+    """
+    Tests that the incremental updates of the similar jobs give the lists a full recomputation gives.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.jobs = self.create_jobs(synthetic.job_skill_texts(80))
+        index_store.rebuild()
+        JobChange.objects.all().delete()
+
+    def full_recomputation(self):
+        return {
+            job_id: sorted(similar_id for similar_id, _ in matches)
+            for job_ids, similar in compute_similar_jobs(index_store.get(), 5, 32)
+            for job_id, matches in zip(job_ids, similar)
+            if matches
+        }
+
+    def stored(self):
+        lists = {}
+        for job_id, similar_id in SimilarJob.objects.values_list("job_id", "similar_id"):
+            lists.setdefault(job_id, []).append(similar_id)
+        return {job_id: sorted(similar_ids) for job_id, similar_ids in lists.items()}
+
+    def test_updates_match_a_full_recomputation(self):
+        for job_ids, similar in compute_similar_jobs(index_store.get(), 5, 32):
+            store_similar_jobs(job_ids, similar)
+        referred = SimilarJob.objects.values_list("similar_id", flat=True).first()
+        self.create_jobs(synthetic.job_skill_texts(3, seed=4))
+        self.jobs[0].required_skills = synthetic.job_skill_texts(1, seed=5)[0]
+        self.jobs[0].save()
+        Job.objects.get(id=referred).delete()
+
+        apply_job_changes()
+
+        self.assertEqual(self.stored(), self.full_recomputation())
+
+    def test_updates_of_an_empty_table_only_store_the_changed_jobs(self):
+        created, = self.create_jobs(synthetic.job_skill_texts(1, seed=4))
+
+        apply_job_changes()
+
+        self.assertEqual(self.stored(), {created.id: self.full_recomputation()[created.id]})
+
+    def test_endpoint_lists_the_stored_jobs_by_decreasing_similarity(self):
+        call_command("refresh_similar_jobs", workers=1, stdout=StringIO())
+        job = self.jobs[0]
+        client = APIClient()
+        client.force_authenticate(self.recruiter)
+
+        response = client.get(f"/api/jobs/{job.id}/similar/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(similar["id"] for similar in response.data["results"]), self.stored()[job.id])
+        scores = [similar["score"] for similar in response.data["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(client.get("/api/jobs/0/similar/").status_code, 404)
+
+
+class CandidateTests(IndexTestCase):
+    """
+    Tests that the candidates of a job are ranked from the job seeker index, for the recruiter of the job only.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.job, = self.create_jobs(["python django"], experience_required=2)
+        self.match = self.create_seeker("python django", username="match", experience=5)
+        self.partial = self.create_seeker("python", username="partial", experience=5, preferred_location="")
+        self.junior = self.create_seeker("python django", username="junior", experience=0)
+        self.remote = self.create_seeker("python", username="remote", experience=5, preferred_location="Paris")
+        self.other = self.create_seeker("java", username="other", experience=5)
+        index_store.rebuild()
+        seeker_index_store.rebuild()
+        SeekerChange.objects.all().delete()
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def candidates(self, **params):
+        response = self.client.get(f"/api/jobs/{self.job.id}/candidates/", params)
+        self.assertEqual(response.status_code, 200)
+        return [candidate["seeker_id"] for candidate in response.data["results"]]
+
+    def test_ranks_the_matching_seekers(self):
+        self.assertEqual(self.candidates(), [self.match.id, self.partial.id])
+
+    def test_filters_can_be_overridden(self):
+        candidates = self.candidates(min_experience="", location="")
+
+        self.assertCountEqual(candidates[:2], [self.match.id, self.junior.id])
+        self.assertCountEqual(candidates[2:], [self.partial.id, self.remote.id])
+        self.assertEqual(self.candidates(k=1), [self.match.id])
+
+    def test_follows_queued_profile_changes(self):
+        profile = self.other.job_seeker_profile
+        profile.skills = "python django"
+        profile.save()
+        self.assertEqual(SeekerChange.objects.count(), 1)
+        self.assertNotIn(self.other.id, self.candidates())
+
+        apply_job_changes()
+
+        self.assertCountEqual(self.candidates()[:2], [self.match.id, self.other.id])
+
+    def test_is_restricted_to_the_recruiter_of_the_job(self):
+        self.client.force_authenticate(User.objects.create_user("rival", password="secret", role="recruiter"))
+        self.assertEqual(self.client.get(f"/api/jobs/{self.job.id}/candidates/").status_code, 403)
+
+        self.client.force_authenticate(self.match)
+        self.assertEqual(self.client.get(f"/api/jobs/{self.job.id}/candidates/").status_code, 403)
+        self.assertEqual(self.client.get("/api/jobs/0/candidates/").status_code, 404)
+
+
+class StreamingScorerTests(IndexTestCase):
+    """
+    Tests that the streaming scorer ranks the catalog like the index, with term frequencies instead of TF-IDF weights.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.create_jobs(synthetic.job_skill_texts(50))
+        self.create_jobs(synthetic.job_skill_texts(10, seed=1), location="Paris", experience_required=8)
+
+    def test_scores_are_the_cosine_of_term_frequencies(self):
+        texts = dict(Job.objects.values_list("id", "required_skills"))
+        for text in synthetic.seeker_skill_texts(5):
+            query = Counter(analyze(text))
+            expected = []
+            for job_id, job_text in texts.items():
+                terms = Counter(analyze(job_text))
+                norms = math.hypot(*query.values()) * math.hypot(*terms.values())
+                expected.append(sum(count * terms[term] for term, count in query.items()) / norms if norms else 0.0)
+
+            matches = stream_top_k(text, 10, chunk_size=7)
+
+            np.testing.assert_allclose([score for _, score in matches], sorted(expected)[::-1][:10], atol=1e-6)
+            for job_id, score in matches:
+                self.assertAlmostEqual(score, expected[list(texts).index(job_id)], places=6)
+
+    def test_chunks_do_not_change_the_ranking(self):
+        for text in synthetic.seeker_skill_texts(5):
+            self.assertEqual(stream_top_k(text, 10, chunk_size=3), stream_top_k(text, 10, chunk_size=1000))
+
+    def test_ranks_like_the_index(self):
+        Job.objects.all().delete()
+        jobs = self.create_jobs(["python django", "python django sql", "python", "java spring", "cooking"])
+        self.create_jobs(["python django"], location="Paris")
+        index = index_store.rebuild()
+        job_filter = JobFilter(location="Berlin")
+
+        matches = stream_top_k("Python, Django", 5, job_filter)
+
+        self.assertEqual([job_id for job_id, _ in matches], [job.id for job in jobs])
+        self.assertEqual(
+            [job_id for job_id, _ in matches], [job_id for job_id, _ in index.top_k("Python, Django", 5, job_filter)]
+        )
+        self.assertAlmostEqual(matches[0][1], 1.0, places=6)
+        self.assertEqual([score for _, score in matches[3:]], [0.0, 0.0])
+
+
+class DenseRetrievalTests(IndexTestCase):
+    """
+    Tests the ranking by LSA embeddings, against brute-force scoring of the embeddings.
+    """
+
+    def setUp(self):
+        super().setUp()
+        rows = zip(range(1, 201), synthetic.job_skill_texts(200), synthetic.experience_years(200), [""] * 200)
+        self.index = JobIndex.build(list(rows), dimensions=16)
+        self.queries = synthetic.seeker_skill_texts(10)
+
+    def embedding_scores(self, index, text):
+        query = np.asarray(index.transform(text) @ index.projection).ravel()
+        return index.embeddings.astype(np.float32) @ (query / np.linalg.norm(query))
+
+    def test_rankings_match_brute_force(self):
+        job_filter = JobFilter(max_experience=5)
+        mask = job_filter.mask(self.index)
+        for text in self.queries:
+            scores = self.embedding_scores(self.index, text)
+            matches = self.index.top_k(text, 10, job_filter, dense=True)
+
+            np.testing.assert_allclose(
+                [score for _, score in matches], np.sort(scores[mask])[::-1][:10], rtol=1e-5, atol=1e-6
+            )
+            self.assertTrue(all(mask[self.index.position(job_id)] for job_id, _ in matches))
+
+    def test_float16_embeddings_keep_the_scores(self):
+        half = JobIndex.build(
+            list(zip(self.index.job_ids.tolist(), synthetic.job_skill_texts(200), [0] * 200, [""] * 200)),
+            dimensions=16, dense_dtype="float16",
+        )
+
+        self.assertEqual(half.embeddings.dtype, np.float16)
+        for text in self.queries:
+            np.testing.assert_allclose(
+                self.embedding_scores(half, text), self.embedding_scores(self.index, text), atol=5e-3
+            )
+
+    def test_added_jobs_are_projected_with_the_existing_components(self):
+        text = synthetic.job_skill_texts(1, seed=3)[0]
+
+        index = self.index.upsert(1000, text)
+
+        np.testing.assert_array_equal(index.projection, self.index.projection)
+        expected = np.asarray(index.transform(text) @ index.projection).ravel()
+        np.testing.assert_allclose(
+            index.embeddings[index.position(1000)], expected / np.linalg.norm(expected), rtol=1e-5, atol=1e-6
+        )
+
+    @override_settings(RECOMMENDATION_DENSE_DIMENSIONS=8, RECOMMENDATION_RETRIEVAL="dense")
+    def test_recommendations_use_the_published_embeddings(self):
+        self.create_jobs(synthetic.job_skill_texts(30))
+        seeker = self.create_seeker(synthetic.seeker_skill_texts(1)[0])
+        index = index_store.rebuild()
+        client = APIClient()
+        client.force_authenticate(seeker)
+
+        results = client.get("/api/jobs/recommendations/", {"k": 5}).data["results"]
+
+        self.assertEqual(index_store.get().embeddings.shape, (30, 8))
+        profile = seeker.job_seeker_profile
+        expected = index.top_k(profile.skills, 5, JobFilter.for_profile(profile), dense=True)
+        self.assertEqual([job["id"] for job in results], [job_id for job_id, _ in expected])
+
+
+@override_settings(RECOMMENDATION_VECTORIZER="hashing", RECOMMENDATION_HASHING_FEATURES=2 ** 20)
+class HashingVectorizerTests(IndexTestCase):
+    """
+    Tests that the hashed index, weighted with the synced IDF file, scores jobs like the fitted TF-IDF index.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.texts = synthetic.job_skill_texts(60)
+        self.jobs = self.create_jobs(self.texts)
+
+    def test_jobs_store_their_term_hashes_in_hashing_mode_only(self):
+        self.assertEqual(Job.objects.get(id=self.jobs[0].id).skill_hashes, hash_terms(self.texts[0]))
+
+        with override_settings(RECOMMENDATION_VECTORIZER="tfidf"):
+            self.jobs[0].save()
+        self.assertIsNone(Job.objects.get(id=self.jobs[0].id).skill_hashes)
+
+    def test_scores_match_the_fitted_index(self):
+        hashed = index_store.rebuild()
+        with override_settings(RECOMMENDATION_VECTORIZER="tfidf"):
+            fitted = JobIndex.build(Job.objects.values_list("id", "required_skills", "experience_required", "location"))
+
+        self.assertEqual(hashed.features, 2 ** 20)
+        # Without collisions, and for queries whose terms all occur in the catalog, the weights are the same.
+        for text in self.texts[:10]:
+            np.testing.assert_allclose(hashed.scores(text), fitted.scores(text), rtol=1e-5, atol=1e-6)
+
+    def test_builds_read_the_synced_idf_file(self):
+        self.assertIsNone(load_idf(settings.RECOMMENDATION_HASHING_IDF_PATH, 2 ** 20))
+        index = index_store.rebuild()
+        # Without a synced file, the first build computes it and writes it for the next ones.
+        np.testing.assert_array_equal(load_idf(settings.RECOMMENDATION_HASHING_IDF_PATH, 2 ** 20), index.idf)
+
+        synced = np.ones(2 ** 20, dtype=np.float32)
+        save_idf(synced, settings.RECOMMENDATION_HASHING_IDF_PATH)
+
+        np.testing.assert_array_equal(index_store.rebuild().idf, synced)
+
+    def test_refresh_command_writes_the_weights_of_the_catalog(self):
+        synced = np.ones(2 ** 20, dtype=np.float32)
+        save_idf(synced, settings.RECOMMENDATION_HASHING_IDF_PATH)
+
+        call_command("refresh_hashing_idf", stdout=StringIO())
+
+        expected = compute_idf(Job.objects.values_list("skill_hashes", flat=True), 2 ** 20)
+        np.testing.assert_array_equal(index_store.rebuild().idf, expected)
+
+
+class ParallelBuildTests(IndexTestCase):
+    """
+    Tests that merging the shards of a parallel build gives the index a single-process build gives.
+
+    The shards are vectorized in the test process: worker processes would not see the jobs of the test transaction.
+    """
+
+    def setUp(self):
+        super().setUp()
+        jobs = self.create_jobs(synthetic.job_skill_texts(50))
+        for job, location, experience in zip(jobs, synthetic.locations(50), synthetic.experience_years(50)):
+            Job.objects.filter(id=job.id).update(location=location, experience_required=experience)
+        # A job without any known term, to check that empty rows keep their place.
+        self.create_jobs([""])
+
+    def assertSameIndex(self, index, expected):
+        np.testing.assert_array_equal(index.job_ids, expected.job_ids)
+        np.testing.assert_array_equal(index.vocabulary, expected.vocabulary)
+        np.testing.assert_allclose(index.idf, expected.idf, rtol=1e-6)
+        np.testing.assert_allclose(index.matrix.toarray(), expected.matrix.toarray(), rtol=1e-5, atol=1e-7)
+        np.testing.assert_array_equal(index.experience, expected.experience)
+        self.assertEqual(
+            [index.location_names[code] for code in index.location_codes],
+            [expected.location_names[code] for code in expected.location_codes],
+        )
+
+    def test_shards_cover_the_catalog(self):
+        bounds = shard_bounds(7)
+
+        self.assertEqual(len(bounds), 8)
+        self.assertEqual(bounds[0][0], Job.objects.order_by("id").first().id)
+        self.assertIsNone(bounds[-1][1])
+        self.assertEqual([end for _, end in bounds[:-1]], [start for start, _ in bounds[1:]])
+
+    def test_matches_a_single_process_build(self):
+        expected = JobIndex.build(Job.objects.order_by("id").values_list(
+            "id", "required_skills", "experience_required", "location"
+        ))
+
+        self.assertSameIndex(build_parallel(1, 7), expected)
+
+    def test_matches_a_single_process_hashed_build(self):
+        rows = [
+            (job_id, hash_terms(text), experience, location)
+            for job_id, text, experience, location in Job.objects.order_by("id").values_list(
+                "id", "required_skills", "experience_required", "location"
+            )
+        ]
+        expected = JobIndex.build_hashed(rows, compute_idf([row[1] for row in rows], 2 ** 12))
+
+        index = build_parallel(1, 7, features=2 ** 12, idf_path=settings.RECOMMENDATION_HASHING_IDF_PATH)
+
+        self.assertSameIndex(index, expected)
+        self.assertEqual(index.features, 2 ** 12)
+
+
+class IndexCompactionTests(SimpleTestCase):
+    """
+    Tests that the job index is stored as float32 CSR with int32 indices, and that pruning only drops small weights.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.texts = synthetic.job_skill_texts(200)
+        cls.index = JobIndex.build(list(zip(
+            range(1, 201), cls.texts, synthetic.experience_years(200), synthetic.locations(200)
+        )))
+
+    def test_compact_layout(self):
+        self.assertEqual(self.index.matrix.dtype, np.float32)
+        self.assertEqual(self.index.matrix.indices.dtype, np.int32)
+        self.assertEqual(self.index.matrix.indptr.dtype, np.int32)
+        self.assertEqual(self.index.upsert(201, self.texts[0]).matrix.dtype, np.float32)
+
+    def test_pruning_drops_the_weights_below_the_threshold(self):
+        full = self.index.matrix.toarray()
+
+        pruned = self.index.pruned(0.2)
+
+        np.testing.assert_array_equal(pruned.matrix.toarray(), np.where(full >= 0.2, full, 0))
+        self.assertLess(pruned.matrix.nnz, self.index.matrix.nnz)
+        self.assertEqual(pruned.matrix.indices.dtype, np.int32)
+
+    def test_added_and_loaded_jobs_keep_the_threshold(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        pruned = self.index.pruned(0.2).upsert(201, self.texts[0])
+
+        pruned.save(os.path.join(directory, "index"))
+        loaded = JobIndex.load(os.path.join(directory, "index"))
+
+        self.assertGreaterEqual(pruned.matrix[pruned.position(201)].data.min(), 0.2)
+        self.assertEqual(loaded.prune_threshold, 0.2)
+        np.testing.assert_array_equal(loaded.matrix.toarray(), pruned.matrix.toarray())
+
+    def test_benchmark_reports_memory_and_ranking(self):
+        output = os.path.join(tempfile.mkdtemp(), "results.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(output), ignore_errors=True)
+
+        call_command(
+            "benchmark_index_compaction", sizes="200", thresholds="0,0.2", queries=5, output=output, stdout=StringIO()
+        )
+
+        with open(output, encoding="utf-8") as handle:
+            reference, compact, pruned = json.load(handle)["results"]
+        self.assertEqual(compact["nonzeros"], reference["nonzeros"])
+        # 4-byte instead of 8-byte values, at the same number of weights.
+        self.assertLess(compact["matrix_bytes"], 0.7 * reference["matrix_bytes"])
+        self.assertLess(pruned["nonzeros"], compact["nonzeros"])
+        self.assertGreater(compact["recall"], 0.9)
+
+
+class SlowRanker(Ranker):
+    """
+    A primary ranker that answers after the deadline, unless the test releases it.
+    """
+
+    name = "slow"
+    cacheable = True
+    release = threading.Event()
+
+    def rank(self, profile, depth, overrides):
+        self.release.wait(5)
+        return []
+
+
+class FailingRanker(Ranker):
+    """
+    A primary ranker that always fails.
+    """
+
+    name = "failing"
+    cacheable = True
+
+    def rank(self, profile, depth, overrides):
+        raise RuntimeError("The ranker failed.")
+
+
+@override_settings(RECOMMENDATION_DEADLINE_MS=50)
+class RankerFallbackTests(IndexTestCase):
+    """
+    Tests that recommendations fall back to cheaper rankers when the primary ranker misses the deadline or fails.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.old, self.python, self.java = self.create_jobs(["python", "python django", "java spring"])
+        index_store.rebuild()
+        self.seeker = self.create_seeker("python django")
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+        SlowRanker.release.clear()
+        self.addCleanup(SlowRanker.release.set)
+
+    def recommend(self):
+        response = self.client.get("/api/jobs/recommendations/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def counts(self, ranker):
+        return ranker_counters.snapshot().get(ranker, dict.fromkeys(ranker_counters.OUTCOMES, 0))
+
+    @override_settings(RECOMMENDATION_RANKERS="jobs.tests.SlowRanker,latest")
+    def test_missed_deadline_falls_back(self):
+        slow, latest = self.counts("slow"), self.counts("latest")
+
+        data = self.recommend()
+
+        self.assertEqual(data["ranker"], "latest")
+        self.assertEqual([job["id"] for job in data["results"]], [self.java.id, self.python.id, self.old.id])
+        self.assertEqual(self.counts("slow")["timeouts"], slow["timeouts"] + 1)
+        self.assertEqual(self.counts("latest")["fallbacks"], latest["fallbacks"] + 1)
+        # Fallback rankings are not cached, so the next request tries the primary ranker again.
+        SlowRanker.release.set()
+        self.assertEqual(self.recommend()["ranker"], "slow")
+
+    @override_settings(RECOMMENDATION_RANKERS="jobs.tests.FailingRanker,keyword_overlap,latest")
+    def test_failure_falls_back_to_keyword_overlap(self):
+        failing = self.counts("failing")
+
+        data = self.recommend()
+
+        self.assertEqual(data["ranker"], "keyword_overlap")
+        # Jobs without any of the terms fill up the ranking with zero scores.
+        self.assertEqual([job["id"] for job in data["results"]], [self.python.id, self.old.id, self.java.id])
+        self.assertEqual([job["score"] for job in data["results"]], [1.0, 0.5, 0.0])
+        self.assertEqual(self.counts("failing")["errors"], failing["errors"] + 1)
+
+    @override_settings(RECOMMENDATION_RANKERS="jobs.tests.FailingRanker")
+    def test_last_ranker_errors_are_raised(self):
+        with self.assertRaises(RuntimeError):
+            rank_with_fallback(self.seeker.job_seeker_profile, 3, {})
+
+    @override_settings(RECOMMENDATION_DEADLINE_MS=0, RECOMMENDATION_RANKERS="jobs.tests.SlowRanker,latest")
+    def test_without_budget_the_primary_ranker_is_awaited(self):
+        SlowRanker.release.set()
+
+        self.assertEqual(self.recommend()["ranker"], "slow")
+
+    # Without a budget, so that the index ranker reads the test database from the request's thread.
+    @override_settings(RECOMMENDATION_DEADLINE_MS=0, RECOMMENDATION_RANKERS="streaming,index,latest")
+    def test_unavailable_rankers_are_skipped(self):
+        # The streaming scorer only answers until the job index is loaded.
+        self.assertEqual(self.recommend()["ranker"], "index")
+
+    @override_settings(RECOMMENDATION_RANKERS="streaming")
+    def test_no_available_ranker(self):
+        with self.assertRaises(ImproperlyConfigured):
+            rank_with_fallback(self.seeker.job_seeker_profile, 3, {})
+
+    def test_counters_are_reported(self):
+        staff = User.objects.create_user("staff", password="secret", is_staff=True)
+        self.client.force_authenticate(staff)
+
+        response = self.client.get("/api/jobs/recommendations/timings/")
+
+        self.assertEqual(response.data["rankers"], ranker_counters.snapshot())
+
+
+class JobListFilterTests(IndexTestCase):
+    """
+    Tests the filters of the job list, their combination with the search, and the facet counts of the filtered list.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.berlin = create_job(self.recruiter, title="Python developer", location="Berlin", experience_required=1)
+        self.senior = create_job(self.recruiter, title="Python lead", location="berlin", experience_required=6)
+        self.paris = create_job(self.recruiter, title="Java developer", location="Paris", experience_required=3)
+        self.old = create_job(self.recruiter, title="Python intern", location="Paris", experience_required=0)
+        Job.objects.filter(id=self.old.id).update(posted_at=timezone.now() - timedelta(days=10))
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def list_ids(self, **params):
+        response = self.client.get("/api/jobs/", params)
+        self.assertEqual(response.status_code, 200)
+        return [job["id"] for job in response.data["results"]]
+
+    def test_filters(self):
+        self.assertCountEqual(self.list_ids(location="BERLIN"), [self.berlin.id, self.senior.id])
+        self.assertCountEqual(self.list_ids(min_experience=3), [self.senior.id, self.paris.id])
+        self.assertCountEqual(self.list_ids(min_experience=1, max_experience=3), [self.berlin.id, self.paris.id])
+        posted_after = (timezone.now() - timedelta(days=1)).isoformat()
+        self.assertCountEqual(self.list_ids(posted_after=posted_after), [self.berlin.id, self.senior.id, self.paris.id])
+        self.assertEqual(self.list_ids(location="Paris", max_experience=0), [self.old.id])
+
+    def test_search_combines_with_filters(self):
+        self.assertEqual(self.list_ids(q="python", location="paris"), [self.old.id])
+        self.assertCountEqual(self.list_ids(q="python", max_experience=1), [self.berlin.id, self.old.id])
+        self.assertEqual(self.list_ids(q="developer", min_experience=2), [self.paris.id])
+
+    def test_rejects_empty_ranges(self):
+        response = self.client.get("/api/jobs/", {"min_experience": 5, "max_experience": 1})
+
+        self.assertEqual(response.status_code, 400)
+
+    def facets(self, **params):
+        response = self.client.get("/api/jobs/facets/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_facets(self):
+        with self.assertNumQueries(1):
+            facets = self.facets(q="python")
+
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(facets["location"], {"berlin": 2, "paris": 1})
+        self.assertEqual(facets["experience"], {"0-1": 2, "2-4": 0, "5-9": 1, "10+": 0})
+        self.assertEqual(facets["posted"], {"past_day": 2, "past_week": 2, "past_month": 3})
+        self.assertEqual(self.facets(location="PARIS", max_experience=3)["location"], {"paris": 2})
+
+    def test_facets_are_cached_until_job_changes_are_applied(self):
+        self.facets(q="python")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.facets(q="python")["total"], 3)
+
+        self.paris.title = "Python developer"
+        self.paris.save()
+        apply_job_changes()
+
+        self.assertEqual(self.facets(q="python")["total"], 4)
+
+
+class BulkCreateTests(IndexTestCase):
+    """
+    Tests the bulk create endpoint and the import command, which insert jobs in batches and index them at once.
+    """
+
+    def setUp(self):
+        super().setUp()
+        index_store.rebuild()
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def job(self, title, **fields):
+        return {
+            "title": title, "company": "Acme", "location": "Berlin", "salary_range": "50-60k",
+            "required_skills": "python django", "experience_required": 1, **fields,
+        }
+
+    def write(self, name, text):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        return path
+
+    @override_settings(JOB_BULK_BATCH_SIZE=2)
+    def test_creates_and_queues_the_jobs(self):
+        jobs = [self.job("First"), self.job("Second"), self.job("Third")]
+
+        response = self.client.post("/api/jobs/bulk/", jobs, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([job["title"] for job in response.data], ["First", "Second", "Third"])
+        ids = [job["id"] for job in response.data]
+        self.assertCountEqual(JobChange.objects.values_list("job_id", flat=True), ids)
+        apply_job_changes()
+        self.assertTrue(all(job_id in index_store.get() for job_id in ids))
+
+    def test_invalid_jobs_create_nothing(self):
+        response = self.client.post("/api/jobs/bulk/", [self.job("First"), self.job("")], format="json")
+
+        self.assertEqual(response.status_code, 400)
+        # Only the invalid jobs are reported, by their position in the request.
+        self.assertEqual(list(response.data), [1])
+        self.assertIn("title", response.data[1])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_BULK_MAX_SIZE=2)
+    def test_limits_the_request_size(self):
+        jobs = [self.job("First"), self.job("Second"), self.job("Third")]
+
+        response = self.client.post("/api/jobs/bulk/", jobs, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.exists())
+
+    def test_is_restricted_to_recruiters(self):
+        self.client.force_authenticate(self.create_seeker("python"))
+
+        response = self.client.post("/api/jobs/bulk/", [self.job("First")], format="json")
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_imports_csv_in_batches(self):
+        path = self.write("jobs.csv", "\n".join([
+            "title,company,location,salary_range,required_skills,experience_required",
+            "First,Acme,Berlin,50-60k,python django,1",
+            "Second,Acme,Berlin,50-60k,java spring,2",
+            "Third,Acme,Berlin,50-60k,go,not a number",
+            "Fourth,Acme,Paris,50-60k,rust,3",
+        ]))
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command("import_jobs", path, recruiter="recruiter", batch_size=2, stdout=stdout, stderr=stderr)
+
+        titles = list(Job.objects.order_by("id").values_list("title", flat=True))
+        self.assertEqual(titles, ["First", "Second", "Fourth"])
+        self.assertIn("Batch 2: imported 1 jobs (3 in total, 1 skipped", stdout.getvalue())
+        self.assertIn("Line 4: ", stderr.getvalue())
+        index = index_store.get()
+        self.assertTrue(all(job_id in index for job_id in Job.objects.values_list("id", flat=True)))
+        self.assertFalse(JobChange.objects.exists())
+
+    def test_imports_json_lines_and_rebuilds_large_imports(self):
+        path = self.write("jobs.jsonl", "\n".join([
+            json.dumps(self.job("First")), "{not json", json.dumps(["not", "a", "job"]), json.dumps(self.job("Second")),
+        ]))
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command("import_jobs", path, recruiter="recruiter", reindex_limit=1, stdout=stdout, stderr=stderr)
+
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertIn("Rebuilt the recommendation index with 2 jobs", stdout.getvalue())
+        self.assertIn("Line 2: invalid JSON", stderr.getvalue())
+        self.assertIn("Line 3: not a job object.", stderr.getvalue())
+        self.assertEqual(len(index_store.get()), 2)
+
+
+@override_settings(RECOMMENDATION_INDEX_UPDATE_INTERVAL=0)
+class ExportTests(TestCase):
+    """
+    Tests the NDJSON export of the job catalog through the endpoint and the management command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user("recruiter", password="secret", role="recruiter")
+        cls.staff = User.objects.create_user("staff", password="secret", is_staff=True)
+        now = timezone.now()
+        cls.jobs = [create_job(cls.recruiter, title=title) for title in ("Latest", "Middle", "Oldest")]
+        for hours, job in enumerate(cls.jobs, start=1):
+            Job.objects.filter(id=job.id).update(posted_at=now - timedelta(hours=hours))
+        cls.posted_at = dict(Job.objects.values_list("id", "posted_at"))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def export(self, **params):
+        response = self.client.get("/api/jobs/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def lines(self, content):
+        return [json.loads(line) for line in content.decode("utf-8").splitlines()]
+
+    def test_streams_the_jobs_in_posting_order(self):
+        response, content = self.export()
+
+        rows = self.lines(content)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual([row["id"] for row in rows], [job.id for job in reversed(self.jobs)])
+        self.assertEqual(rows[0]["recruiter_username"], "recruiter")
+        self.assertNotIn("skill_hashes", rows[0])
+
+    def test_exports_the_jobs_posted_after_the_watermark(self):
+        response, _ = self.export()
+        self.assertEqual(self.export(since=response["X-Export-Watermark"])[1], b"")
+
+        _, content = self.export(since=self.posted_at[self.jobs[1].id].isoformat())
+
+        self.assertEqual([row["id"] for row in self.lines(content)], [self.jobs[0].id])
+
+    def test_gzip(self):
+        response, content = self.export(gzip="true")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(content), self.export()[1])
+
+    def test_compressed_chunks_form_one_stream(self):
+        rows = [{"id": number, "text": "x" * 1000} for number in range(200)]
+
+        chunks = list(ndjson_chunks(rows, compress=True))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(gzip.decompress(b"".join(chunks)), b"".join(ndjson_chunks(rows)))
+
+    def test_is_restricted_to_staff(self):
+        self.client.force_authenticate(self.recruiter)
+
+        self.assertEqual(self.client.get("/api/jobs/export/").status_code, 403)
+
+    def test_command(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        output, stderr = os.path.join(directory, "jobs.ndjson.gz"), StringIO()
+        since = self.posted_at[self.jobs[2].id].isoformat()
+
+        call_command("export_jobs", output=output, since=since, gzip=True, chunk_size=1, stderr=stderr)
+
+        with gzip.open(output) as handle:
+            ids = [row["id"] for row in self.lines(handle.read())]
+        self.assertEqual(ids, [self.jobs[1].id, self.jobs[0].id])
+        self.assertIn("Exported 2 jobs", stderr.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("export_jobs", output=output, since="2024-01-01T00:00:00", stderr=StringIO())
+
+
+@override_settings(STARTUP_IMPORT_BUDGET_CHECK=60, STARTUP_IMPORT_BUDGET_WSGI=60)
+class StartupImportTests(SimpleTestCase):
+    """
+    Tests that starting Django and importing the views does not load the ML stack, which is only loaded on first use.
+    """
+
+    def test_startup_does_not_import_the_ml_stack(self):
+        stdout = StringIO()
+
+        # Raises a CommandError if a fresh interpreter imported numpy, scikit-learn, NLTK or pandas at startup.
+        call_command("check_import_time", repeat=1, stdout=stdout)
+
+        self.assertIn("check", stdout.getvalue())
+        self.assertIn("wsgi", stdout.getvalue())
+
+
+class RecommendationFilterTests(IndexTestCase):
+    """
+    Tests that recommendations leave out jobs in other locations, requiring more experience or already applied to,
+    unless the query parameters say otherwise.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.seeker = self.create_seeker("python django", experience=5, preferred_location="Berlin")
+        self.match = create_job(self.recruiter, required_skills="python", experience_required=2)
+        self.senior = create_job(self.recruiter, required_skills="python django", experience_required=8)
+        self.paris = create_job(self.recruiter, required_skills="python django", location="paris")
+        self.applied = create_job(self.recruiter, required_skills="python django")
+        JobApplication.objects.create(job=self.applied, job_seeker=self.seeker)
+        index_store.rebuild()
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+
+    def recommend(self, **params):
+        response = self.client.get("/api/jobs/recommendations/", params)
+        self.assertEqual(response.status_code, 200)
+        return [job["id"] for job in response.data["results"]]
+
+    def test_filters_of_the_profile(self):
+        self.assertEqual(self.recommend(), [self.match.id])
+
+    def test_overrides(self):
+        self.assertCountEqual(self.recommend(max_experience=10), [self.match.id, self.senior.id])
+        self.assertCountEqual(self.recommend(max_experience=""), [self.match.id, self.senior.id])
+        self.assertEqual(self.recommend(location="Paris"), [self.paris.id])
+        self.assertCountEqual(self.recommend(location=""), [self.match.id, self.paris.id])
+        self.assertCountEqual(self.recommend(include_applied="true"), [self.match.id, self.applied.id])
+
+    def test_filters_match_the_database(self):
+        job_filter = JobFilter.for_profile(self.seeker.job_seeker_profile)
+
+        allowed = job_filter.filter_queryset(Job.objects.all()).values_list("id", flat=True)
+
+        self.assertEqual(list(allowed), [self.match.id])
+
+
+class SharedIndexTests(IndexTestCase):
+    """
+    Tests that workers memory-map the published index versions and switch to a new version once it is published.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.python, = self.create_jobs(["python django"])
+        index_store.rebuild()
+
+    def test_published_index_is_memory_mapped(self):
+        index = index_store.get()
+
+        for array in (index.matrix.data, index.matrix.indices, index.matrix.indptr, index.job_ids, index.vocabulary):
+            # The sparse matrix holds views of the mapped arrays rather than the arrays themselves.
+            base = array
+            while base is not None and not isinstance(base, np.memmap):
+                base = base.base
+            self.assertIsInstance(base, np.memmap)
+            self.assertFalse(array.flags.writeable)
+
+    def test_workers_switch_to_new_versions(self):
+        # Another worker process, with a store of its own on the same directory.
+        worker = IndexStore()
+        self.assertEqual(worker.get().version, index_store.published_version())
+
+        java, = self.create_jobs(["java spring"])
+        index_store.rebuild()
+
+        self.assertEqual(worker.get().version, index_store.published_version())
+        self.assertIn(java.id, worker.get())
+
+    @override_settings(RECOMMENDATION_INDEX_KEEP_VERSIONS=2)
+    def test_keeps_recent_versions(self):
+        for _ in range(3):
+            index_store.rebuild()
+
+        versions = os.listdir(os.path.join(index_store.directory, "versions"))
+        self.assertEqual(len(versions), 2)
+        self.assertIn(index_store.published_version(), versions)
+
+    def test_warm_up_command(self):
+        index_store.reset()
+        stdout = StringIO()
+
+        call_command("warm_job_index", stdout=stdout)
+
+        self.assertIn(f"Warmed up index version {index_store.published_version()} with 1 jobs", stdout.getvalue())
+
+
+class TimingTests(IndexTestCase):
+    """
+    Tests the stage timings of recommendation requests: the Server-Timing header, the log records and the histograms.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.create_jobs(["python django", "java spring"])
+        index_store.rebuild()
+        self.seeker = self.create_seeker("python")
+        self.client = APIClient()
+        self.client.force_authenticate(self.seeker)
+        histograms.reset()
+        self.addCleanup(histograms.reset)
+
+    @override_settings(RECOMMENDATION_TIMING_ENABLED=True)
+    def test_reports_the_stages(self):
+        with self.assertLogs("jobs.recommender.timing", "INFO") as logs:
+            response = self.client.get("/api/jobs/recommendations/")
+
+        metrics = dict(metric.split(";", 1) for metric in response["Server-Timing"].split(", "))
+        self.assertTrue({"fetch", "score", "rank", "total"} <= metrics.keys())
+        self.assertEqual(metrics["catalog"], 'desc="2"')
+        record, = logs.records
+        self.assertEqual(record.endpoint, "recommendations")
+        self.assertEqual(record.counters["catalog"], 2)
+        self.assertIn("score", record.stages_ms)
+        self.assertEqual(histograms.snapshot()["total"]["count"], 1)
+
+    @override_settings(RECOMMENDATION_TIMING_ENABLED=True, RECOMMENDATION_TIMING_SAMPLE_RATE=0)
+    def test_sampling(self):
+        response = self.client.get("/api/jobs/recommendations/")
+
+        self.assertIn("Server-Timing", response)
+        self.assertEqual(histograms.snapshot(), {})
+
+    def test_disabled(self):
+        with self.assertNoLogs("jobs.recommender.timing"):
+            response = self.client.get("/api/jobs/recommendations/")
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(histograms.snapshot(), {})
+
+    @override_settings(RECOMMENDATION_TIMING_ENABLED=True)
+    def test_histograms_endpoint(self):
+        self.client.get("/api/jobs/recommendations/")
+        self.assertEqual(self.client.get("/api/jobs/recommendations/timings/").status_code, 403)
+        self.client.force_authenticate(User.objects.create_user("staff", password="secret", is_staff=True))
+
+        data = self.client.get("/api/jobs/recommendations/timings/").data
+
+        self.assertTrue(data["enabled"])
+        self.assertEqual(data["pid"], os.getpid())
+        self.assertEqual(data["stages"], histograms.snapshot())
+        self.assertEqual(data["stages"]["total"]["count"], 1)
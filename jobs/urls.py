@@ -1,5 +1,16 @@
 from django.urls import path
-from .views import JobListCreateView, JobDetailView, JobRecommendationView
+from .views import (
+    JobListCreateView,
+    JobExportView,
+    JobBulkCreateView,
+    JobFacetsView,
+    JobDetailView,
+    SimilarJobsView,
+    JobCandidatesView,
+    JobRecommendationView,
+    JobRecommendationBatchView,
+    RecommendationTimingView,
+)
 
 
 """
@@ -7,22 +18,55 @@ from .views import JobListCreateView, JobDetailView, JobRecommendationView
 
     This URL configuration provides the following routes:
     - 'jobs/': List all jobs and allow recruiters to create new job postings.
+    - 'jobs/bulk/': Create many job postings at once (recruiters only).
+    - 'jobs/export/': Stream every job, or the jobs posted since a watermark, as NDJSON (staff only).
+    - 'jobs/facets/': Count the jobs of the job list per location, experience and posting time.
     - 'jobs/<int:pk>/': Retrieve, update, or delete a specific job posting identified by its primary key (pk).
+    - 'jobs/<int:pk>/similar/': Retrieve the precomputed most similar jobs of a specific job posting.
+    - 'jobs/<int:pk>/candidates/': Retrieve the best matching job seekers for a job posting (recruiter who posted it
+      only).
     - 'jobs/recommendations/': Retrieve job recommendations for authenticated job seekers based on their profile skills.
+    - 'jobs/recommendations/batch/': Retrieve job recommendations for many job seekers or skills texts at once (staff
+      only).
+    - 'jobs/recommendations/timings/': Retrieve the stage latency histograms of the recommendation endpoint (staff
+      only).
 
     Paths:
         - 'jobs/': Maps to the JobListCreateView, which handles both viewing and creating jobs.
+        - 'jobs/bulk/': Maps to the JobBulkCreateView, which creates a list of jobs in batches.
+        - 'jobs/export/': Maps to the JobExportView, which streams the job catalog.
+        - 'jobs/facets/': Maps to the JobFacetsView, which counts the jobs per facet.
         - 'jobs/<int:pk>/': Maps to the JobDetailView, which allows detailed view and management of a specific job.
+        - 'jobs/<int:pk>/similar/': Maps to the SimilarJobsView, which lists the jobs most similar to a specific job.
+        - 'jobs/<int:pk>/candidates/': Maps to the JobCandidatesView, which ranks job seekers for a specific job.
         - 'jobs/recommendations/': Maps to the JobRecommendationView, which generates job recommendations for job seekers.
+        - 'jobs/recommendations/batch/': Maps to the JobRecommendationBatchView, which scores a batch of job seekers or
+          skills.
+        - 'jobs/recommendations/timings/': Maps to the RecommendationTimingView, which returns the sampled stage
+          timings.
 
     Names:
         - 'job-list-create': The name for the URL pattern that lists and creates jobs.
+        - 'job-bulk-create': The name for the URL pattern that creates many jobs at once.
+        - 'job-export': The name for the URL pattern that exports the job catalog.
+        - 'job-facets': The name for the URL pattern that counts the jobs per facet.
         - 'job-detail': The name for the URL pattern to view, update, or delete a job.
+        - 'job-similar': The name for the URL pattern that lists the similar jobs of a job.
+        - 'job-candidates': The name for the URL pattern that ranks the candidates of a job.
         - 'job-recommendations': The name for the URL pattern that provides job recommendations.
+        - 'job-recommendations-batch': The name for the URL pattern that provides batch job recommendations.
+        - 'job-recommendations-timings': The name for the URL pattern that provides the recommendation stage timings.
     """
 urlpatterns = [
 
     path('jobs/', JobListCreateView.as_view(), name='job-list-create'),
+    path('jobs/bulk/', JobBulkCreateView.as_view(), name='job-bulk-create'),
+    path('jobs/export/', JobExportView.as_view(), name='job-export'),
+    path('jobs/facets/', JobFacetsView.as_view(), name='job-facets'),
     path('jobs/<int:pk>/', JobDetailView.as_view(), name='job-detail'),
+    path('jobs/<int:pk>/similar/', SimilarJobsView.as_view(), name='job-similar'),
+    path('jobs/<int:pk>/candidates/', JobCandidatesView.as_view(), name='job-candidates'),
     path('jobs/recommendations/', JobRecommendationView.as_view(), name='job-recommendations'),
+    path('jobs/recommendations/batch/', JobRecommendationBatchView.as_view(), name='job-recommendations-batch'),
+    path('jobs/recommendations/timings/', RecommendationTimingView.as_view(), name='job-recommendations-timings'),
 ]
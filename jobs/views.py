@@ -1,22 +1,37 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import generics, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import pandas as pd
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-import string
-
-from .models import Job
-from users.models import JobSeekerProfile
-from .serializers import JobSerializer
 
-# Download necessary NLTK resources
-nltk.download('punkt')
-nltk.download('stopwords')
+from .models import Job, SimilarJob
+from users.models import JobSeekerProfile
+from .pagination import KeysetPagination, RecommendationPagination
+from .serializers import (
+    CandidateQuerySerializer,
+    CandidateSerializer,
+    JobExportQuerySerializer,
+    JobSearchQuerySerializer,
+    JobSerializer,
+    RecommendationBatchSerializer,
+    RecommendationQuerySerializer,
+    RecommendedJobSerializer,
+)
+from .recommender import index_store, seeker_index_store
+from .recommender.filters import CandidateFilter
+from .recommender.batch import recommend_for_seekers, recommend_for_skills
+from .recommender.materialized import profile_fingerprint
+from .recommender.rankers import rank_with_fallback, ranker_counters
+from .recommender.responses import catalog_version, get_or_compute, response_key
+from .recommender.timing import current_timer, histograms, timed_request
+from .bulk import create_jobs
+from .export import export_rows, export_watermark, ndjson_chunks
+from .search import filter_jobs, job_facets
 
 
 # ✅ Job List & Create View (Only Recruiters Can Create Jobs)
@@ -26,19 +41,60 @@ class JobListCreateView(generics.ListCreateAPIView):
 
     This view allows authenticated users (with the 'recruiter' role) to create job postings,
     and allows all authenticated users to view the list of jobs.
+    The list can be searched with 'q', which ranks the jobs matching the text by relevance, and filtered by
+    'location', 'min_experience', 'max_experience', 'posted_after' and 'posted_before'.
+    The list is paginated by page number, or by keyset with 'pagination=cursor', which follows opaque cursors in
+    the 'next' and 'previous' links instead of counting the jobs and skipping an offset.
 
     Attributes:
         queryset (QuerySet): A queryset to retrieve all job listings, optimized with select_related for the recruiter.
         serializer_class (JobSerializer): Serializer to represent job data in JSON format.
         permission_classes (list): A list of permission classes to control access to the view.
+        keyset_pagination_class (KeysetPagination): The pagination of the cursor mode.
 
     Methods:
+        paginator: Returns the keyset pagination in cursor mode, the default pagination otherwise.
+        get_queryset(self): Applies the search and filters of the query parameters to the job list.
         perform_create(self, serializer): Ensures that only recruiters can post jobs by checking the user's role.
     """
 
     queryset = Job.objects.select_related("recruiter").all()  # Optimized query
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        """
+        Returns the paginator of the request: keyset pagination if the client asked for the cursor mode or follows a
+        cursor, the default page number pagination otherwise.
+
+        Returns:
+            BasePagination: The paginator.
+        """
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if params.get("pagination") == "cursor" or self.keyset_pagination_class.cursor_query_param in params:
+                self._paginator = self.keyset_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        """
+        Applies the search and filters of the query parameters to the job list.
+
+        Search results are ranked by relevance, except in cursor mode, which lists them newest first.
+
+        Returns:
+            QuerySet: The jobs to list.
+        """
+        queryset = super().get_queryset()
+        if self.request.method != "GET":
+            return queryset
+        query = JobSearchQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        return filter_jobs(queryset, query.validated_data)
 
     def perform_create(self, serializer):
         """
@@ -54,6 +110,140 @@ class JobListCreateView(generics.ListCreateAPIView):
         serializer.save(recruiter=self.request.user)
 
 
+# ✅ Job Bulk Create View (Many Jobs per Request - Only Recruiters)
+class JobBulkCreateView(APIView):
+    """
+    View to create many job postings in a single request, for recruiters whose tracking systems push jobs in bulk.
+
+    The jobs are validated like single jobs, then inserted in batches of `JOB_BULK_BATCH_SIZE` in one transaction, so
+    either every job of the request is created or none is. The jobs are queued along with them and added to the
+    recommendation index in the background, so the response does not wait for the index.
+
+    Attributes:
+        permission_classes (list): A list of permission classes allowing only authenticated users.
+
+    Methods:
+        post(self, request): Creates the jobs of the request.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """
+        Handles the creation of many job postings.
+
+        The request body is a list of jobs with the same fields as a single job, at most `JOB_BULK_MAX_SIZE` of them.
+
+        Args:
+            request (Request): The incoming HTTP request containing the jobs.
+
+        Returns:
+            Response: A response containing the created jobs, or the validation errors of every job.
+
+        Raises:
+            PermissionDenied: If the user is not a recruiter.
+        """
+        if request.user.role != "recruiter":
+            raise PermissionDenied("Only recruiters can post jobs.")
+
+        max_size = settings.JOB_BULK_MAX_SIZE
+        if isinstance(request.data, list) and len(request.data) > max_size:
+            return Response({"error": f"At most {max_size} jobs are allowed per request."}, status=400)
+
+        serializer = JobSerializer(data=request.data, many=True, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        jobs = create_jobs(Job(recruiter=request.user, **data) for data in serializer.validated_data)
+        return Response(JobSerializer(jobs, many=True).data, status=201)
+
+
+# ✅ Job Export View (Full Catalog as NDJSON - Staff Only)
+class JobExportView(APIView):
+    """
+    View to stream the whole job catalog, or the jobs posted since the previous export, as NDJSON.
+
+    Jobs are written one JSON object per line, in posting order, while they are read from the database through a
+    server-side cursor, so the export uses the same memory for any catalog size. It is restricted to staff accounts
+    used by data partners.
+
+    Attributes:
+        permission_classes (list): A list of permission classes allowing only staff users.
+
+    Methods:
+        get(self, request): Streams the exported jobs.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Handles the export of the job catalog.
+
+        The optional 'since' parameter is the watermark returned by the previous export, in the 'X-Export-Watermark'
+        header; only jobs posted after it are exported. With 'gzip=true', the body is gzip-compressed.
+
+        Args:
+            request (Request): The incoming HTTP request.
+
+        Returns:
+            StreamingHttpResponse: The NDJSON stream of the exported jobs.
+        """
+        query = JobExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        compress = query.validated_data["gzip"]
+
+        watermark = export_watermark()
+        rows = export_rows(since=query.validated_data.get("since"), until=watermark)
+        response = StreamingHttpResponse(ndjson_chunks(rows, compress), content_type="application/x-ndjson")
+        response["X-Export-Watermark"] = watermark.isoformat()
+        response["Content-Disposition"] = 'attachment; filename="jobs.ndjson"'
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        return response
+
+
+# ✅ Job Facets View (Job Counts for the Search Filters)
+class JobFacetsView(APIView):
+    """
+    View to count the jobs of the job list per location, per experience bucket and per posting time bucket.
+
+    The counts honour the same search and filter query parameters as the job list. They are computed by a single
+    grouped query and cached for `JOB_FACETS_CACHE_TIMEOUT` seconds under the catalog version, so saving or deleting
+    a job invalidates them.
+
+    Attributes:
+        permission_classes (list): A list of permission classes allowing only authenticated users.
+
+    Methods:
+        get(self, request): Returns the facet counts of the filtered job list.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """
+        Handles the retrieval of the facet counts.
+
+        Args:
+            request (Request): The incoming HTTP request containing the search and filter parameters.
+
+        Returns:
+            Response: A response containing the total number of jobs and the 'location', 'experience' and 'posted'
+            counts.
+        """
+        query = JobSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        filters = query.validated_data
+
+        digest = hashlib.sha256(repr(sorted(filters.items())).encode("utf-8")).hexdigest()
+        key = f"jobs:facets:{catalog_version()}:{digest}"
+        data, _ = get_or_compute(
+            key,
+            lambda: job_facets(filter_jobs(Job.objects.all(), filters, ranked=False)),
+            timeout=settings.JOB_FACETS_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
+
 # ✅ Job Detail View (View, Update, Delete Job - Only the Recruiter Who Posted It)
 class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
@@ -103,6 +293,138 @@ class JobDetailView(generics.RetrieveUpdateDestroyAPIView):
         instance.delete()
 
 
+# ✅ Similar Jobs View (Precomputed Nearest Neighbours)
+class SimilarJobsView(APIView):
+    """
+    View to list the jobs most similar to a job posting, by cosine similarity of their required skills.
+
+    The similar jobs are precomputed in the `SimilarJob` table and kept up to date when jobs change, so they are read
+    with a single indexed query instead of comparing the job with every other job.
+
+    Attributes:
+        permission_classes (list): A list of permission classes to ensure only authenticated users can access the view.
+
+    Methods:
+        get(self, request, pk): Returns the most similar jobs of a job posting.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        """
+        Handles the retrieval of the jobs most similar to a job posting.
+
+        Args:
+            request (Request): The incoming HTTP request.
+            pk (int): The primary key of the job posting.
+
+        Returns:
+            Response: A response containing the similar jobs with their scores, ordered by decreasing similarity, or
+            an error message if the job does not exist.
+        """
+        rows = SimilarJob.objects.filter(job_id=pk).select_related("similar__recruiter").order_by(
+            "-score", "similar_id"
+        )[:settings.RECOMMENDATION_SIMILAR_JOBS_TOP_N]
+        similar_jobs = []
+        for row in rows:
+            row.similar.score = row.score
+            similar_jobs.append(row.similar)
+
+        # Only a job without similar jobs needs a second query, to tell it apart from a missing job
+        if not similar_jobs and not Job.objects.filter(pk=pk).exists():
+            return Response({"error": "Job not found."}, status=404)
+        return Response({"job": pk, "results": RecommendedJobSerializer(similar_jobs, many=True).data})
+
+
+# ✅ Job Candidates View (Only the Recruiter Who Posted the Job)
+class JobCandidatesView(APIView):
+    """
+    View to rank the job seekers best matching a job posting.
+
+    The job's required skills are vectorized and scored against the prebuilt job seeker index, which is kept in sync
+    with the job seeker profiles, so only the job is vectorized per request. Job seekers with less experience than the
+    job requires, or preferring another location, are filtered out before scoring unless the 'min_experience' or
+    'location' query parameters say otherwise. Only the recruiter who posted the job can see its candidates.
+
+    Attributes:
+        permission_classes (list): A list of permission classes to ensure only authenticated users can access the view.
+
+    Methods:
+        dispatch(self, request, *args, **kwargs): Times the stages of the request.
+        get(self, request, pk): Returns the top-K candidates of a job posting.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Times the stages of the request and reports them in a Server-Timing header, if timing is enabled.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+
+        Returns:
+            Response: The response of the handler.
+        """
+        with timed_request("candidates") as timer:
+            response = super().dispatch(request, *args, **kwargs)
+        if timer.enabled:
+            response["Server-Timing"] = timer.server_timing()
+        return response
+
+    def get(self, request, pk):
+        """
+        Handles the retrieval of the best matching job seekers for a job posting.
+
+        Args:
+            request (Request): The incoming HTTP request.
+            pk (int): The primary key of the job posting.
+
+        Returns:
+            Response: A response containing the candidates with their scores, ordered by decreasing score, or an
+            error message.
+        """
+        timer = current_timer()
+        with timer.stage("fetch"):
+            job = Job.objects.filter(pk=pk).first()
+        if job is None:
+            return Response({"error": "Job not found."}, status=404)
+        if request.user.pk != job.recruiter_id:
+            raise PermissionDenied("Only the recruiter who posted this job can view its candidates.")
+
+        # Validate the number of candidates and the filter overrides
+        query = CandidateQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        k, overrides = query.validated_data["k"], query.validated_data["overrides"]
+
+        # Score the job's required skills against the prebuilt job seeker index
+        index = seeker_index_store.get()
+        if not len(index):
+            return Response({"message": "No job seekers available at the moment."})
+        matches = index.top_k(job.required_skills, k, CandidateFilter.for_job(job, overrides))
+        # Job seekers sharing no skill with the job are not candidates
+        matches = [(seeker_id, score) for seeker_id, score in matches if score > 0]
+
+        # Get the profiles of the candidates in a single query, then restore the ranking order
+        with timer.stage("fetch"):
+            profiles = {
+                profile.user_id: profile
+                for profile in JobSeekerProfile.objects.select_related("user").filter(
+                    user_id__in=[seeker_id for seeker_id, _ in matches]
+                )
+            }
+        with timer.stage("serialize"):
+            candidates = []
+            for seeker_id, score in matches:
+                # A profile deleted since the index was updated is skipped
+                if seeker_id in profiles:
+                    profiles[seeker_id].score = score
+                    candidates.append(profiles[seeker_id])
+            data = CandidateSerializer(candidates, many=True, context={"request": request}).data
+
+        return Response({"job": job.pk, "results": data})
+
+
 # ✅ Job Recommendation View (For Job Seekers Only)
 class JobRecommendationView(APIView):
     """
@@ -110,15 +432,43 @@ class JobRecommendationView(APIView):
 
     This view calculates job recommendations for authenticated job seekers based on their
     skills profile, using cosine similarity between the job seeker's skills and job requirements.
+    Job requirements are read from the persistent TF-IDF index, so only the seeker's skills are vectorized per request.
+    Jobs in other locations, requiring more experience than the job seeker has, or already applied to are filtered
+    out before scoring, unless the 'location', 'max_experience' or 'include_applied' query parameters say otherwise.
+    Results are paginated with the 'k' (page size), 'offset' and 'cursor' query parameters.
+    Rankings come from the first ranker of `RECOMMENDATION_RANKERS` that answers within `RECOMMENDATION_DEADLINE_MS`,
+    and the response names it in its 'ranker' field.
+    When `RECOMMENDATION_TIMING_ENABLED` is set, the time spent in each stage is returned in a Server-Timing header.
 
     Attributes:
         permission_classes (list): A list of permission classes to ensure only authenticated users can access the recommendations.
+        pagination_class (RecommendationPagination): The pagination over the ranked recommendations.
 
     Methods:
-        get(self, request): Fetches recommended jobs for the authenticated job seeker.
+        dispatch(self, request, *args, **kwargs): Times the stages of the request.
+        get(self, request): Fetches a page of recommended jobs for the authenticated job seeker.
+        recommend(self, request, profile, k, offset, overrides, deadline): Computes a page of recommended jobs.
+        paginate(self, request, ranking, offset, k): Serializes one page of a ranking.
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecommendationPagination
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Times the stages of the request and reports them in a Server-Timing header, if timing is enabled.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+
+        Returns:
+            Response: The response of the handler.
+        """
+        with timed_request("recommendations") as timer:
+            response = super().dispatch(request, *args, **kwargs)
+        if timer.enabled:
+            response["Server-Timing"] = timer.server_timing()
+        return response
 
     def get(self, request):
         """
@@ -127,15 +477,28 @@ class JobRecommendationView(APIView):
         This method performs the following:
         - Ensures the user has the 'job_seeker' role.
         - Retrieves the job seeker's skills from their profile.
-        - Fetches job listings and computes cosine similarity between job seeker's skills and job descriptions.
-        - Returns a list of the top 5 recommended jobs.
+        - Validates the page and the optional filter overrides from the query parameters.
+        - Returns the cached response of an identical request if no job, profile field or application changed since.
+        - Ranks the jobs with the first ranker of the chain that answers within the latency budget:
+          - With the default filters, reads the precomputed recommendations of the profile, or vectorizes the skills,
+            computes their cosine similarity against the allowed jobs of the prebuilt job index and stores the result.
+          - With overridden filters or beyond the precomputed recommendations, reads the ranking from the cache, or
+            computes it a few pages deep and caches it.
+          - While the job index is being built, streams the job catalog in chunks to score it instead of waiting.
+          - Past the deadline, falls back to counting shared skill terms, or to the latest jobs.
+        - Returns the requested page of recommended jobs with their scores, in ranking order, and the ranker that
+          ranked them. Only responses of the primary ranker are cached.
 
         Args:
             request (Request): The incoming HTTP request containing the user's details.
 
         Returns:
-            Response: A response containing the list of recommended jobs or an error message.
+            Response: A response containing the page of recommended jobs with 'next' and 'previous' links, or an
+            error message.
         """
+        # The latency budget starts with the request
+        budget = settings.RECOMMENDATION_DEADLINE_MS
+        deadline = time.monotonic() + budget / 1000 if budget else None
         user = request.user
 
         # Ensure only job seekers can get recommendations
@@ -143,46 +506,180 @@ class JobRecommendationView(APIView):
             return Response({"error": "Only job seekers can receive job recommendations."}, status=403)
 
         # Get job seeker's profile
+        timer = current_timer()
         try:
-            job_seeker_profile = user.job_seeker_profile
+            with timer.stage("fetch"):
+                job_seeker_profile = user.job_seeker_profile
         except JobSeekerProfile.DoesNotExist:
             return Response({"error": "Job seeker profile not found."}, status=404)
 
-        # Extract skills from job seeker profile
-        job_seeker_skills = job_seeker_profile.skills.lower()
+        # Validate the page and the filter overrides
+        query = RecommendationQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        k, offset, overrides = (query.validated_data[key] for key in ("k", "offset", "overrides"))
+
+        # Serve the response of an identical earlier request, unless a job, the profile or the applications changed
+        with timer.stage("cache"):
+            key = response_key(job_seeker_profile, profile_fingerprint(job_seeker_profile), {
+                "k": k,
+                "offset": offset,
+                "overrides": sorted(overrides.items()),
+                "host": request.get_host(),
+            })
+        self.ranker = None
+        data, cached = get_or_compute(
+            key,
+            lambda: self.recommend(request, job_seeker_profile, k, offset, overrides, deadline),
+            # Fallback rankings are not cached, so the next request gets another chance at the primary ranker
+            cache_if=lambda data: self.ranker is None or self.ranker.cacheable,
+        )
+        timer.count("cached", int(cached))
+
+        return Response(data)
+
+    def recommend(self, request, profile, k, offset, overrides, deadline):
+        """
+        Computes a page of recommended jobs with the ranker chain.
+
+        Args:
+            request (Request): The incoming HTTP request, used to build the page links.
+            profile (JobSeekerProfile): The job seeker profile.
+            k (int): The page size.
+            offset (int): The position of the first recommendation of the page.
+            overrides (dict): The filter overrides from the query parameters.
+            deadline (float): The `time.monotonic()` time by which the ranking is needed, or None.
+
+        Returns:
+            dict: The page of recommended jobs with 'next' and 'previous' links and the name of the ranker, or a
+            message if there are no jobs. The ranker is also kept in `self.ranker`.
+        """
+        index = index_store.get(build=False)
+        if index is not None and not len(index):
+            return {"message": "No jobs available at the moment."}
+
+        # Rank one entry past the page, to know whether there is a next page
+        ranking, self.ranker = rank_with_fallback(profile, offset + k + 1, overrides, deadline)
+        data = self.paginate(request, ranking, offset, k)
+        data["ranker"] = self.ranker.name
+        return data
 
-        # Fetch all job listings
-        jobs = Job.objects.all()
-        job_data = pd.DataFrame(list(jobs.values("id", "required_skills")))
+    def paginate(self, request, ranking, offset, k):
+        """
+        Serializes one page of a ranking.
 
-        if job_data.empty:
-            return Response({"message": "No jobs available at the moment."})
+        Args:
+            request (Request): The incoming HTTP request, used to build the page links.
+            ranking (list): The head of the ranking, as (job id, score) pairs.
+            offset (int): The position of the first recommendation of the page.
+            k (int): The page size.
 
-        # Preprocess job seeker skills & job descriptions
-        stop_words = set(stopwords.words('english'))
+        Returns:
+            dict: The page of recommended jobs with 'next' and 'previous' links.
+        """
+        timer = current_timer()
+        paginator = self.pagination_class()
+        page = paginator.paginate_ranking(ranking, offset, k, request)
+
+        # Get the details of the page's jobs in a single query, then restore the ranking order
+        with timer.stage("fetch"):
+            jobs = Job.objects.select_related("recruiter").in_bulk([job_id for job_id, _ in page])
+        with timer.stage("serialize"):
+            recommended_jobs = []
+            for job_id, score in page:
+                # A job deleted since the ranking was computed is skipped
+                if job_id in jobs:
+                    jobs[job_id].score = score
+                    recommended_jobs.append(jobs[job_id])
+            data = RecommendedJobSerializer(recommended_jobs, many=True).data
+
+        return paginator.get_paginated_data(data)
+
+
+# ✅ Batch Job Recommendation View (For Internal Jobs & Partner Integrations)
+class JobRecommendationBatchView(APIView):
+    """
+    View to recommend jobs to many job seekers, or many skills texts, in a single request.
 
-        def preprocess(text):
-            tokens = word_tokenize(text.lower())
-            tokens = [word for word in tokens if word not in stop_words and word not in string.punctuation]
-            return " ".join(tokens)
+    All entries of the batch are vectorized at once and scored against the prebuilt job index with chunked sparse
+    matrix products, instead of one recommendation request per job seeker. It is restricted to staff accounts used by
+    internal jobs and partner integrations.
 
-        job_seeker_skills = preprocess(job_seeker_skills)
-        job_data["processed_skills"] = job_data["required_skills"].apply(lambda x: preprocess(x.lower()))
+    Attributes:
+        permission_classes (list): A list of permission classes allowing only staff users.
 
-        # Convert skills into vectorized format using TF-IDF
-        vectorizer = TfidfVectorizer()
-        job_vectors = vectorizer.fit_transform(job_data["processed_skills"])
-        seeker_vector = vectorizer.transform([job_seeker_skills])
+    Methods:
+        post(self, request): Returns the top-K jobs for every job seeker or skills text of the request.
+    """
 
-        # Compute cosine similarity between job seeker and job descriptions
-        similarity_scores = cosine_similarity(seeker_vector, job_vectors)
+    permission_classes = [permissions.IsAdminUser]
 
-        # Rank jobs by similarity
-        job_data["similarity"] = similarity_scores[0]
-        top_matches = job_data.sort_values(by="similarity", ascending=False).head(5)
+    def post(self, request):
+        """
+        Handles a batch recommendation request.
 
-        # Get job details for top matches
-        recommended_jobs = Job.objects.filter(id__in=top_matches["id"].tolist())
-        serializer = JobSerializer(recommended_jobs, many=True)
+        The request body contains either 'seeker_ids' (user ids of job seekers) or 'skills' (raw skills texts), and
+        optionally 'k', the number of jobs per entry. Results are returned in the order of the request; seeker ids
+        without a job seeker profile are listed under 'not_found'.
 
-        return Response(serializer.data)
+        Args:
+            request (Request): The incoming HTTP request containing the batch.
+
+        Returns:
+            Response: A response containing the ranked job ids and scores of every entry.
+        """
+        serializer = RecommendationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        k = serializer.validated_data["k"]
+
+        def as_jobs(matches):
+            return [{"job_id": job_id, "score": score} for job_id, score in matches]
+
+        if "skills" in serializer.validated_data:
+            results = recommend_for_skills(serializer.validated_data["skills"], k)
+            return Response({"results": [{"recommendations": as_jobs(matches)} for matches in results]})
+
+        seeker_ids = serializer.validated_data["seeker_ids"]
+        results = recommend_for_seekers(seeker_ids, k)
+        return Response({
+            "results": [
+                {"seeker_id": seeker_id, "recommendations": as_jobs(matches)}
+                for seeker_id, matches in results.items()
+            ],
+            "not_found": [seeker_id for seeker_id in dict.fromkeys(seeker_ids) if seeker_id not in results],
+        })
+
+
+# ✅ Recommendation Timing View (Staff Only)
+class RecommendationTimingView(APIView):
+    """
+    View to read the stage latency histograms sampled by the recommendation endpoint.
+
+    Histograms are kept in the memory of each worker process, so the response covers the requests served by the
+    worker that handles it, identified by its process id.
+
+    Attributes:
+        permission_classes (list): A list of permission classes allowing only staff users.
+
+    Methods:
+        get(self, request): Returns the histograms of this worker process.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Handles the retrieval of the stage latency histograms.
+
+        Args:
+            request (Request): The incoming HTTP request.
+
+        Returns:
+            Response: A response containing whether timing is enabled, the worker process id, the histograms and the
+            outcome counts of every ranker.
+        """
+        return Response({
+            "enabled": settings.RECOMMENDATION_TIMING_ENABLED,
+            "pid": os.getpid(),
+            "stages": histograms.snapshot(),
+            "rankers": ranker_counters.snapshot(),
+        })